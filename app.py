@@ -7,6 +7,8 @@ from PyQt6.QtWidgets import QApplication, QMessageBox
 
 from login_dialog import LoginDialog
 from main_window import MainWindow
+from student_registry import reset_registry
+from seat_plan_repo import ensure_seat_plan_schema
 
 
 class AppController(QObject):
@@ -74,6 +76,13 @@ class AppController(QObject):
             self._main.close()
             self._main = None
 
+        # Oturma planı şeması süreç başına bir kez (sonraki kayıt/okumalar DDL çalıştırmaz).
+        # Burada başarısız olursa süreç boyunca yeniden denenmez; kayıtlar DB hatasını bildirir.
+        try:
+            ensure_seat_plan_schema()
+        except Exception as e:
+            QMessageBox.warning(None, "Uyarı", f"Oturma planı tablosu hazırlanamadı:\n{e}")
+
         # Ana pencereyi güvenli oluştur
         try:
             self._main = MainWindow(user)
@@ -101,6 +110,7 @@ class AppController(QObject):
                 pass
             self._main.close()
             self._main = None
+        reset_registry()  # sonraki oturum öğrenci listesini taze yükler
         self._show_login()
 
 
@@ -0,0 +1,96 @@
+# bench_save_plan.py — oturma planı kaydının ölçümü; SQL Server yerine yerel sqlite3 (DB gerekmez)
+# Kullanım: python bench_save_plan.py [sınav_sayısı] [sınav_başına_öğrenci] [gidiş_gecikmesi_ms]
+# Gecikme, sunucuya her gidişi taklit eder: execute → 1 gidiş; executemany → fast_executemany
+# açıksa 1 gidiş, kapalıysa satır başına 1 gidiş (pyodbc varsayılanı).
+import sys
+import time
+import sqlite3
+
+from seat_plan_repo import _write_plans
+
+SQLITE_DDL = """
+CREATE TABLE SeatPlans(
+    ExamID INTEGER NOT NULL, StudentNo TEXT NOT NULL, ClassroomID INTEGER NOT NULL,
+    RowIndex INTEGER NOT NULL, ColIndex INTEGER NOT NULL,
+    CreatedAt TEXT DEFAULT CURRENT_TIMESTAMP, PlanKey TEXT NULL
+);
+CREATE INDEX IX_SeatPlans_Exam ON SeatPlans(ExamID);
+"""
+
+class _RoundTripCursor:
+    """sqlite3 cursor'ını sarar; gidiş sayar ve gidiş başına gecikme ekler."""
+    def __init__(self, cur, latency_s: float, fast: bool):
+        self._cur = cur
+        self._latency = latency_s
+        self.trips = 0
+        if fast:
+            self.fast_executemany = False   # _write_plans açar
+
+    def _wait(self, n: int) -> None:
+        self.trips += n
+        if self._latency:
+            time.sleep(self._latency * n)
+
+    def execute(self, sql, params=()):
+        self._wait(1)
+        return self._cur.execute(sql, params)
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        self._wait(1 if getattr(self, "fast_executemany", False) else len(seq))
+        return self._cur.executemany(sql, seq)
+
+def make_plans(n_exams: int = 40, per_exam: int = 250):
+    plans = {}
+    for e in range(n_exams):
+        # (StudentNo, ClassroomID, RowIndex, ColIndex) — PlanResult.seat_rows biçimi
+        plans[1000 + e] = [(f"{220000000 + e * per_exam + i}", 1 + i // 60, i % 60 // 6, i % 6)
+                           for i in range(per_exam)]
+    return plans
+
+def save_row_by_row(cur, plans) -> int:
+    """Önceki save_plan davranışı: sınav başına DELETE + satır başına INSERT."""
+    n = 0
+    for exam_id, placements in plans.items():
+        cur.execute("DELETE FROM SeatPlans WHERE ExamID = ?", (exam_id,))
+        for no, rid, r, c in placements:
+            cur.execute("""
+                INSERT INTO SeatPlans(ExamID, StudentNo, ClassroomID, RowIndex, ColIndex)
+                VALUES(?, ?, ?, ?, ?)
+            """, (exam_id, no, rid, r, c))
+            n += 1
+    return n
+
+def run(name, writer, plans, latency_s, fast, commit_each):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SQLITE_DDL)
+    save_row_by_row(conn.cursor(), plans)   # eski planlar mevcut: DELETE gerçekten iş yapsın
+    conn.commit()
+    cur = _RoundTripCursor(conn.cursor(), latency_s, fast)
+    t0 = time.perf_counter()
+    if commit_each:   # eski akış: sınav başına ayrı save_plan → ayrı işlem
+        n = 0
+        for exam_id, placements in plans.items():
+            n += writer(cur, {exam_id: placements})
+            conn.commit(); cur._wait(1)
+    else:
+        n = writer(cur, plans)
+        conn.commit(); cur._wait(1)
+    dt = time.perf_counter() - t0
+    rows = conn.execute("SELECT COUNT(*) FROM SeatPlans").fetchone()[0]
+    conn.close()
+    print(f"{name:<34} {dt * 1000:9.1f} ms • gidiş {cur.trips:7d} • yazılan {n} • tablo {rows}")
+
+def main():
+    n_exams = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    per_exam = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    plans = make_plans(n_exams, per_exam)
+    print(f"Sınav: {n_exams} • Sınav başına öğrenci: {per_exam} • Gidiş gecikmesi: {latency_ms} ms")
+    lat = latency_ms / 1000.0
+    run("satır satır, sınav başına işlem", save_row_by_row, plans, lat, False, True)
+    run("toplu, fast_executemany kapalı", _write_plans, plans, lat, False, False)
+    run("toplu, fast_executemany, tek işlem", _write_plans, plans, lat, True, False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bench_scheduler.py — sentetik fakülte üzerinde planlayıcı ölçümü (DB gerekmez)
+# Kullanım: python bench_scheduler.py [öğrenci_sayısı] [ders_sayısı] [salon_sayısı]
+import sys
+import random
+import time
+import tracemalloc
+from datetime import date
+
+from scheduler_core import Constraints, compile_problem, schedule_problem
+
+def make_faculty(n_students: int = 30000, n_courses: int = 240, n_rooms: int = 80, seed: int = 7):
+    """
+    Fakülte = 4 bölüm × 4 sınıf yılı (16 grup, ClassYear = grup); her öğrenci kendi grubundan
+    4–7 ders alır.
+    Salonlar 2/3/4'lü sıra düzenli.
+    """
+    rnd = random.Random(seed)
+    groups = 16
+    courses = [{"CourseID": i + 1, "CourseCode": f"C{i + 1:04d}", "CourseName": f"Ders {i + 1}",
+                "ClassYear": 1 + i % groups} for i in range(n_courses)]
+    by_group = {g: [c["CourseID"] for i, c in enumerate(courses) if i % groups == g] for g in range(groups)}
+    students_by_course = {c["CourseID"]: set() for c in courses}
+    for s in range(n_students):
+        mine = by_group[s % groups]
+        for cid in rnd.sample(mine, min(len(mine), rnd.randint(4, 7))):
+            students_by_course[cid].add(200000000 + s)
+    rooms = []
+    for r in range(n_rooms):
+        rows, cols, g = rnd.choice([(10, 6, 2), (9, 8, 3), (12, 10, 3), (8, 5, 2), (16, 12, 4), (20, 14, 2)])
+        rooms.append({"ClassroomID": r + 1, "Code": f"D{r + 1}", "Name": f"Salon {r + 1}",
+                      "Capacity": rows * cols, "Rows": rows, "Cols": cols, "DeskGroupSize": g})
+    return courses, students_by_course, rooms
+
+def main():
+    n_students = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    n_courses = int(sys.argv[2]) if len(sys.argv) > 2 else 240
+    n_rooms = int(sys.argv[3]) if len(sys.argv) > 3 else 80
+    courses, sbc, rooms = make_faculty(n_students, n_courses, n_rooms)
+    enrollments = sum(len(v) for v in sbc.values())
+    print(f"Öğrenci: {n_students} • Ders: {n_courses} • Kayıt: {enrollments} • Salon: {n_rooms}")
+
+    cs = Constraints(department_id=0, date_start=date(2025, 1, 6), date_end=date(2025, 2, 28),
+                     exclude_weekdays={5, 6}, default_duration_min=75, buffer_min=15,
+                     global_no_overlap=False, chosen_courses=courses)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    problem = compile_problem(courses, rooms, sbc)
+    t1 = time.perf_counter()
+    _, peak_compile = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    base_mem, _ = tracemalloc.get_traced_memory()
+    rows = schedule_problem(cs, problem)
+    t2 = time.perf_counter()
+    _, peak_sched = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Derleme:      {t1 - t0:7.3f} sn • tepe bellek {peak_compile / 2**20:8.1f} MB")
+    print(f"Yerleştirme:  {t2 - t1:7.3f} sn • tepe bellek (derleme üstü) {(peak_sched - base_mem) / 2**20:8.1f} MB")
+    print(f"Satır: {len(rows)} • Gün: {len({r['Date'] for r in rows})}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_seat_plan.py — sentetik sınav üzerinde oturma planı ölçümü (DB gerekmez)
+# Kullanım: python bench_seat_plan.py [öğrenci_sayısı] [salon_sayısı] [ön_sıra_isteği] [tekrar]
+#           python bench_seat_plan.py batch [slot_sayısı] [slot_başına_öğrenci]
+import sys
+import random
+import time
+import tracemalloc
+from dataclasses import replace
+
+from seat_plan_repo import Student, RoomLayout, _build_seating_plan, effective_capacity, SEAT_EMPTY
+
+def make_exam(n_students: int = 2000, n_rooms: int = 15, n_front: int = 300, seed: int = 11):
+    """
+    Tek sınav: n_students öğrenci, 2/3/4'lü sıra düzenli n_rooms salon (toplam kapasite
+    öğrenci sayısına yetecek kadar büyütülür), n_front ön sıra isteği ve birkaç yüz yasak çift.
+    """
+    rnd = random.Random(seed)
+    students = [Student(no=f"{220000000 + i}", name=f"Öğrenci {i}", class_year=1 + i % 4)
+                for i in range(n_students)]
+    shapes = [(20, 14, 2), (16, 12, 4), (18, 12, 3), (24, 16, 2)]
+    rooms = [RoomLayout(classroom_id=r + 1, classroom_name=f"Salon {r + 1:02d}",
+                        rows=rows, cols=cols, bench_size=g)
+             for r, (rows, cols, g) in enumerate(rnd.choice(shapes) for _ in range(n_rooms))]
+    cap = sum(effective_capacity(r.rows, r.cols, r.bench_size) for r in rooms)
+    while cap < n_students:   # kapasite yetmiyorsa salonlara sıra ekle
+        rooms = [replace(r, rows=r.rows + len(shapes)) for r in rooms]
+        cap = sum(effective_capacity(r.rows, r.cols, r.bench_size) for r in rooms)
+    nos = [s.no for s in students]
+    front = rnd.sample(nos, min(n_front, len(nos)))
+    forbidden = {tuple(sorted(rnd.sample(nos, 2))) for _ in range(n_students // 10)}
+    return students, rooms, forbidden, front
+
+def main():
+    n_students = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_rooms = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    n_front = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    repeat = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+    students, rooms, forbidden, front = make_exam(n_students, n_rooms, n_front)
+    cap = sum(effective_capacity(r.rows, r.cols, r.bench_size) for r in rooms)
+    print(f"Öğrenci: {n_students} • Salon: {n_rooms} • Kapasite: {cap} • "
+          f"Ön sıra: {len(front)} • Yasak çift: {len(forbidden)}")
+
+    _build_seating_plan(students, rooms, forbidden, front)   # ısınma (kayıt indeksleri)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = _build_seating_plan(students, rooms, forbidden, front)
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    _build_seating_plan(students, rooms, forbidden, front)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Yerleştirme:  en iyi {min(times) * 1000:8.2f} ms • ortanca {sorted(times)[len(times) // 2] * 1000:8.2f} ms "
+          f"• tepe bellek {peak / 2**20:6.1f} MB")
+    print(f"Yerleşen: {res.n_placed} • Boş koltuk: {sum(int((g == SEAT_EMPTY).sum()) for g in res.grids.values())} • "
+          f"Uyarı: {len(res.warnings)} • Hata: {len(res.errors)}")
+
+def batch_main():
+    """
+    Toplu çalıştırma (build_plans_for_department gibi): tüm slot planları bellekte tutulur,
+    kayıt satırları ızgaradan üretilir; Placement nesneleri yalnız tek slot için (UI) kurulur.
+    """
+    n_slots = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    per_slot = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+    exams = [make_exam(per_slot, max(1, per_slot // 150), per_slot // 10, seed=s) for s in range(n_slots)]
+    print(f"Slot: {n_slots} • Slot başına öğrenci: {per_slot}")
+
+    build = lambda: [_build_seating_plan(st, rooms, set(), front) for st, rooms, _, front in exams]
+    build()   # ısınma (kayıt indeksleri, düzen önbellekleri)
+    t0 = time.perf_counter()
+    plans = build()
+    t1 = time.perf_counter()
+    rows = sum(len(p.seat_rows()) for p in plans)
+    t2 = time.perf_counter()
+    ui = plans[0].placements
+    t3 = time.perf_counter()
+
+    del plans
+    tracemalloc.start()   # bellek ayrı ölçülür (izleme süreyi şişirir)
+    plans = build()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Plan üretimi: {(t1 - t0) * 1000:9.1f} ms • {len(plans)} planda tutulan {held / 2**20:6.1f} MB "
+          f"• tepe {peak / 2**20:6.1f} MB")
+    print(f"Kayıt satırı: {(t2 - t1) * 1000:9.1f} ms • {rows} satır")
+    print(f"UI (tek slot Placement): {(t3 - t2) * 1000:6.2f} ms • {len(ui)} yerleşim")
+
+if __name__ == "__main__":
+    batch_main() if len(sys.argv) > 1 and sys.argv[1] == "batch" else main()
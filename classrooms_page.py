@@ -2,14 +2,17 @@
 # Koordinatör: sadece kendi bölümünün dersliklerini görür/işler.
 # - Listeleme + Ekle/Düzenle/Sil
 # - Sağda oturma düzeni önizlemesi (Cols x Rows + grup çizgileri)
+# - Kapalı aralıklar (bakım/etkinlik) Excel'den toplu yüklenir; planlayıcı o saatlerde salonu kullanmaz
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QDialog, QLineEdit, QSpinBox, QLabel, QComboBox, QMessageBox
+    QHeaderView, QDialog, QLineEdit, QSpinBox, QLabel, QComboBox, QMessageBox, QFileDialog
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPainter, QPen
 from auth import get_connection, get_department_name
+from seat_plan_repo import exam_capacity
+from excel_import import load_room_blackouts_from_excel
 
 ROLE_ADMIN = 1
 ROLE_COORDINATOR = 2
@@ -150,11 +153,16 @@ class ClassroomsPage(QWidget):
         self.btn_add  = QPushButton("Ekle");    self.btn_add.clicked.connect(self.add_classroom)
         self.btn_edit = QPushButton("Düzenle"); self.btn_edit.clicked.connect(self.edit_selected)
         self.btn_del  = QPushButton("Sil");     self.btn_del.clicked.connect(self.delete_selected)
+        self.btn_blackouts = QPushButton("Kapalı Aralık Yükle")
+        self.btn_blackouts.setToolTip("Excel: Derslik | Başlangıç | Bitiş | Açıklama")
+        self.btn_blackouts.clicked.connect(self.import_blackouts)
+        btns.addWidget(self.btn_blackouts)
         btns.addStretch(1); btns.addWidget(self.btn_add); btns.addWidget(self.btn_edit); btns.addWidget(self.btn_del)
         inner.addLayout(btns)
 
-        self.tbl = QTableWidget(0, 8)
-        self.tbl.setHorizontalHeaderLabels(["ID","DepartmentID","Kod","Ad","Kapasite","Cols","Rows","Grup"])
+        self.tbl = QTableWidget(0, 9)
+        self.tbl.setHorizontalHeaderLabels(["ID","DepartmentID","Kod","Ad","Kapasite","Cols","Rows","Grup","Sınav Kap."])
+        self.tbl.horizontalHeaderItem(8).setToolTip("Oturma desenine göre sınavda kullanılabilen koltuk sayısı")
         self.tbl.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.tbl.horizontalHeader().setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
         self.tbl.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
@@ -209,7 +217,8 @@ class ClassroomsPage(QWidget):
         self.tbl.setRowCount(0)
         for r in rows:
             row = self.tbl.rowCount(); self.tbl.insertRow(row)
-            vals = [r.ClassroomID, r.DepartmentID, r.Code, r.Name, r.Capacity, r.Cols, r.Rows, r.DeskGroupSize]
+            exam_cap = exam_capacity(r.Capacity, r.Rows, r.Cols, r.DeskGroupSize)
+            vals = [r.ClassroomID, r.DepartmentID, r.Code, r.Name, r.Capacity, r.Cols, r.Rows, r.DeskGroupSize, exam_cap]
             for c, v in enumerate(vals):
                 self.tbl.setItem(row, c, self._center_item(v))
 
@@ -320,3 +329,9 @@ class ClassroomsPage(QWidget):
             if cur.rowcount == 0: warn(self, "Silme başarısız veya yetkiniz yok."); return
             conn.commit()
         info(self, "Derslik silindi."); self.refresh()
+
+    def import_blackouts(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Kapalı Aralık Excel'i Seç", "", "Excel (*.xlsx *.xls)")
+        if not path: return
+        dept = int(self.my_dept) if self.role == ROLE_COORDINATOR and self.my_dept else None
+        load_room_blackouts_from_excel(path, dept, self)
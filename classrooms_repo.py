@@ -0,0 +1,91 @@
+# classrooms_repo.py — derslik kapalı aralıkları (bakım, başka etkinlik, diğer fakülte rezervasyonu)
+from __future__ import annotations
+from typing import List, Dict, Tuple, Optional, Iterable
+from datetime import date, datetime, timedelta
+from collections import defaultdict
+
+from db import get_connection
+
+# Classrooms tablosunun yanında; salonun sınav için kullanılamayacağı [StartDT, EndDT) aralıkları
+BLACKOUT_DDL = """
+IF OBJECT_ID('dbo.ClassroomBlackouts','U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ClassroomBlackouts(
+        BlackoutID   INT IDENTITY(1,1) PRIMARY KEY,
+        ClassroomID  INT           NOT NULL,
+        StartDT      DATETIME2     NOT NULL,
+        EndDT        DATETIME2     NOT NULL,
+        Reason       NVARCHAR(200) NULL,
+        CONSTRAINT CK_ClassroomBlackouts_Range CHECK (EndDT > StartDT)
+    );
+    CREATE INDEX IX_ClassroomBlackouts_Classroom
+        ON dbo.ClassroomBlackouts(ClassroomID, StartDT);
+END
+"""
+
+def ensure_blackout_table(cur) -> None:
+    cur.execute(BLACKOUT_DDL)
+
+def load_blackouts(since: date, until: Optional[date] = None,
+                   classroom_ids: Optional[Iterable[int]] = None
+                   ) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """
+    ClassroomID → başlangıca göre sıralı kapalı aralıklar; yalnız [since, until] ile kesişenler.
+    until=None → since'ten sonraki tüm kayıtlar (senaryo taramasında bitiş tarihi değişebilir).
+    """
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        ensure_blackout_table(cur)
+        conn.commit()
+        sql = "SELECT ClassroomID, StartDT, EndDT FROM dbo.ClassroomBlackouts WHERE EndDT > ?"
+        params: List = [datetime.combine(since, datetime.min.time())]
+        if until is not None:
+            sql += " AND StartDT < ?"
+            params.append(datetime.combine(until + timedelta(days=1), datetime.min.time()))
+        ids = sorted({int(i) for i in classroom_ids}) if classroom_ids is not None else None
+        if ids is not None:
+            if not ids:
+                return {}
+            sql += f" AND ClassroomID IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        cur.execute(sql + " ORDER BY ClassroomID, StartDT", params)
+        out: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+        for rid, s, e in cur.fetchall():
+            out[int(rid)].append((s, e))
+        return dict(out)
+    finally:
+        conn.close()
+
+def replace_blackouts(rows: List[Tuple[int, datetime, datetime, Optional[str]]]) -> Tuple[int, int]:
+    """
+    Toplu içe aktarma: dosyadaki her salonun, dosyanın kapsadığı aralıkla kesişen eski
+    kayıtları silinir, yenileri tek executemany ile yazılır (tek işlem).
+    rows: (ClassroomID, StartDT, EndDT, Reason). Dönüş: (silinen, eklenen).
+    """
+    if not rows:
+        return (0, 0)
+    lo = min(r[1] for r in rows)
+    hi = max(r[2] for r in rows)
+    ids = sorted({int(r[0]) for r in rows})
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        ensure_blackout_table(cur)
+        deleted = 0
+        for i in range(0, len(ids), 500):   # SQL Server parametre sınırı (2100) altında kal
+            chunk = ids[i:i + 500]
+            cur.execute(f"""
+                DELETE FROM dbo.ClassroomBlackouts
+                WHERE ClassroomID IN ({','.join('?' * len(chunk))}) AND StartDT < ? AND EndDT > ?
+            """, (*chunk, hi, lo))
+            deleted += max(0, cur.rowcount or 0)
+        cur.executemany("""
+            INSERT INTO dbo.ClassroomBlackouts(ClassroomID, StartDT, EndDT, Reason)
+            VALUES (?, ?, ?, ?)
+        """, [(int(r), s, e, reason) for r, s, e, reason in rows])
+        conn.commit()
+        return (deleted, len(rows))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog,
     QFrame, QProgressBar, QMessageBox, QSizePolicy
 )
-from excel_import import parse_courses_xlsx, import_courses
+from excel_import import parse_courses_xlsx, import_courses, load_instructor_unavailability_from_excel
 
 
 class CoursesUploadPage(QWidget):
@@ -75,6 +75,11 @@ class CoursesUploadPage(QWidget):
         # Alt satır: buton + progress
         row = QHBoxLayout()
         row.addStretch(1)
+        self.unavail_btn = QPushButton("Öğretim Elemanı Müsaitliği Yükle"); self.unavail_btn.setObjectName("Ghost")
+        self.unavail_btn.setToolTip("Kolonlar: Öğretim Elemanı | Başlangıç | Bitiş | Açıklama\n"
+                                    "Dosyadaki öğretim elemanlarının bu aralıktaki eski kayıtları değiştirilir.")
+        self.unavail_btn.clicked.connect(self._import_unavailability_clicked)
+        row.addWidget(self.unavail_btn)
         self.upload_btn = QPushButton("Excel'den Ders Listesi Yükle"); self.upload_btn.setObjectName("Primary")
         self.upload_btn.clicked.connect(self._start_import_clicked)
         row.addWidget(self.upload_btn)
@@ -108,6 +113,7 @@ class CoursesUploadPage(QWidget):
 
     def _busy(self, on: bool):
         self.prg.setVisible(on); self.upload_btn.setEnabled(not on); self.drop.setEnabled(not on)
+        self.unavail_btn.setEnabled(not on)
 
     # ---- Import ----
     def _start_import_clicked(self):
@@ -120,6 +126,16 @@ class CoursesUploadPage(QWidget):
             return
         self._start_import(self._picked_path, int(dept_id))
 
+    def _import_unavailability_clicked(self):
+        if not self._picked_path:
+            QMessageBox.information(self, "Dosya Seçilmedi", "Lütfen bir Excel dosyası seçin ya da sürükleyin.")
+            return
+        try:
+            self._busy(True)
+            load_instructor_unavailability_from_excel(self._picked_path, self)
+        finally:
+            self._busy(False)
+
     def _start_import(self, path: str, department_id: int):
         try:
             self._busy(True)
@@ -6,7 +6,7 @@ from datetime import date
 from PyQt6.QtCore import Qt, QDate, QSize
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
     QTableWidget, QTableWidgetItem, QAbstractItemView, QMessageBox,
     QDateEdit, QCheckBox, QListWidget, QListWidgetItem, QSpinBox,
     QFileDialog, QComboBox, QLineEdit, QAbstractSpinBox
@@ -17,10 +17,21 @@ from db import get_connection
 
 # Planlama & dışa aktarma + ayrıntılı hata sınıfları
 from scheduler_core import (
-    generate_schedule, Constraints,
+    run_schedule, prepare_problem, solve_problem, ScheduleRun,
+    Constraints, CourseExplain,
     SchedulingError, DateRangeError, ClassroomNotFoundError,
     CapacityError, StudentOverlapError
 )
+from schedule_validator import (
+    Violation, summarize,
+    KIND_OVERLAP, KIND_BUFFER, KIND_ROOM, KIND_CAPACITY, KIND_WEEKDAY, KIND_GROUP, KIND_INSTRUCTOR,
+    KIND_BLACKOUT
+)
+from schedule_explore import explore, VariantResult
+from schedule_service import client_from_env, ScheduleServiceError
+from instructors_repo import course_instructors, load_unavailability
+from classrooms_repo import load_blackouts
+from scenario_sweep_dialog import ScenarioSweepDialog
 from export_excel import export_schedule_to_excel
 from exams_repo import overwrite_and_insert_scoped
 
@@ -53,7 +64,8 @@ class ExamProgramPage(QWidget):
     Sınav Programı Oluştur — başlık butonları ile açılan bölümler:
       1) Ders Seçimi / Süre İstisnaları
          ├─ Süre İstisnaları (Tüm Dersler)
-         └─ Program Dışı (Hariç)
+         ├─ Program Dışı (Hariç)
+         └─ Birlikte Sınav Grupları (Şube / Ortak Ders)
       2) Tarih/Gün
       3) Tür
       4) Süre / Bekleme
@@ -210,6 +222,25 @@ class ExamProgramPage(QWidget):
         self.list_excludes.setUniformItemSizes(True)
         exc.addWidget(self.list_excludes)
 
+        # 1c) Birlikte sınav grupları — seçilen dersler aynı anda sınava alınır
+        self.btn_grp = self._mk_section_button("▸ Birlikte Sınav Grupları (Şube / Ortak Ders)", small=True)
+        self.pnl_grp = self._mk_subcard()
+        sec1v.addWidget(self.btn_grp); sec1v.addWidget(self.pnl_grp)
+
+        grp = QHBoxLayout(self.pnl_grp); grp.setContentsMargins(12, 12, 12, 12); grp.setSpacing(8)
+        self.list_group_pick = QListWidget()
+        self.list_group_pick.setSelectionMode(QAbstractItemView.SelectionMode.MultiSelection)
+        self.list_group_pick.setToolTip("Aynı anda sınavı yapılacak dersleri seçip 'Grupla' deyin")
+        grp_btns = QVBoxLayout()
+        self.btn_group_add = QPushButton("Seçilenleri Grupla →"); self.btn_group_add.setObjectName("Ghost")
+        self.btn_group_del = QPushButton("← Grubu Kaldır"); self.btn_group_del.setObjectName("Ghost")
+        self.btn_group_add.clicked.connect(self._add_exam_group)
+        self.btn_group_del.clicked.connect(self._remove_exam_group)
+        grp_btns.addStretch(1); grp_btns.addWidget(self.btn_group_add); grp_btns.addWidget(self.btn_group_del)
+        grp_btns.addStretch(1)
+        self.list_groups = QListWidget()
+        grp.addWidget(self.list_group_pick, 1); grp.addLayout(grp_btns); grp.addWidget(self.list_groups, 1)
+
         # 2) Tarih / Gün
         self.btn_sec2 = self._mk_section_button("Sınav Tarihleri ve Günleri")
         self.pnl_sec2 = self._mk_section_container()
@@ -244,7 +275,23 @@ class ExamProgramPage(QWidget):
         tlay = QHBoxLayout(self.pnl_sec3); tlay.setContentsMargins(10, 6, 10, 6)
         tlay.addWidget(QLabel("Sınav Türü:"))
         self.cmb_exam_type = QComboBox(); self.cmb_exam_type.addItems(["Vize", "Final", "Bütünleme"])
-        tlay.addWidget(self.cmb_exam_type); tlay.addStretch(1)
+        tlay.addWidget(self.cmb_exam_type)
+
+        # Sıcak başlangıç: önceki dönem programını başlangıç ataması olarak kullan
+        tlay.addSpacing(14)
+        self.chk_warm = QCheckBox("Önceki dönem programından başlat:")
+        self.chk_warm.setToolTip("Seçilen aralıktaki aynı türden sınavlar gün ofseti ve saatiyle yeni aralığa taşınır;\n"
+                                 "yalnızca uymayan dersler yeniden yerleştirilir.")
+        self.warm_start = QDateEdit(); self.warm_start.setCalendarPopup(True)
+        self.warm_end   = QDateEdit(); self.warm_end.setCalendarPopup(True)
+        self.warm_start.setDate(today.addMonths(-6))
+        self.warm_end.setDate(today.addMonths(-6).addDays(7))
+        self.warm_start.setEnabled(False); self.warm_end.setEnabled(False)
+        self.chk_warm.toggled.connect(self.warm_start.setEnabled)
+        self.chk_warm.toggled.connect(self.warm_end.setEnabled)
+        tlay.addWidget(self.chk_warm)
+        tlay.addWidget(self.warm_start); tlay.addWidget(QLabel("—")); tlay.addWidget(self.warm_end)
+        tlay.addStretch(1)
 
         # 4) Süre / Bekleme / Global overlap
         self.btn_sec4 = self._mk_section_button("Sınav Süresi • Bekleme")
@@ -259,27 +306,64 @@ class ExamProgramPage(QWidget):
         blay.addWidget(self.sp_buffer)
         blay.addSpacing(12)
         self.chk_no_overlap = QCheckBox("Sınavlar aynı anda başlamasın (global tek sınav)")
-        blay.addWidget(self.chk_no_overlap); blay.addStretch(1)
+        blay.addWidget(self.chk_no_overlap)
+        blay.addSpacing(12)
+        self.chk_share = QCheckBox("Salon paylaşımı")
+        self.chk_share.setToolTip("Aynı saatte başlayan küçük sınavlar tek salona alınır (salon başına en çok 3 ders);\n"
+                                  "farklı derslerin öğrencileri dönüşümlü koltuklara oturtulur.")
+        blay.addWidget(self.chk_share)
+        blay.addSpacing(12); blay.addWidget(QLabel("Kaba ızgara (dk):"))
+        self.sp_coarse = QSpinBox(); self.sp_coarse.setRange(0, 180); self.sp_coarse.setSingleStep(15)
+        self.sp_coarse.setValue(0); self.sp_coarse.setSpecialValueText("kapalı")
+        self.sp_coarse.setToolTip("Önce bu adımla blok seçilir, sonra blok içinde 15 dk ızgaraya inilir (0 = kapalı)")
+        blay.addWidget(self.sp_coarse)
+        blay.addSpacing(12); blay.addWidget(QLabel("Yöntem:"))
+        self.cmb_strategy = QComboBox()
+        self.cmb_strategy.addItem("Açgözlü", "greedy")
+        self.cmb_strategy.addItem("Açgözlü + Kempe iyileştirme", "kempe")
+        self.cmb_strategy.addItem("Tabu arama", "tabu")
+        blay.addWidget(self.cmb_strategy); blay.addStretch(1)
 
         # actions
         act = QHBoxLayout()
         self.btn_load = QPushButton("Dersleri / Derslikleri Yükle"); self.btn_load.setObjectName("Ghost")
         self.btn_gen  = QPushButton("Programı Oluştur"); self.btn_gen.setObjectName("Primary")
+        self.btn_explore = QPushButton("Alternatifleri Karşılaştır"); self.btn_explore.setObjectName("Ghost")
+        self.btn_explore.setToolTip("Yöntem, bekleme süresi ve ağırlık varyantlarını paralel çözer;\n"
+                                    "gün • salon • öğrenci yayılımı açısından baskın olmayanları listeler.")
+        self.btn_sweep = QPushButton("Senaryoları Dene"); self.btn_sweep.setObjectName("Ghost")
+        self.btn_sweep.setToolTip("Gün sayısı, hariç günler, bekleme, süre ve global tek sınav\n"
+                                  "birleşimlerinin hangilerinde program kurulabildiğini gösterir.")
         self.btn_xls  = QPushButton("Excel'e Aktar"); self.btn_xls.setObjectName("Ghost"); self.btn_xls.setEnabled(False)
-        act.addWidget(self.btn_load); act.addStretch(1); act.addWidget(self.btn_gen); act.addWidget(self.btn_xls)
+        act.addWidget(self.btn_load); act.addStretch(1); act.addWidget(self.btn_sweep); act.addWidget(self.btn_explore)
+        act.addWidget(self.btn_gen); act.addWidget(self.btn_xls)
         cv.addLayout(act)
 
         root.addWidget(card)
 
+        # Alternatifler (Pareto önü) — çift tıklanan varyant sonuç tablosuna alınır
+        self.tbl_variants = QTableWidget(0, 7)
+        self.tbl_variants.setHorizontalHeaderLabels(["Önde", "Varyant", "Gün", "Salon", "Yayılım", "Boş Koltuk", "Süre (sn)"])
+        self.tbl_variants.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tbl_variants.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tbl_variants.setMaximumHeight(220)
+        self.tbl_variants.setVisible(False)
+        root.addWidget(self.tbl_variants)
+
         # Sonuç tablosu
         self.tbl = QTableWidget(0, 8)
         self.tbl.setHorizontalHeaderLabels(["Tarih", "Başlangıç", "Bitiş", "Ders Kodu", "Ders Adı", "Derslik", "Sınav Türü", "Süre (dk)"])
         self.tbl.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tbl.setToolTip("Satıra çift tıklayın: dersin neden bu slota yerleştiğini gösterir")
         root.addWidget(self.tbl)
 
         # Sinyaller
         self.btn_load.clicked.connect(self._load_data)
         self.btn_gen.clicked.connect(self._generate)
+        self.btn_explore.clicked.connect(self._explore)
+        self.btn_sweep.clicked.connect(self._sweep)
+        self.tbl_variants.cellDoubleClicked.connect(self._pick_variant)
+        self.tbl.cellDoubleClicked.connect(self._show_explain)
         self.btn_xls.clicked.connect(self._export_excel)
         self.ed_search_dur.textChanged.connect(self._filter_dur)
         self.ed_search_exc.textChanged.connect(self._filter_exc)
@@ -288,9 +372,12 @@ class ExamProgramPage(QWidget):
         self._courses_cache: List[Dict[str, Any]] = []
         self._classrooms_cache: List[Dict[str, Any]] = []
         self._schedule: List[Dict[str, Any]] = []
+        self._variants: List[VariantResult] = []
+        self._explain: Dict[int, CourseExplain] = {}
         self._sp_by_cid: Dict[int, QSpinBox] = {}      # ders -> spin
         self._row_by_cid: Dict[int, QFrame] = {}       # ders -> satır widget
         self._excluded_ids: Set[int] = set()
+        self._exam_groups: List[List[int]] = []        # birlikte sınav grupları (CourseID listeleri)
 
         # Başlangıçta açık kalsın
         self.btn_sec1.setChecked(True); self.pnl_sec1.setVisible(True)
@@ -384,9 +471,16 @@ class ExamProgramPage(QWidget):
             ]
             conn.close()
 
+            # Öğretim elemanı bağlantısı (müsaitlik takvimi için)
+            instr = course_instructors(dept_id)
+            for c in self._courses_cache:
+                if c["CourseID"] in instr:
+                    c["InstructorID"] = instr[c["CourseID"]]
+
             # Panelleri doldur
             self._fill_durations_panel()
             self._fill_excludes_panel()
+            self._fill_groups_panel()
             self._refresh_counters()
 
             QMessageBox.information(self, "Yüklendi",
@@ -499,6 +593,47 @@ class ExamProgramPage(QWidget):
                 self._paint_selected(it, False)
         self._refresh_counters()
 
+    def _fill_groups_panel(self):
+        self.list_group_pick.clear()
+        known = {int(c["CourseID"]) for c in self._courses_cache}
+        for c in self._courses_cache:
+            it = QListWidgetItem(f"{c['CourseCode']} — {c['CourseName']}")
+            it.setData(Qt.ItemDataRole.UserRole, int(c["CourseID"]))
+            self.list_group_pick.addItem(it)
+        # bölüm değişince artık olmayan dersler gruplardan düşer
+        self._exam_groups = [g for g in ([cid for cid in g if cid in known] for g in self._exam_groups) if len(g) > 1]
+        self._render_groups()
+
+    def _render_groups(self):
+        codes = {int(c["CourseID"]): str(c["CourseCode"]) for c in self._courses_cache}
+        self.list_groups.clear()
+        for g in self._exam_groups:
+            it = QListWidgetItem(" + ".join(codes.get(cid, str(cid)) for cid in g))
+            self.list_groups.addItem(it)
+
+    def _add_exam_group(self):
+        ids = [int(it.data(Qt.ItemDataRole.UserRole)) for it in self.list_group_pick.selectedItems()]
+        if len(ids) < 2:
+            QMessageBox.information(self, "Bilgi", "Grup için en az iki ders seçin.")
+            return
+        # ortak dersi olan gruplar planlayıcıda zaten birleşir; listede de tek grup gösterilir
+        merged = set(ids)
+        rest = []
+        for g in self._exam_groups:
+            if merged & set(g):
+                merged |= set(g)
+            else:
+                rest.append(g)
+        self._exam_groups = rest + [sorted(merged)]
+        self.list_group_pick.clearSelection()
+        self._render_groups()
+
+    def _remove_exam_group(self):
+        row = self.list_groups.currentRow()
+        if 0 <= row < len(self._exam_groups):
+            del self._exam_groups[row]
+            self._render_groups()
+
     def _clear_overrides(self):
         for sp in self._sp_by_cid.values():
             sp.setValue(0)
@@ -554,6 +689,30 @@ class ExamProgramPage(QWidget):
             if v > 0:
                 overrides[int(cid)] = v
 
+        # Öğretim elemanı kapalı aralıkları (bitiş sınırsız: senaryo taraması aralığı uzatabilir)
+        instructor_ids = {int(c["InstructorID"]) for c in chosen if c.get("InstructorID") is not None}
+        try:
+            unavailable = load_unavailability(sd, instructor_ids=instructor_ids) if instructor_ids else {}
+        except Exception as e:
+            QMessageBox.warning(self, "Uyarı", f"Öğretim elemanı müsaitlikleri okunamadı; dikkate alınmayacak.\n{e}")
+            unavailable = {}
+
+        # Derslik kapalı aralıkları: salonlar listeden çıkarılmaz, planlayıcı o saatlerde kullanmaz
+        try:
+            blackouts = load_blackouts(sd, classroom_ids=[int(r["ClassroomID"]) for r in self._classrooms_cache])
+        except Exception as e:
+            QMessageBox.warning(self, "Uyarı", f"Derslik kapalı aralıkları okunamadı; dikkate alınmayacak.\n{e}")
+            blackouts = {}
+
+        warm = None
+        if self.chk_warm.isChecked():
+            ws = self.warm_start.date().toPyDate()
+            we = self.warm_end.date().toPyDate()
+            if we < ws:
+                QMessageBox.warning(self, "Uyarı", "Önceki dönem bitiş tarihi başlangıçtan önce olamaz.")
+                return None
+            warm = (ws, we)
+
         return Constraints(
             department_id=int(dept_id),
             date_start=sd, date_end=ed,
@@ -561,11 +720,45 @@ class ExamProgramPage(QWidget):
             default_duration_min=self.sp_duration.value(),
             buffer_min=self.sp_buffer.value(),
             global_no_overlap=self.chk_no_overlap.isChecked(),
+            room_share_max=(3 if self.chk_share.isChecked() else 1),
+            coarse_step_min=(self.sp_coarse.value() or None),
+            strategy=str(self.cmb_strategy.currentData() or "greedy"),
             chosen_courses=chosen,
             exam_type=self.cmb_exam_type.currentText(),
-            per_course_durations=overrides
+            per_course_durations=overrides,
+            warm_start_from=warm,
+            exam_groups=[list(g) for g in self._exam_groups] or None,
+            instructor_unavailability=unavailable or None,
+            room_blackouts=blackouts or None
         )
 
+    def _run_schedule(self, cons: Constraints) -> ScheduleRun:
+        """
+        SCHEDULE_SERVICE_URL tanımlıysa problem burada hazırlanır, çözüm planlama hizmetinde yapılır;
+        hizmete ulaşılamazsa aynı problem yerelde çözülür.
+        """
+        client = client_from_env()
+        if client is None:
+            return run_schedule(cons, self._classrooms_cache)
+        problem, previous = prepare_problem(cons, self._classrooms_cache)
+
+        def progress(done: int, total: int):
+            self.btn_gen.setText(f"Planlanıyor… {done}/{total}")
+            QApplication.processEvents()
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self.btn_gen.setEnabled(False)
+        try:
+            return client.run(cons, problem, previous, progress=progress)
+        except ScheduleServiceError as e:
+            QMessageBox.warning(self, "Planlama Hizmeti",
+                                f"{e}\nProgram bu bilgisayarda hesaplanacak.")
+            return solve_problem(cons, problem, previous)
+        finally:
+            QApplication.restoreOverrideCursor()
+            self.btn_gen.setEnabled(True)
+            self.btn_gen.setText("Programı Oluştur")
+
     def _generate(self):
         if not self._courses_cache or not self._classrooms_cache:
             QMessageBox.information(self, "Bilgi", "Önce 'Dersleri / Derslikleri Yükle' butonuna tıklayın.")
@@ -576,34 +769,20 @@ class ExamProgramPage(QWidget):
             return
 
         try:
-            # scheduler_core beklediği şekilde çağrılıyor
-            sched = generate_schedule(cons, self._classrooms_cache)
+            # scheduler_core beklediği şekilde çağrılıyor (hizmet tanımlıysa orada çözülür)
+            run = self._run_schedule(cons)
+            sched = run.rows
+            self._explain = run.explain
 
             self._schedule = sched
             self._render_table(sched)
             self.btn_xls.setEnabled(len(sched) > 0)
 
+            if run.violations:
+                self._warn_violations(run.violations)
+
             if sched:
-                dept_id = int(self._selected_dept_id() or 0)
-                reply = QMessageBox.question(
-                    self,
-                    "Veritabanı Kaydı",
-                    (f"Oluşturulan {cons.exam_type} programını veritabanına kaydedeyim mi?\n"
-                     f"Not: SADECE bu bölüm için {cons.date_start}–{cons.date_end} aralığındaki "
-                     f"{cons.exam_type} kayıtları silinip yeniden yazılacak."),
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.Yes,
-                )
-                if reply == QMessageBox.StandardButton.Yes:
-                    inserted = overwrite_and_insert_scoped(
-                        department_id=dept_id,
-                        exam_type=cons.exam_type,
-                        date_start=cons.date_start,
-                        date_end=cons.date_end,
-                        rows=sched,
-                    )
-                    QMessageBox.information(self, "Kayıt",
-                                            f"Veritabanına yazıldı: {inserted} satır (diğer bölümlere dokunulmadı).")
+                self._offer_save(cons, sched)
 
             # Özet
             unique_courses = {int(r["CourseID"]) for r in sched}
@@ -661,7 +840,7 @@ class ExamProgramPage(QWidget):
             reason_map = {
                 "global_no_overlap_occupied": "Global tek sınav kısıtı yüzünden tüm slotlar dolu.",
                 "no_compatible_slot": "Seçilen tarih/günler ve süreler içinde uygun slot yok.",
-                "no_room_bundle": "Derslik kapasite demeti oluşturulamadı.",
+                "no_room_bundle": "Öğrenci açısından uygun slotlarda yeterli boş derslik kalmadı.",
             }
             d = getattr(e, "details", None) or {}
             reason = reason_map.get(d.get("reason", ""), "")
@@ -681,6 +860,173 @@ class ExamProgramPage(QWidget):
             QMessageBox.critical(self, "Hata", f"Program oluşturulamadı:\n{e}")
             self._schedule = []; self._render_table([]); self.btn_xls.setEnabled(False)
 
+    def _warn_violations(self, violations: List[Violation]):
+        kind_names = {
+            KIND_OVERLAP: "Öğrenci çakışması",
+            KIND_BUFFER: "Bekleme süresi ihlali",
+            KIND_ROOM: "Salon çift rezervasyonu",
+            KIND_CAPACITY: "Kapasite yetersizliği",
+            KIND_WEEKDAY: "Hariç gün",
+            KIND_GROUP: "Birlikte sınav grubu bölünmüş",
+            KIND_INSTRUCTOR: "Öğretim elemanı müsait değil",
+            KIND_BLACKOUT: "Derslik kapalı",
+        }
+        lines = ["Doğrulama programda sorun buldu:"]
+        for kind, cnt in summarize(violations).items():
+            lines.append(f"  • {kind_names.get(kind, kind)}: {cnt}")
+        lines.append("")
+        lines.extend([f"  – {v.message}" for v in violations[:8]])
+        if len(violations) > 8:
+            lines.append("  – … (liste kısaltıldı)")
+        QMessageBox.warning(self, "Doğrulama", "\n".join(lines))
+
+    def _offer_save(self, cons: Constraints, sched: List[Dict[str, Any]]):
+        dept_id = int(self._selected_dept_id() or 0)
+        reply = QMessageBox.question(
+            self,
+            "Veritabanı Kaydı",
+            (f"Oluşturulan {cons.exam_type} programını veritabanına kaydedeyim mi?\n"
+             f"Not: SADECE bu bölüm için {cons.date_start}–{cons.date_end} aralığındaki "
+             f"{cons.exam_type} kayıtları silinip yeniden yazılacak."),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            inserted = overwrite_and_insert_scoped(
+                department_id=dept_id,
+                exam_type=cons.exam_type,
+                date_start=cons.date_start,
+                date_end=cons.date_end,
+                rows=sched,
+            )
+            QMessageBox.information(self, "Kayıt",
+                                    f"Veritabanına yazıldı: {inserted} satır (diğer bölümlere dokunulmadı).")
+
+    # ───────────────────────── alternatifler ─────────────────────────
+    def _explore(self):
+        if not self._courses_cache or not self._classrooms_cache:
+            QMessageBox.information(self, "Bilgi", "Önce 'Dersleri / Derslikleri Yükle' butonuna tıklayın.")
+            return
+        cons = self._gather_constraints()
+        if not cons:
+            return
+
+        def progress(done: int, total: int):
+            self.btn_explore.setText(f"Karşılaştırılıyor… {done}/{total}")
+            QApplication.processEvents()
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self.btn_explore.setEnabled(False)
+        try:
+            self._variants = explore(cons, self._classrooms_cache, progress=progress)
+        except SchedulingError as e:
+            QMessageBox.critical(self, "Hata", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Alternatifler oluşturulamadı:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+            self.btn_explore.setEnabled(True)
+            self.btn_explore.setText("Alternatifleri Karşılaştır")
+
+        self._render_variants(self._variants)
+        if not any(v.ok for v in self._variants):
+            QMessageBox.warning(self, "Uyarı", "Hiçbir varyant kısıtlara uygun program üretemedi.")
+
+    def _sweep(self):
+        if not self._courses_cache or not self._classrooms_cache:
+            QMessageBox.information(self, "Bilgi", "Önce 'Dersleri / Derslikleri Yükle' butonuna tıklayın.")
+            return
+        cons = self._gather_constraints()
+        if not cons:
+            return
+        dlg = ScenarioSweepDialog(cons, self._classrooms_cache, self)
+        if not dlg.exec() or dlg.chosen is None:
+            return
+        # seçilen senaryonun parametreleri sayfaya uygulanır; program "Programı Oluştur" ile kurulur
+        _, excl, buf, dur, gno = dlg.chosen.key
+        end = dlg.chosen.date_end
+        self.end_date.setDate(QDate(end.year, end.month, end.day))
+        for wd, cb in self.chk_days.items():
+            cb.setChecked(wd in excl)
+        self.sp_buffer.setValue(int(buf))
+        self.sp_duration.setValue(int(dur))
+        self.chk_no_overlap.setChecked(bool(gno))
+
+    def _render_variants(self, results: List[VariantResult]):
+        self.tbl_variants.setRowCount(0)
+        for res in results:
+            i = self.tbl_variants.rowCount()
+            self.tbl_variants.insertRow(i)
+            m = res.metrics
+            cells = [
+                "★" if res.pareto else ("" if res.ok else "✗"),
+                res.variant.label if res.ok else f"{res.variant.label} — {res.error}",
+                str(m.get("days", "")), str(m.get("rooms", "")),
+                str(m.get("spread", "")), str(m.get("waste", "")),
+                f"{res.elapsed_s:.1f}",
+            ]
+            for col, text in enumerate(cells):
+                it = QTableWidgetItem(text)
+                if res.pareto:
+                    it.setBackground(QColor(SUCCESS_BG))
+                self.tbl_variants.setItem(i, col, it)
+        self.tbl_variants.resizeColumnsToContents()
+        self.tbl_variants.setVisible(bool(results))
+
+    def _pick_variant(self, row: int, _col: int):
+        if not (0 <= row < len(self._variants)):
+            return
+        res = self._variants[row]
+        if not res.rows:
+            return
+        self._schedule = res.rows
+        self._explain = {}
+        self._render_table(res.rows)
+        self.btn_xls.setEnabled(True)
+        cons = self._gather_constraints()
+        if cons:
+            try:
+                self._offer_save(cons, res.rows)
+            except Exception as e:
+                QMessageBox.critical(self, "Hata", f"Kayıt yapılamadı:\n{e}")
+
+    def _show_explain(self, row: int, _col: int):
+        if not (0 <= row < len(self._schedule)):
+            return
+        r = self._schedule[row]
+        ex = self._explain.get(int(r["CourseID"]))
+        if ex is None:
+            QMessageBox.information(self, "Açıklama", "Bu program için yerleştirme izi yok.")
+            return
+        reason_names = {
+            "global": "Global tek sınav kısıtı",
+            "same_time": "Öğrenci aynı anda başka sınavda",
+            "buffer": "Bekleme süresi",
+            "day_target": "Günlük sınıf hedefi dolu (gün)",
+            "room_capacity": "Boş koltuk yetersiz",
+            "room_bundle": "Boş salon demeti kurulamadı",
+            "instructor": "Öğretim elemanı müsait değil",
+        }
+        via_names = {"hint": "önceki dönem ipucu", "target": "gün hedefi içinde",
+                     "over_target": "gün hedefi aşılarak"}
+        lines = [f"{r['CourseCode']} — {r['CourseName']}",
+                 f"Yerleşim: {r['Date']:%Y-%m-%d} {r['Start']:%H:%M}",
+                 f"Yol: {via_names.get(ex.via, ex.via or '-')}",
+                 f"İncelenen aday slot: {ex.examined} • Seçilen sıra: {ex.rank}",
+                 "", "Elenen adaylar:"]
+        for key, cnt in ex.as_dict().items():
+            if cnt:
+                lines.append(f"  • {reason_names.get(key, key)}: {cnt}")
+        if not any(ex.rejected):
+            lines.append("  • (yok)")
+        if ex.chosen and ex.chosen != (r["Date"], r["Start"]):
+            d, t = ex.chosen
+            lines.append("")
+            lines.append(f"Not: açgözlü aşama {d:%Y-%m-%d} {t:%H:%M} seçmişti; iyileştirici taşıdı.")
+        QMessageBox.information(self, "Yerleştirme Açıklaması", "\n".join(lines))
+
     # ───────────────────────── render & export ─────────────────────────
     def _render_table(self, rows: List[Dict[str, Any]]):
         self.tbl.setRowCount(0)
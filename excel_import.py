@@ -5,6 +5,8 @@ from typing import Optional, Tuple, Dict, Any, List, Iterable
 import pandas as pd
 from PyQt6.QtWidgets import QMessageBox
 from db import get_connection
+from instructors_repo import replace_unavailability
+from classrooms_repo import replace_blackouts
 
 # ----------------- Genel yardımcılar -----------------
 ALLOWED_CLASSES = {1, 2, 3, 4, 5, 6, 7}
@@ -143,6 +145,50 @@ def parse_student_enrollments_xlsx(xlsx_path: str) -> pd.DataFrame:
     # Sınıf boşsa course kodundan yine türetebiliriz; ama burada genelde gerekmez.
     return out
 
+# ----------------- Kapalı Aralık Parser'ları -----------------
+def _parse_interval_sheet(xlsx_path: str, key_col: str, out_col: str) -> pd.DataFrame:
+    """
+    İlk sayfa. Kolonlar: <key_col> | Başlangıç | Bitiş | Açıklama (opsiyonel)
+    Saatsiz bitiş o günün tamamını kapsar (ertesi gün 00:00'a kadar).
+    Çıktı: <out_col>, StartDT, EndDT, Reason, Row (Excel satır no)
+    """
+    df = pd.read_excel(xlsx_path, sheet_name=0)
+    keymap = {str(c).strip().lower(): c for c in df.columns}
+    need = [key_col, "başlangıç", "bitiş"]
+    for k in need:
+        if k not in keymap:
+            raise ValueError(f"Excel'de beklenen kolon yok: {k}")
+
+    start = pd.to_datetime(df[keymap["başlangıç"]], errors="coerce", dayfirst=True)
+    end = pd.to_datetime(df[keymap["bitiş"]], errors="coerce", dayfirst=True)
+    whole_day = end.notna() & (end == end.dt.normalize())
+    end = end.where(~whole_day, end + pd.Timedelta(days=1))
+
+    out = pd.DataFrame({
+        out_col: df[keymap[key_col]].apply(_norm),
+        "StartDT": start,
+        "EndDT": end,
+        "Reason": df[keymap["açıklama"]].apply(_norm) if "açıklama" in keymap else "",
+        "Row": df.index + 2,
+    })
+    return out[out[out_col] != ""].reset_index(drop=True)
+
+def parse_instructor_unavailability_xlsx(xlsx_path: str) -> pd.DataFrame:
+    """
+    Kolonlar: Öğretim Elemanı | Başlangıç | Bitiş | Açıklama (opsiyonel)
+      - Öğretim Elemanı: ad soyad (Instructors.Name) ya da e-posta (Instructors.Email)
+    Çıktı: Instructor, StartDT, EndDT, Reason, Row
+    """
+    return _parse_interval_sheet(xlsx_path, "öğretim elemanı", "Instructor")
+
+def parse_room_blackouts_xlsx(xlsx_path: str) -> pd.DataFrame:
+    """
+    Kolonlar: Derslik | Başlangıç | Bitiş | Açıklama (opsiyonel)
+      - Derslik: kod (Classrooms.Code) ya da ad (Classrooms.Name)
+    Çıktı: Classroom, StartDT, EndDT, Reason, Row
+    """
+    return _parse_interval_sheet(xlsx_path, "derslik", "Classroom")
+
 # ----------------- DB Yardımcıları -----------------
 def _resolve_instructor_id_by_name(cur, instr_name: str) -> Optional[int]:
     """Instructors.Name ile birebir eşleşme; bulunamazsa None döner."""
@@ -363,6 +409,72 @@ def import_student_enrollments(df: pd.DataFrame, department_id: Optional[int]) -
         conn.commit()
     return (stu_up, sc_ins, miss)
 
+def import_instructor_unavailability(df: pd.DataFrame) -> Tuple[int, int, List[str]]:
+    """
+    Öğretim elemanları tek sorguda ad/e-posta → InstructorID sözlüğüne alınır, satırlar
+    instructors_repo.replace_unavailability ile toplu yazılır.
+    Döner: (silinen eski kayıt, eklenen kayıt, sorunlu satır açıklamaları)
+    """
+    if df.empty:
+        return (0, 0, [])
+    by_key: Dict[str, int] = {}
+    with get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT InstructorID, Name, Email FROM dbo.Instructors")
+        for iid, name, email in cur.fetchall():
+            for key in (name, email):
+                if key:
+                    by_key.setdefault(_norm(key).lower(), int(iid))
+
+    rows: List[Tuple[int, Any, Any, Optional[str]]] = []
+    problems: List[str] = []
+    for r in df.itertuples(index=False):
+        iid = by_key.get(r.Instructor.lower())
+        if iid is None:
+            problems.append(f"Satır {r.Row}: öğretim elemanı bulunamadı ({r.Instructor})")
+            continue
+        if pd.isna(r.StartDT) or pd.isna(r.EndDT) or r.EndDT <= r.StartDT:
+            problems.append(f"Satır {r.Row}: geçersiz tarih aralığı")
+            continue
+        rows.append((iid, r.StartDT.to_pydatetime(), r.EndDT.to_pydatetime(), r.Reason or None))
+    deleted, inserted = replace_unavailability(rows)
+    return (deleted, inserted, problems)
+
+def import_room_blackouts(df: pd.DataFrame, department_id: Optional[int]) -> Tuple[int, int, List[str]]:
+    """
+    Bölümün derslikleri tek sorguda kod/ad → ClassroomID sözlüğüne alınır, satırlar
+    classrooms_repo.replace_blackouts ile toplu yazılır.
+    Döner: (silinen eski kayıt, eklenen kayıt, sorunlu satır açıklamaları)
+    """
+    if df.empty:
+        return (0, 0, [])
+    by_key: Dict[str, int] = {}
+    with get_connection() as conn:
+        cur = conn.cursor()
+        if department_id is None:
+            cur.execute("SELECT ClassroomID, Code, Name FROM dbo.Classrooms")
+        else:
+            cur.execute("SELECT ClassroomID, Code, Name FROM dbo.Classrooms WHERE DepartmentID = ?",
+                        (int(department_id),))
+        for rid, code, name in cur.fetchall():
+            for key in (code, name):
+                if key:
+                    by_key.setdefault(_norm(key).lower(), int(rid))
+
+    rows: List[Tuple[int, Any, Any, Optional[str]]] = []
+    problems: List[str] = []
+    for r in df.itertuples(index=False):
+        rid = by_key.get(r.Classroom.lower())
+        if rid is None:
+            problems.append(f"Satır {r.Row}: derslik bulunamadı ({r.Classroom})")
+            continue
+        if pd.isna(r.StartDT) or pd.isna(r.EndDT) or r.EndDT <= r.StartDT:
+            problems.append(f"Satır {r.Row}: geçersiz tarih aralığı")
+            continue
+        rows.append((rid, r.StartDT.to_pydatetime(), r.EndDT.to_pydatetime(), r.Reason or None))
+    deleted, inserted = replace_blackouts(rows)
+    return (deleted, inserted, problems)
+
 # ----------------- PyQt bağlayıcıları -----------------
 def load_courses_from_excel(xlsx_path: str, department_id: Optional[int], parent=None) -> None:
     try:
@@ -389,3 +501,33 @@ def load_student_list_from_excel(xlsx_path: str, department_id: Optional[int], p
         QMessageBox.information(parent, "Öğrenci Yükleme", msg)
     except Exception as e:
         QMessageBox.critical(parent, "Hata", f"Öğrenci listesi yüklenemedi:\n{e}")
+
+def load_instructor_unavailability_from_excel(xlsx_path: str, parent=None) -> None:
+    try:
+        df = parse_instructor_unavailability_xlsx(xlsx_path)
+        if df.empty:
+            QMessageBox.information(parent, "Müsaitlik Yükleme", "Excel'de kapalı aralık satırı bulunamadı."); return
+        deleted, inserted, problems = import_instructor_unavailability(df)
+        msg = f"Tamamlandı.\nEklenen kapalı aralık: {inserted}\nYerine yazılan eski kayıt: {deleted}"
+        if problems:
+            msg += f"\nAtlanan satır: {len(problems)}\n" + "\n".join(problems[:10])
+            if len(problems) > 10:
+                msg += "\n…"
+        QMessageBox.information(parent, "Müsaitlik Yükleme", msg)
+    except Exception as e:
+        QMessageBox.critical(parent, "Hata", f"Müsaitlik takvimi yüklenemedi:\n{e}")
+
+def load_room_blackouts_from_excel(xlsx_path: str, department_id: Optional[int], parent=None) -> None:
+    try:
+        df = parse_room_blackouts_xlsx(xlsx_path)
+        if df.empty:
+            QMessageBox.information(parent, "Derslik Kapalı Aralıkları", "Excel'de kapalı aralık satırı bulunamadı."); return
+        deleted, inserted, problems = import_room_blackouts(df, department_id)
+        msg = f"Tamamlandı.\nEklenen kapalı aralık: {inserted}\nYerine yazılan eski kayıt: {deleted}"
+        if problems:
+            msg += f"\nAtlanan satır: {len(problems)}\n" + "\n".join(problems[:10])
+            if len(problems) > 10:
+                msg += "\n…"
+        QMessageBox.information(parent, "Derslik Kapalı Aralıkları", msg)
+    except Exception as e:
+        QMessageBox.critical(parent, "Hata", f"Derslik kapalı aralıkları yüklenemedi:\n{e}")
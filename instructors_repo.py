@@ -0,0 +1,109 @@
+# instructors_repo.py — öğretim elemanı müsaitlik takvimi (kapalı aralıklar)
+from __future__ import annotations
+from typing import List, Dict, Tuple, Optional, Iterable
+from datetime import date, datetime, timedelta
+from collections import defaultdict
+
+from db import get_connection
+
+# Instructors tablosunun yanında; bir öğretim elemanının sınav veremeyeceği [StartDT, EndDT) aralıkları
+UNAVAILABILITY_DDL = """
+IF OBJECT_ID('dbo.InstructorUnavailability','U') IS NULL
+BEGIN
+    CREATE TABLE dbo.InstructorUnavailability(
+        UnavailabilityID INT IDENTITY(1,1) PRIMARY KEY,
+        InstructorID     INT           NOT NULL,
+        StartDT          DATETIME2     NOT NULL,
+        EndDT            DATETIME2     NOT NULL,
+        Reason           NVARCHAR(200) NULL,
+        CONSTRAINT CK_InstructorUnavailability_Range CHECK (EndDT > StartDT)
+    );
+    CREATE INDEX IX_InstructorUnavailability_Instructor
+        ON dbo.InstructorUnavailability(InstructorID, StartDT);
+END
+"""
+
+def ensure_unavailability_table(cur) -> None:
+    cur.execute(UNAVAILABILITY_DDL)
+
+def course_instructors(department_id: int) -> Dict[int, int]:
+    """CourseID → InstructorID (Courses.InstructorID kolonu yoksa boş sözlük)."""
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA='dbo' AND TABLE_NAME='Courses' AND COLUMN_NAME='InstructorID'
+        """)
+        if not cur.fetchone():
+            return {}
+        cur.execute("""
+            SELECT CourseID, InstructorID FROM dbo.Courses
+            WHERE DepartmentID = ? AND InstructorID IS NOT NULL
+        """, (int(department_id),))
+        return {int(r[0]): int(r[1]) for r in cur.fetchall()}
+    finally:
+        conn.close()
+
+def load_unavailability(since: date, until: Optional[date] = None,
+                        instructor_ids: Optional[Iterable[int]] = None
+                        ) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """
+    InstructorID → başlangıca göre sıralı kapalı aralıklar; yalnız [since, until] ile kesişenler.
+    until=None → since'ten sonraki tüm kayıtlar (senaryo taramasında bitiş tarihi değişebilir).
+    """
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        ensure_unavailability_table(cur)
+        conn.commit()
+        sql = "SELECT InstructorID, StartDT, EndDT FROM dbo.InstructorUnavailability WHERE EndDT > ?"
+        params: List = [datetime.combine(since, datetime.min.time())]
+        if until is not None:
+            sql += " AND StartDT < ?"
+            params.append(datetime.combine(until + timedelta(days=1), datetime.min.time()))
+        ids = sorted({int(i) for i in instructor_ids}) if instructor_ids is not None else None
+        if ids is not None:
+            if not ids:
+                return {}
+            sql += f" AND InstructorID IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        cur.execute(sql + " ORDER BY InstructorID, StartDT", params)
+        out: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+        for iid, s, e in cur.fetchall():
+            out[int(iid)].append((s, e))
+        return dict(out)
+    finally:
+        conn.close()
+
+def replace_unavailability(rows: List[Tuple[int, datetime, datetime, Optional[str]]]) -> Tuple[int, int]:
+    """
+    Toplu içe aktarma: dosyadaki her öğretim elemanının, dosyanın kapsadığı aralıkla kesişen
+    eski kayıtları silinir, yenileri tek executemany ile yazılır (tek işlem).
+    rows: (InstructorID, StartDT, EndDT, Reason). Dönüş: (silinen, eklenen).
+    """
+    if not rows:
+        return (0, 0)
+    lo = min(r[1] for r in rows)
+    hi = max(r[2] for r in rows)
+    ids = sorted({int(r[0]) for r in rows})
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        ensure_unavailability_table(cur)
+        deleted = 0
+        for i in range(0, len(ids), 500):   # SQL Server parametre sınırı (2100) altında kal
+            chunk = ids[i:i + 500]
+            cur.execute(f"""
+                DELETE FROM dbo.InstructorUnavailability
+                WHERE InstructorID IN ({','.join('?' * len(chunk))}) AND StartDT < ? AND EndDT > ?
+            """, (*chunk, hi, lo))
+            deleted += max(0, cur.rowcount or 0)
+        cur.executemany("""
+            INSERT INTO dbo.InstructorUnavailability(InstructorID, StartDT, EndDT, Reason)
+            VALUES (?, ?, ?, ?)
+        """, [(int(i), s, e, reason) for i, s, e, reason in rows])
+        conn.commit()
+        return (deleted, len(rows))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,182 @@
+# scenario_sweep_dialog.py — parametre ızgarasında toplu uygunluk taraması
+from __future__ import annotations
+
+from typing import List, Optional, Dict, Any
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import (
+    QApplication, QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
+    QCheckBox, QPushButton, QTableWidget, QTableWidgetItem, QAbstractItemView, QMessageBox
+)
+
+from scheduler_core import Constraints, SchedulingError
+from schedule_explore import SweepGrid, ScenarioCell, sweep
+
+MAX_SCENARIOS = 240   # bundan büyük ızgara için onay istenir
+
+def _parse_ints(text: str, lo: int, hi: int, name: str) -> List[int]:
+    """'5, 7 ,10' → [5, 7, 10]; boş metin → [] (temel değer kullanılır)."""
+    out: List[int] = []
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit() or not (lo <= int(part) <= hi):
+            raise ValueError(f"{name}: '{part}' geçersiz ({lo}–{hi} arası tam sayı girin).")
+        if int(part) not in out:
+            out.append(int(part))
+    return out
+
+class ScenarioSweepDialog(QDialog):
+    """
+    Gün sayısı × hariç günler × bekleme × süre × global tek sınav ızgarasını çözer.
+    Çift tıklanan uygun senaryo self.chosen'a yazılır ve diyalog kabul edilir.
+    """
+    def __init__(self, cons: Constraints, classrooms: List[Dict[str, Any]], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Senaryo Taraması")
+        self.cons = cons
+        self.classrooms = classrooms
+        self.cells: List[ScenarioCell] = []
+        self.chosen: Optional[ScenarioCell] = None
+
+        self.setStyleSheet("""
+            QDialog { background:#FFFFFF; }
+            QLabel#Title { font-size:18px; font-weight:800; color:#0B1324; }
+            QLabel#Subtitle { color:#6B7280; }
+            QPushButton#Primary {
+                background:#16A34A; color:white; border:none; border-radius:10px;
+                font-weight:700; padding:10px 16px;
+            }
+            QPushButton#Primary:disabled { background:#9CA3AF; }
+            QPushButton#Ghost {
+                background:#F3F4F6; color:#111827; border:1px solid #E5E7EB;
+                border-radius:10px; padding:8px 12px; font-weight:600;
+            }
+            QLineEdit { border:1px solid #E5E7EB; border-radius:8px; padding:6px 8px; }
+            QTableWidget { gridline-color:#E5E7EB; alternate-background-color:#FAFAFB; }
+            QHeaderView::section { background:#EEF2FF; color:#1E3A8A; border:none; padding:8px; font-weight:800; }
+        """)
+
+        v = QVBoxLayout(self); v.setContentsMargins(14,12,14,12); v.setSpacing(8)
+
+        t = QLabel("Senaryo Taraması"); t.setObjectName("Title")
+        s = QLabel("Değerleri virgülle ayırın; boş bırakılan alan sayfadaki mevcut değeri kullanır. "
+                   "Satıra çift tıklayın: senaryo sayfaya uygulanır.")
+        s.setObjectName("Subtitle"); s.setWordWrap(True)
+        v.addWidget(t); v.addWidget(s)
+
+        g = QGridLayout(); g.setHorizontalSpacing(10); g.setVerticalSpacing(6)
+        self.ed_days = QLineEdit(); self.ed_days.setPlaceholderText("örn. 5, 8, 10 (sınav günü sayısı)")
+        self.ed_buffer = QLineEdit(); self.ed_buffer.setPlaceholderText(f"örn. 0, 15, 30 (şu an {cons.buffer_min})")
+        self.ed_duration = QLineEdit(); self.ed_duration.setPlaceholderText(f"örn. 60, 75 (şu an {cons.default_duration_min})")
+        g.addWidget(QLabel("Sınav günü sayısı:"), 0, 0); g.addWidget(self.ed_days, 0, 1)
+        g.addWidget(QLabel("Bekleme (dk):"), 1, 0);      g.addWidget(self.ed_buffer, 1, 1)
+        g.addWidget(QLabel("Varsayılan süre (dk):"), 2, 0); g.addWidget(self.ed_duration, 2, 1)
+        self.chk_saturday = QCheckBox("Cumartesi hem dahil hem hariç denensin")
+        self.chk_global = QCheckBox("Global tek sınav açık ve kapalı denensin")
+        g.addWidget(self.chk_saturday, 3, 0, 1, 2)
+        g.addWidget(self.chk_global, 4, 0, 1, 2)
+        v.addLayout(g)
+
+        self.tbl = QTableWidget(0, 9, self)
+        self.tbl.setHorizontalHeaderLabels(["Durum", "Gün", "Bitiş", "Hariç Günler", "Bekleme",
+                                            "Süre", "Global", "Gün / Salon / Yayılım", "Açıklama"])
+        self.tbl.setAlternatingRowColors(True)
+        self.tbl.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tbl.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tbl.horizontalHeader().setStretchLastSection(True)
+        self.tbl.horizontalHeader().setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.tbl.cellDoubleClicked.connect(self._pick)
+        v.addWidget(self.tbl)
+
+        self.lbl_summary = QLabel(""); self.lbl_summary.setObjectName("Subtitle")
+        v.addWidget(self.lbl_summary)
+
+        btns = QHBoxLayout(); btns.addStretch(1)
+        btn_close = QPushButton("Kapat"); btn_close.setObjectName("Ghost")
+        btn_close.clicked.connect(self.reject)
+        self.btn_run = QPushButton("Taramayı Başlat"); self.btn_run.setObjectName("Primary")
+        self.btn_run.clicked.connect(self._run)
+        btns.addWidget(btn_close); btns.addWidget(self.btn_run)
+        v.addLayout(btns)
+
+        self.resize(980, 600)
+
+    def _grid(self) -> Optional[SweepGrid]:
+        try:
+            days = _parse_ints(self.ed_days.text(), 1, 60, "Sınav günü sayısı")
+            buffers = _parse_ints(self.ed_buffer.text(), 0, 180, "Bekleme")
+            durations = _parse_ints(self.ed_duration.text(), 30, 240, "Süre")
+        except ValueError as e:
+            QMessageBox.warning(self, "Uyarı", str(e))
+            return None
+        excl = set(self.cons.exclude_weekdays)
+        weekday_sets = [excl | {5}, excl - {5}] if self.chk_saturday.isChecked() else []
+        return SweepGrid(exam_days=days, exclude_weekdays=weekday_sets, buffer_min=buffers,
+                         default_duration_min=durations,
+                         global_no_overlap=[False, True] if self.chk_global.isChecked() else [])
+
+    def _run(self):
+        grid = self._grid()
+        if grid is None:
+            return
+        n = grid.size()
+        if n > MAX_SCENARIOS:
+            ans = QMessageBox.question(self, "Onay", f"{n} senaryo çözülecek; bu uzun sürebilir. Devam edilsin mi?")
+            if ans != QMessageBox.StandardButton.Yes:
+                return
+
+        def progress(done: int, total: int):
+            self.btn_run.setText(f"Çözülüyor… {done}/{total}")
+            QApplication.processEvents()
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self.btn_run.setEnabled(False)
+        try:
+            self.cells = sweep(self.cons, self.classrooms, grid, progress=progress)
+        except SchedulingError as e:
+            QMessageBox.critical(self, "Hata", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Tarama yapılamadı:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+            self.btn_run.setEnabled(True)
+            self.btn_run.setText("Taramayı Başlat")
+        self._render()
+
+    def _render(self):
+        day_abbr = ["Pzt", "Sal", "Çar", "Per", "Cum", "Cmt", "Paz"]
+        self.tbl.setRowCount(len(self.cells))
+        for i, cell in enumerate(self.cells):
+            n_days, excl, buf, dur, gno = cell.key
+            res, m = cell.result, cell.result.metrics
+            cells = [
+                "✓" if cell.feasible else "✗",
+                str(n_days), cell.date_end.strftime("%Y-%m-%d"),
+                ", ".join(day_abbr[d] for d in sorted(excl)) or "-",
+                str(buf), str(dur), "Evet" if gno else "Hayır",
+                f"{m['days']} / {m['rooms']} / {m['spread']}" if cell.feasible else "",
+                "" if cell.feasible else (res.error or ""),
+            ]
+            for col, text in enumerate(cells):
+                it = QTableWidgetItem(text)
+                if col < 7:
+                    it.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                it.setBackground(QColor("#ECFDF5" if cell.feasible else "#FEF2F2"))
+                self.tbl.setItem(i, col, it)
+        self.tbl.resizeColumnsToContents()
+        ok = sum(c.feasible for c in self.cells)
+        self.lbl_summary.setText(f"{len(self.cells)} senaryodan {ok} tanesi uygun.")
+
+    def _pick(self, row: int, _col: int):
+        if not (0 <= row < len(self.cells)):
+            return
+        cell = self.cells[row]
+        if not cell.feasible:
+            QMessageBox.information(self, "Bilgi", f"Bu senaryo uygun değil:\n{cell.result.error}")
+            return
+        self.chosen = cell
+        self.accept()
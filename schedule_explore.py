@@ -0,0 +1,298 @@
+# schedule_explore.py — parametre/ağırlık varyantlarıyla Pareto önü keşfi ve senaryo taraması
+# Kayıtlar bir kez yüklenir; varyantlar süreç havuzunda paralel çözülür, mevcut puanlayıcıyla
+# ölçülür ve baskın olmayan (Pareto) programlar NumPy ile süzülür.
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+from typing import List, Dict, Any, Optional, Tuple, Callable, Set
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from itertools import product
+import os
+import time as _time
+
+import numpy as np
+
+from scheduler_core import (
+    Constraints, ScheduleProblem, SchedulingError, ClassroomNotFoundError, DateRangeError,
+    load_problem, load_previous_schedule, _check_capacity, run_strategy, _iter_days, course_unavailability
+)
+from schedule_validator import validate_schedule
+
+# Pareto önünde karşılaştırılan ölçütler (hepsinde küçük daha iyi):
+#   days  → kullanılan sınav günü, rooms → toplam salon ataması,
+#   spread → öğrencinin ardışık günlerdeki sınav yoğunluğu (yakınlık cezası)
+PARETO_METRICS = ("days", "rooms", "spread")
+
+# Hazır ağırlık profilleri (bkz. schedule_optimizer.OBJECTIVE_WEIGHTS)
+WEIGHT_PROFILES: Dict[str, Optional[Dict[str, int]]] = {
+    "dengeli": None,
+    "az salon": {"rooms": 900, "distinct_rooms": 300, "spread": 1},
+    "öğrenci dostu": {"rooms": 100, "distinct_rooms": 30, "spread": 4},
+}
+
+@dataclass
+class Variant:
+    """Tek deneme: etiket + Constraints alan değişiklikleri (strategy, buffer_min, objective_weights …)."""
+    label: str
+    overrides: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class VariantResult:
+    variant: Variant
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    metrics: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed_s: float = 0.0
+    pareto: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def default_variants(cs: Constraints) -> List[Variant]:
+    """Yöntem × bekleme süresi × ağırlık profili × gün rotasyonu ızgarası (24 varyant)."""
+    out: List[Variant] = []
+    buffers = sorted({int(cs.buffer_min), int(cs.buffer_min) + 15, int(cs.buffer_min) + 30})
+    for strategy in ("greedy", "tabu"):
+        for buf in buffers:
+            for rotate in (True, False):
+                profiles = WEIGHT_PROFILES.items() if strategy == "tabu" else [("dengeli", None)]
+                for pname, weights in profiles:
+                    label = f"{strategy} • bekleme {buf} dk • {'rotasyon' if rotate else 'sıralı'}"
+                    if strategy == "tabu":
+                        label += f" • {pname}"
+                    out.append(Variant(label, {"strategy": strategy, "buffer_min": buf,
+                                               "rotate_days_per_year": rotate,
+                                               "objective_weights": weights}))
+    return out
+
+def pareto_mask(points: np.ndarray) -> np.ndarray:
+    """
+    points: (n, k) ölçüt matrisi (küçük daha iyi). Dönüş: baskın olmayan satırlar için True.
+    i, j'yi baskılar ⇔ tüm ölçütlerde ≤ ve en az birinde <. Vektörel O(n²·k).
+    """
+    if points.size == 0:
+        return np.zeros(0, dtype=bool)
+    le = (points[:, None, :] <= points[None, :, :]).all(axis=2)
+    lt = (points[:, None, :] < points[None, :, :]).any(axis=2)
+    dominated = (le & lt).any(axis=0)
+    return ~dominated
+
+def _metrics(rows: List[Dict[str, Any]], problem: ScheduleProblem, cs: Constraints) -> Dict[str, int]:
+    from schedule_optimizer import score_schedule
+    m = dict(score_schedule(rows, problem, cs))
+    m["days"] = len({r["Date"] for r in rows})
+    return m
+
+def _run_variant(cs: Constraints, problem: ScheduleProblem, variant: Variant,
+                 previous: Optional[Dict[int, datetime]] = None) -> VariantResult:
+    """Süreç havuzunda çalışır: tek varyantı çözer, doğrular ve ölçer (previous → sıcak başlangıç ipuçları)."""
+    t0 = _time.perf_counter()
+    res = VariantResult(variant)
+    try:
+        vcs = replace(cs, **variant.overrides)
+        if not _iter_days(vcs):
+            raise DateRangeError("Seçilen tarih aralığı sınavları barındırmıyor!",
+                                 {"date_start": vcs.date_start, "date_end": vcs.date_end})
+        rows = run_strategy(vcs, problem, previous=previous)
+        problems = validate_schedule(rows, problem.students_by_course, problem.rooms_sorted,
+                                     buffer_min=vcs.buffer_min, exclude_weekdays=vcs.exclude_weekdays,
+                                     student_label=problem.student_no,
+                                     unavailable=course_unavailability(vcs),
+                                     room_blackouts=vcs.room_blackouts)
+        if problems:
+            res.error = f"Doğrulama: {len(problems)} ihlal"
+        res.rows = rows
+        res.metrics = _metrics(rows, problem, vcs)
+    except SchedulingError as e:
+        res.error = str(e)
+    except Exception as e:   # beklenmeyen hata yalnız bu varyantı düşürür
+        res.error = f"Beklenmeyen hata: {type(e).__name__}: {e}"
+    res.elapsed_s = _time.perf_counter() - t0
+    return res
+
+# Havuz süreçlerinde (cs, problem, previous): initializer ile süreç başına bir kez gelir,
+# her iş yalnız varyantı taşır (problem her submit'te yeniden pickle'lanmaz).
+_worker_ctx: Optional[Tuple[Constraints, ScheduleProblem, Optional[Dict[int, datetime]]]] = None
+
+def _init_worker(cs: Constraints, problem: ScheduleProblem,
+                 previous: Optional[Dict[int, datetime]] = None) -> None:
+    global _worker_ctx
+    _worker_ctx = (cs, problem, previous)
+
+def _run_variant_in_worker(variant: Variant) -> VariantResult:
+    cs, problem, previous = _worker_ctx   # type: ignore[misc]
+    return _run_variant(cs, problem, variant, previous)
+
+def _load_previous(cs: Constraints) -> Optional[Dict[int, datetime]]:
+    """cs.warm_start_from verilmişse önceki dönem programı (tüm varyantlara aynı ipuçları gider)."""
+    if not cs.warm_start_from:
+        return None
+    ps, pe = cs.warm_start_from
+    return load_previous_schedule(cs.department_id, cs.exam_type, ps, pe)
+
+def explore(
+    cs: Constraints,
+    classrooms: List[Dict[str, Any]],
+    variants: Optional[List[Variant]] = None,
+    max_workers: Optional[int] = None,
+    time_budget_s: Optional[float] = 1.0,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> List[VariantResult]:
+    """
+    Varyantları paralel çözer; Pareto önündekiler pareto=True işaretlenir.
+    time_budget_s: iyileştirici stratejiler için varyant başı süre (None → cs.optimizer_time_s).
+    max_workers=1 → süreç açmadan sırayla çalışır.
+    Dönüş: önce Pareto önü (days, rooms, spread sırasıyla), sonra diğerleri, en sonda hatalılar.
+    """
+    if not classrooms:
+        raise ClassroomNotFoundError("Derslik bulunamadı!", {})
+    variants = variants if variants is not None else default_variants(cs)
+    if time_budget_s is not None:
+        cs = replace(cs, optimizer_time_s=float(time_budget_s))
+
+    problem = load_problem(cs.department_id, cs.chosen_courses, classrooms)
+    _check_capacity(problem)
+    previous = _load_previous(cs)
+    results = _run_all(cs, problem, variants, max_workers, progress, previous)
+
+    ok = [r for r in results if r.ok]
+    if ok:
+        pts = np.array([[r.metrics[k] for k in PARETO_METRICS] for r in ok], dtype=np.int64)
+        seen = set()
+        for r, flag, p in zip(ok, pareto_mask(pts), pts.tolist()):
+            # aynı ölçütlü kopyalardan yalnız ilki önde gösterilir
+            r.pareto = bool(flag) and tuple(p) not in seen
+            if r.pareto:
+                seen.add(tuple(p))
+
+    def key(r: VariantResult) -> Tuple[int, Tuple[int, ...]]:
+        if not r.ok:
+            return (2, ())
+        return (0 if r.pareto else 1, tuple(r.metrics[k] for k in PARETO_METRICS))
+    results.sort(key=key)
+    return results
+
+def _run_all(
+    cs: Constraints,
+    problem: ScheduleProblem,
+    variants: List[Variant],
+    max_workers: Optional[int],
+    progress: Optional[Callable[[int, int], None]],
+    previous: Optional[Dict[int, datetime]] = None
+) -> List[VariantResult]:
+    """Varyantları çözer; dönüş variants ile aynı sırada. max_workers=1 → süreç açılmaz."""
+    results: List[Optional[VariantResult]] = [None] * len(variants)
+    done = 0
+    workers = max_workers or min(len(variants), os.cpu_count() or 1)
+    if workers <= 1:
+        for i, v in enumerate(variants):
+            results[i] = _run_variant(cs, problem, v, previous)
+            done += 1
+            if progress:
+                progress(done, len(variants))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cs, problem, previous)) as pool:
+            futs = {pool.submit(_run_variant_in_worker, v): i for i, v in enumerate(variants)}
+            for f in as_completed(futs):
+                i = futs[f]
+                try:
+                    results[i] = f.result()
+                except Exception as e:   # çöken süreç / pickle hatası: varyant başarısız sayılır
+                    results[i] = VariantResult(variants[i], error=f"Beklenmeyen hata: {type(e).__name__}: {e}")
+                done += 1
+                if progress:
+                    progress(done, len(variants))
+    return results  # type: ignore[return-value]
+
+# ───────────────────── Senaryo taraması ─────────────────────
+# Eksenler (sırası matris anahtarındaki sıradır)
+SWEEP_AXES = ("exam_days", "exclude_weekdays", "buffer_min", "default_duration_min", "global_no_overlap")
+
+@dataclass
+class SweepGrid:
+    """
+    Taranacak değerler. Boş liste → o eksende temel Constraints değeri kullanılır.
+    exam_days: başlangıçtan itibaren sınav günü sayısı (hariç günler atlanır; bitiş buna göre hesaplanır).
+    """
+    exam_days: List[int] = field(default_factory=list)
+    exclude_weekdays: List[Set[int]] = field(default_factory=list)
+    buffer_min: List[int] = field(default_factory=list)
+    default_duration_min: List[int] = field(default_factory=list)
+    global_no_overlap: List[bool] = field(default_factory=list)
+
+    def size(self) -> int:
+        n = 1
+        for axis in SWEEP_AXES:
+            n *= max(1, len(getattr(self, axis)))
+        return n
+
+@dataclass
+class ScenarioCell:
+    """Matrisin bir hücresi: eksen değerleri + çözüm sonucu (uygunluk ve kalite ölçütleri)."""
+    key: Tuple[Any, ...]          # SWEEP_AXES sırasıyla
+    date_end: date
+    result: VariantResult
+
+    @property
+    def feasible(self) -> bool:
+        return self.result.ok
+
+def _end_for_exam_days(start: date, n_days: int, exclude_weekdays: Set[int]) -> date:
+    """start'tan itibaren n_days sınav günü içeren en erken bitiş tarihi."""
+    d, seen = start, 0
+    if len(set(exclude_weekdays) & set(range(7))) == 7:
+        return start
+    while True:
+        if d.weekday() not in exclude_weekdays:
+            seen += 1
+            if seen >= n_days:
+                return d
+        d += timedelta(days=1)
+
+def sweep_variants(cs: Constraints, grid: SweepGrid) -> List[Tuple[Tuple[Any, ...], date, Variant]]:
+    """Izgaranın kartezyen çarpımı → (anahtar, bitiş tarihi, varyant) listesi."""
+    base = {
+        "exam_days": [len(_iter_days(cs))],
+        "exclude_weekdays": [set(cs.exclude_weekdays)],
+        "buffer_min": [int(cs.buffer_min)],
+        "default_duration_min": [int(cs.default_duration_min)],
+        "global_no_overlap": [bool(cs.global_no_overlap)],
+    }
+    axes = [getattr(grid, a) or base[a] for a in SWEEP_AXES]
+    out = []
+    for n_days, excl, buf, dur, gno in product(*axes):
+        excl = set(excl)
+        end = _end_for_exam_days(cs.date_start, int(n_days), excl) if grid.exam_days else cs.date_end
+        wd = ",".join(str(x) for x in sorted(excl)) or "-"
+        label = f"{n_days} gün • hariç {wd} • bekleme {buf} • süre {dur}" + (" • global" if gno else "")
+        key = (int(n_days), frozenset(excl), int(buf), int(dur), bool(gno))
+        out.append((key, end, Variant(label, {"date_end": end, "exclude_weekdays": excl,
+                                              "buffer_min": int(buf), "default_duration_min": int(dur),
+                                              "global_no_overlap": bool(gno)})))
+    return out
+
+def sweep(
+    cs: Constraints,
+    classrooms: List[Dict[str, Any]],
+    grid: SweepGrid,
+    max_workers: Optional[int] = None,
+    time_budget_s: Optional[float] = 1.0,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> List[ScenarioCell]:
+    """
+    Senaryo taraması: kayıtlar bir kez yüklenir, ızgaranın tüm birleşimleri paralel çözülür.
+    Dönüş: ızgara sırasıyla hücreler; uygun olmayan hücrede result.error nedeni taşır,
+    uygun hücrede result.metrics (days, rooms, spread, …) kaliteyi verir.
+    """
+    if not classrooms:
+        raise ClassroomNotFoundError("Derslik bulunamadı!", {})
+    if time_budget_s is not None:
+        cs = replace(cs, optimizer_time_s=float(time_budget_s))
+    cells = sweep_variants(cs, grid)
+    problem = load_problem(cs.department_id, cs.chosen_courses, classrooms)
+    _check_capacity(problem)
+    previous = _load_previous(cs)
+    results = _run_all(cs, problem, [v for _, _, v in cells], max_workers, progress, previous)
+    return [ScenarioCell(key, end, res) for (key, end, _), res in zip(cells, results)]
@@ -0,0 +1,530 @@
+# schedule_optimizer.py — generate_schedule çıktısı üzerinde yerel arama (son işlem)
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Set, Tuple, Optional
+from datetime import date, datetime, timedelta
+from collections import defaultdict, deque
+from itertools import combinations
+import heapq
+import math
+import random
+import time as _time
+
+from scheduler_core import (
+    Constraints, ScheduleProblem, register_strategy, schedule_problem,
+    _iter_days, _build_candidate_times, _room_label, _SlotMask, course_unavailability,
+    room_blackout_index, interval_hit, merge_intervals
+)
+
+# Aynı öğrencinin iki sınavı arasındaki gün farkına göre ceza (0: aynı gün)
+PROXIMITY_WEIGHTS = (16, 8, 4, 2, 1)
+
+# Amaç fonksiyonu ağırlıkları: _RoomAllocator hedefleri (salon sayısı, boş koltuk,
+# az sayıda farklı salon = reuse) + öğrenci yayılımı (yakınlık cezası)
+OBJECTIVE_WEIGHTS = {"rooms": 300, "waste": 1, "distinct_rooms": 100, "spread": 1}
+
+# ───────────────────── Veri Modeli ─────────────────────
+@dataclass
+class _Exam:
+    course_id: int
+    start: datetime
+    duration: timedelta
+    room_ids: Set[int]
+    rows: List[Dict[str, Any]]
+    rooms_changed: bool = False
+
+    @property
+    def end(self) -> datetime:
+        return self.start + self.duration
+
+@dataclass
+class OptimizerStats:
+    tried: int = 0            # denenen hamle
+    feasible: int = 0         # uygun (kısıtları bozmayan) hamle
+    applied: int = 0          # uygulanan hamle
+    elapsed_s: float = 0.0
+    initial_cost: int = 0
+    final_cost: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def moves_per_sec(self) -> float:
+        return self.tried / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+# ───────────────────── Zaman Çizelgesi ─────────────────────
+class _Timetable:
+    """
+    Ders → (başlangıç, salonlar) ataması + artımlı maliyet.
+    Maliyet: çakışma grafındaki her kenar için ortak öğrenci × yakınlık cezası.
+    room_busy / student_busy: kampanyada önceki dönemlerden gelen sabit salon takvimi ve
+    ders başına öğrenci sınav aralıkları (bkz. scheduler_core.generate_campaign); hamle
+    bunlara değemez.
+    """
+    def __init__(self, rows: List[Dict[str, Any]], problem: ScheduleProblem, cs: Constraints,
+                 earliest_day_by_course: Optional[Dict[int, date]] = None,
+                 room_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None,
+                 student_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None):
+        self.earliest = earliest_day_by_course or {}
+        self.student_busy = student_busy or {}
+        self.conflicts = problem.conflicts
+        self.need = problem.student_counts
+        self.rooms = {int(r["ClassroomID"]): r for r in problem.rooms_sorted}
+        self.buffer = timedelta(minutes=int(cs.buffer_min))
+        self.global_no_overlap = bool(cs.global_no_overlap)
+        self.weights = {**OBJECTIVE_WEIGHTS, **(cs.objective_weights or {})}
+
+        self.exams: Dict[int, _Exam] = {}
+        for r in rows:
+            cid = int(r["CourseID"])
+            ex = self.exams.get(cid)
+            if ex is None:
+                ex = _Exam(cid, datetime.combine(r["Date"], r["Start"]),
+                           timedelta(minutes=int(r["DurationMin"])), set(), [])
+                self.exams[cid] = ex
+            ex.room_ids.add(int(r["ClassroomID"]))
+            ex.rows.append(r)
+
+        # Salon paylaşan sınavlar greedy'nin katman yerleşimine bağlıdır → yerinde sabit kalır
+        self.pinned: Set[int] = {int(r["CourseID"]) for r in rows if r.get("SharedRoom")}
+
+        self.by_start: Dict[datetime, Set[int]] = defaultdict(set)
+        self.by_room: Dict[int, Set[int]] = defaultdict(set)
+        for cid, ex in self.exams.items():
+            self.by_start[ex.start].add(cid)
+            for rid in ex.room_ids:
+                self.by_room[rid].add(cid)
+
+        # Öğretim elemanı kapalı başlangıçları: greedy ile aynı bit maskesi (ızgara + mevcut başlangıçlar)
+        self.slot_mask: Optional[_SlotMask] = None
+        self.blocked: Dict[int, int] = {}
+        unavailable = course_unavailability(cs)
+        if unavailable:
+            grid = _build_candidate_times(cs.day_start_hour, cs.day_end_hour, cs.slot_step_min)
+            self.slot_mask = _SlotMask([(d, t) for d in _iter_days(cs) for t in grid]
+                                       + [(st.date(), st.time()) for st in self.by_start])
+            self.blocked = {cid: self.slot_mask.mask_for(iv, self.exams[cid].duration)
+                            for cid, iv in unavailable.items() if cid in self.exams}
+
+        # Salon kapalı aralıkları ve önceki dönemlerin salon takvimi: _room_clashes bunları da çakışma sayar
+        self.blackouts = room_blackout_index(cs)
+        for rid, ivs in (room_busy or {}).items():
+            self.blackouts[int(rid)] = merge_intervals(self.blackouts.get(int(rid), []) + list(ivs))
+
+    def capacity(self, room_ids) -> int:
+        return sum(int(self.rooms[rid]["Capacity"]) for rid in room_ids if rid in self.rooms)
+
+    # ---- maliyet ----
+    def edge_cost(self, a: int, b: int, start_a: datetime, start_b: datetime) -> int:
+        gap = abs((start_a.date() - start_b.date()).days)
+        if gap >= len(PROXIMITY_WEIGHTS):
+            return 0
+        return PROXIMITY_WEIGHTS[gap] * self.conflicts.get(a, {}).get(b, 0)
+
+    def total_cost(self) -> int:
+        cost = 0
+        for a, nb in self.conflicts.items():
+            ea = self.exams.get(a)
+            if not ea:
+                continue
+            for b in nb:
+                eb = self.exams.get(b)
+                if eb and a < b:
+                    cost += self.edge_cost(a, b, ea.start, eb.start)
+        return cost
+
+    def move_delta(self, moves: Dict[int, datetime]) -> int:
+        """Yalnız taşınan derslere değen kenarlar üzerinden maliyet farkı."""
+        delta = 0
+        for a, new_a in moves.items():
+            old_a = self.exams[a].start
+            for b in self.conflicts.get(a, {}):
+                eb = self.exams.get(b)
+                if not eb:
+                    continue
+                if b in moves:
+                    if a > b:
+                        continue           # çift sayma
+                    new_b = moves[b]
+                else:
+                    new_b = eb.start
+                delta += self.edge_cost(a, b, new_a, new_b) - self.edge_cost(a, b, old_a, eb.start)
+        return delta
+
+    def room_term(self, cid: int, room_ids) -> int:
+        waste = max(0, self.capacity(room_ids) - max(1, self.need.get(cid, 0)))
+        return self.weights["rooms"] * len(room_ids) + self.weights["waste"] * waste
+
+    def distinct_rooms(self) -> int:
+        return sum(1 for cids in self.by_room.values() if cids)
+
+    def objective(self) -> Dict[str, int]:
+        spread = self.total_cost()
+        rooms = sum(len(ex.room_ids) for ex in self.exams.values())
+        waste = sum(max(0, self.capacity(ex.room_ids) - max(1, self.need.get(cid, 0)))
+                    for cid, ex in self.exams.items())
+        distinct = self.distinct_rooms()
+        total = (self.weights["spread"] * spread + self.weights["rooms"] * rooms
+                 + self.weights["waste"] * waste + self.weights["distinct_rooms"] * distinct)
+        return {"spread": spread, "rooms": rooms, "waste": waste,
+                "distinct_rooms": distinct, "total": total}
+
+    def contribution(self, cid: int) -> int:
+        """Aday listesi önceliği: dersin yayılım kenarları + salon terimi."""
+        ex = self.exams[cid]
+        c = self.room_term(cid, ex.room_ids)
+        for nb in self.conflicts.get(cid, {}):
+            eo = self.exams.get(nb)
+            if eo:
+                c += self.edge_cost(cid, nb, ex.start, eo.start)
+        return c
+
+    def bundle_delta(self, cid: int, new_ids: Set[int]) -> int:
+        ex = self.exams[cid]
+        delta = self.room_term(cid, new_ids) - self.room_term(cid, ex.room_ids)
+        for rid in new_ids - ex.room_ids:
+            if not self.by_room.get(rid):
+                delta += self.weights["distinct_rooms"]
+        for rid in ex.room_ids - new_ids:
+            if self.by_room.get(rid) == {cid}:
+                delta -= self.weights["distinct_rooms"]
+        return delta
+
+    # ---- uygunluk ----
+    def _clash(self, s1: datetime, e1: datetime, s2: datetime, e2: datetime) -> bool:
+        return s1 < e2 + self.buffer and s2 < e1 + self.buffer
+
+    def is_feasible(self, moves: Dict[int, datetime]) -> bool:
+        """Taşıma sonrası öğrenci (aralık + buffer), salon ve global kısıtları korunuyor mu?"""
+        def start_of(c: int) -> datetime:
+            return moves.get(c, self.exams[c].start)
+
+        for cid, new_start in moves.items():
+            if cid in self.pinned:
+                return False
+            ex = self.exams[cid]
+            new_end = new_start + ex.duration
+            if cid in self.earliest and new_start.date() < self.earliest[cid]:
+                return False
+            if self.blocked.get(cid) and self.slot_mask.blocked(self.blocked[cid], (new_start.date(), new_start.time())):
+                return False
+            if interval_hit(self.student_busy.get(cid), new_start, new_end):
+                return False
+            if self.global_no_overlap:
+                for other in self.by_start.get(new_start, ()):
+                    if other not in moves:
+                        return False
+            for nb in self.conflicts.get(cid, {}):
+                eo = self.exams.get(nb)
+                if not eo:
+                    continue
+                s = start_of(nb)
+                if self._clash(new_start, new_end, s, s + eo.duration):
+                    return False
+            # Salon: giriş programında zaten çakışan salonlar olabilir (eski ayırıcı zamanı
+            # izlemiyordu); hamle hiçbir dersin salon çakışma sayısını artırmamalı.
+            before = self._room_clashes(ex, ex.start, lambda c: self.exams[c].start)
+            if self._room_clashes(ex, new_start, start_of) > before:
+                return False
+        if self.global_no_overlap:
+            targets = [moves[c] for c in moves]
+            if len(set(targets)) != len(targets):
+                return False
+        return True
+
+    def bundle_feasible(self, cid: int, new_ids: Set[int]) -> bool:
+        ex = self.exams[cid]
+        if cid in self.pinned or self.capacity(new_ids) < max(1, self.need.get(cid, 0)):
+            return False
+        current = lambda c: self.exams[c].start
+        return (self._room_clashes(ex, ex.start, current, new_ids)
+                <= self._room_clashes(ex, ex.start, current))
+
+    def _room_clashes(self, ex: _Exam, start: datetime, start_of, room_ids=None) -> int:
+        end = start + ex.duration
+        n = 0
+        for rid in (ex.room_ids if room_ids is None else room_ids):
+            if interval_hit(self.blackouts.get(rid), start, end):
+                n += 1
+            for other in self.by_room[rid]:
+                if other == ex.course_id:
+                    continue
+                s = start_of(other)
+                if start < s + self.exams[other].duration and s < end:
+                    n += 1
+        return n
+
+    def apply(self, moves: Dict[int, datetime]) -> None:
+        for cid, new_start in moves.items():
+            self.by_start[self.exams[cid].start].discard(cid)
+        for cid, new_start in moves.items():
+            self.exams[cid].start = new_start
+            self.by_start[new_start].add(cid)
+
+    def apply_bundle(self, cid: int, new_ids: Set[int]) -> None:
+        ex = self.exams[cid]
+        for rid in ex.room_ids:
+            self.by_room[rid].discard(cid)
+        for rid in new_ids:
+            self.by_room[rid].add(cid)
+        ex.room_ids = set(new_ids)
+        ex.rooms_changed = True
+
+    def _rebuild_rows(self, ex: _Exam) -> List[Dict[str, Any]]:
+        template = ex.rows[0]
+        ordered = sorted(ex.room_ids, key=lambda rid: -int(self.rooms[rid]["Capacity"]))
+        rows = []
+        for part, rid in enumerate(ordered, start=1):
+            nr = dict(template)
+            nr["ClassroomID"] = rid
+            nr["ClassroomName"] = _room_label(self.rooms[rid], part)
+            rows.append(nr)
+        return rows
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for ex in sorted(self.exams.values(), key=lambda e: (e.start, e.course_id)):
+            for r in (self._rebuild_rows(ex) if ex.rooms_changed else ex.rows):
+                nr = dict(r)
+                nr["Date"] = ex.start.date()
+                nr["Start"] = ex.start.time()
+                nr["End"] = ex.end.time()
+                out.append(nr)
+        return out
+
+# ───────────────────── Kempe Zinciri ─────────────────────
+def _kempe_chain(tt: _Timetable, seed: int, s1: datetime, s2: datetime) -> Dict[int, datetime]:
+    """
+    seed dersinden başlayarak, s1 ∪ s2 slotlarındaki dersler arasında çakışma grafı
+    üzerinden BFS; zincirdeki s1 dersleri s2'ye, s2 dersleri s1'e taşınır.
+    """
+    members = tt.by_start.get(s1, set()) | tt.by_start.get(s2, set())
+    chain: Dict[int, datetime] = {}
+    q = deque([seed])
+    seen = {seed}
+    while q:
+        c = q.popleft()
+        chain[c] = s2 if tt.exams[c].start == s1 else s1
+        for nb in tt.conflicts.get(c, {}):
+            if nb in members and nb not in seen:
+                seen.add(nb); q.append(nb)
+    return chain
+
+def kempe_optimize(
+    rows: List[Dict[str, Any]],
+    problem: ScheduleProblem,
+    cs: Constraints,
+    time_budget_s: float = 2.0,
+    seed: Optional[int] = None,
+    accept_equal: bool = True,
+    earliest_day_by_course: Optional[Dict[int, date]] = None,
+    room_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None,
+    student_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None
+) -> Tuple[List[Dict[str, Any]], OptimizerStats]:
+    """
+    Kempe zinciri takas komşuluğu ile öğrenci yayılım maliyetini düşürür.
+    Her hamle atomiktir: zincir ya tamamen taşınır ya hiç. Salonlar derslerle birlikte taşınır.
+    room_busy / student_busy: bkz. _Timetable (kampanyada önceki dönemler).
+    Dönüş: (yeni satırlar, istatistikler)
+    """
+    rnd = random.Random(seed)
+    tt = _Timetable(rows, problem, cs, earliest_day_by_course, room_busy, student_busy)
+    stats = OptimizerStats()
+    stats.initial_cost = cost = tt.total_cost()
+
+    starts = sorted(tt.by_start)
+    cids = sorted(tt.exams)
+    if len(starts) < 2 or not cids:
+        stats.final_cost = cost
+        return tt.to_rows(), stats
+
+    t0 = _time.perf_counter()
+    deadline = t0 + max(0.0, float(time_budget_s))
+    while _time.perf_counter() < deadline:
+        seed_cid = rnd.choice(cids)
+        s1 = tt.exams[seed_cid].start
+        s2 = rnd.choice(starts)
+        if s2 == s1:
+            continue
+        stats.tried += 1
+        moves = _kempe_chain(tt, seed_cid, s1, s2)
+        if not tt.is_feasible(moves):
+            continue
+        stats.feasible += 1
+        delta = tt.move_delta(moves)
+        if delta < 0 or (accept_equal and delta == 0):
+            tt.apply(moves)
+            cost += delta
+            stats.applied += 1
+
+    stats.elapsed_s = _time.perf_counter() - t0
+    stats.final_cost = cost
+    return tt.to_rows(), stats
+
+# ───────────────────── Tabu Arama ─────────────────────
+def score_schedule(rows: List[Dict[str, Any]], problem: ScheduleProblem, cs: Constraints) -> Dict[str, int]:
+    """Programın amaç bileşenleri: spread, rooms, waste, distinct_rooms ve ağırlıklı total."""
+    return _Timetable(rows, problem, cs).objective()
+
+def _bundle_candidates(need: int, rooms: List[Dict[str, Any]], limit: int = 6) -> List[frozenset]:
+    """Tekli ve ikili salon demetleri: (salon sayısı, boş koltuk) sırasıyla en iyi 'limit' tanesi."""
+    need = max(1, int(need))
+    cands: List[Tuple[int, int, frozenset]] = []
+    for r in rooms:
+        cap = int(r["Capacity"])
+        if cap >= need:
+            cands.append((1, cap - need, frozenset([int(r["ClassroomID"])])))
+    for a, b in combinations(rooms, 2):
+        cap = int(a["Capacity"]) + int(b["Capacity"])
+        if cap >= need and int(a["Capacity"]) < need and int(b["Capacity"]) < need:
+            cands.append((2, cap - need, frozenset([int(a["ClassroomID"]), int(b["ClassroomID"])])))
+    cands.sort(key=lambda x: (x[0], x[1]))
+    return [c[2] for c in cands[:limit]]
+
+def tabu_optimize(
+    rows: List[Dict[str, Any]],
+    problem: ScheduleProblem,
+    cs: Constraints,
+    time_budget_s: float = 2.0,
+    seed: Optional[int] = None,
+    sample_size: int = 8,
+    starts_per_exam: int = 6,
+    earliest_day_by_course: Optional[Dict[int, date]] = None,
+    room_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None,
+    student_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None
+) -> Tuple[List[Dict[str, Any]], OptimizerStats]:
+    """
+    (ders → başlangıç, ders → salon demeti) üzerinde tabu arama.
+    - Aday listesi: katkısı en yüksek dersler bir yığında (heap) tutulur, her iterasyonda
+      ilk 'sample_size' tanesi alınır (bayat girdiler sürümle elenir) → O(k log n).
+    - Tabu süresi örnek büyüklüğüne göre uyarlanır; tabu hamle yalnız en iyi çözümü
+      geçiyorsa kabul edilir (aspiration).
+    - room_busy / student_busy: bkz. _Timetable (kampanyada önceki dönemler); başlangıç ve
+      salon demeti hamleleri bunlara değemez.
+    """
+    rnd = random.Random(seed)
+    tt = _Timetable(rows, problem, cs, earliest_day_by_course, room_busy, student_busy)
+    stats = OptimizerStats()
+    if not tt.exams:
+        return tt.to_rows(), stats
+
+    days = _iter_days(cs)
+    daily_times = _build_candidate_times(cs.day_start_hour, cs.day_end_hour, cs.slot_step_min)
+    grid = [datetime.combine(d, t) for d in days for t in daily_times]
+    bundles = {cid: _bundle_candidates(tt.need.get(cid, 0), problem.rooms_sorted) for cid in tt.exams}
+
+    n = len(tt.exams)
+    tenure = max(5, int(math.sqrt(n)) + n // 20)
+    stats.extra["tenure"] = tenure
+
+    cost = tt.objective()["total"]
+    stats.initial_cost = best_cost = cost
+    best = {cid: (ex.start, set(ex.room_ids)) for cid, ex in tt.exams.items()}
+
+    version: Dict[int, int] = {cid: 0 for cid in tt.exams}
+    heap = [(-tt.contribution(cid), cid, 0) for cid in tt.exams]
+    heapq.heapify(heap)
+
+    def touch(cid: int) -> None:
+        version[cid] += 1
+        heapq.heappush(heap, (-tt.contribution(cid), cid, version[cid]))
+
+    tabu: Dict[Tuple, int] = {}
+    it = 0
+    t0 = _time.perf_counter()
+    deadline = t0 + max(0.0, float(time_budget_s))
+    while _time.perf_counter() < deadline and heap:
+        it += 1
+        picked: List[int] = []
+        while heap and len(picked) < sample_size:
+            _, cid, ver = heapq.heappop(heap)
+            if ver == version[cid]:
+                picked.append(cid)
+
+        best_move = None       # (delta, kind, cid, value)
+        for cid in picked:
+            ex = tt.exams[cid]
+            for st in rnd.sample(grid, min(starts_per_exam, len(grid))):
+                if st == ex.start:
+                    continue
+                stats.tried += 1
+                moves = {cid: st}
+                if not tt.is_feasible(moves):
+                    continue
+                stats.feasible += 1
+                delta = tt.weights["spread"] * tt.move_delta(moves)
+                if tabu.get((cid, "start", st), 0) > it and cost + delta >= best_cost:
+                    continue
+                if best_move is None or delta < best_move[0]:
+                    best_move = (delta, "start", cid, st)
+            for b in bundles.get(cid, ()):
+                if b == ex.room_ids:
+                    continue
+                stats.tried += 1
+                if not tt.bundle_feasible(cid, set(b)):
+                    continue
+                stats.feasible += 1
+                delta = tt.bundle_delta(cid, set(b))
+                if tabu.get((cid, "rooms", b), 0) > it and cost + delta >= best_cost:
+                    continue
+                if best_move is None or delta < best_move[0]:
+                    best_move = (delta, "rooms", cid, b)
+
+        # seçilmeyen adaylar geri döner (sürüm değişmediği için aynı öncelikle)
+        for cid in picked:
+            heapq.heappush(heap, (-tt.contribution(cid), cid, version[cid]))
+
+        if best_move is None:
+            continue
+        delta, kind, cid, value = best_move
+        ex = tt.exams[cid]
+        if kind == "start":
+            tabu[(cid, "start", ex.start)] = it + tenure + rnd.randint(0, 2)
+            tt.apply({cid: value})
+            for nb in tt.conflicts.get(cid, {}):
+                if nb in tt.exams:
+                    touch(nb)
+        else:
+            tabu[(cid, "rooms", frozenset(ex.room_ids))] = it + tenure + rnd.randint(0, 2)
+            tt.apply_bundle(cid, set(value))
+        touch(cid)
+        cost += delta
+        stats.applied += 1
+        if cost < best_cost:
+            best_cost = cost
+            best = {c: (e.start, set(e.room_ids)) for c, e in tt.exams.items()}
+
+    # En iyi çözüme dön
+    for cid, (st, rids) in best.items():
+        ex = tt.exams[cid]
+        if ex.start != st:
+            tt.apply({cid: st})
+        if ex.room_ids != rids:
+            tt.apply_bundle(cid, rids)
+
+    stats.elapsed_s = _time.perf_counter() - t0
+    stats.final_cost = best_cost
+    stats.extra["iterations"] = it
+    return tt.to_rows(), stats
+
+# ───────────────────── Strateji Kaydı ─────────────────────
+def _fixed_rooms(kw: Dict[str, Any]) -> Optional[Dict[int, List[Tuple[datetime, datetime]]]]:
+    """Verilen ayırıcının greedy'den ÖNCEKİ takvimi (kampanyada önceki dönemler + kapalı aralıklar)."""
+    allocator = kw.get("allocator")
+    return allocator.calendar() if allocator is not None else None
+
+def _kempe_strategy(cs: Constraints, problem: ScheduleProblem, **kw) -> List[Dict[str, Any]]:
+    fixed = _fixed_rooms(kw)
+    rows = schedule_problem(cs, problem, **kw)
+    return kempe_optimize(rows, problem, cs, time_budget_s=cs.optimizer_time_s,
+                          earliest_day_by_course=kw.get("earliest_day_by_course"),
+                          room_busy=fixed, student_busy=kw.get("student_busy"))[0]
+
+def _tabu_strategy(cs: Constraints, problem: ScheduleProblem, **kw) -> List[Dict[str, Any]]:
+    fixed = _fixed_rooms(kw)
+    rows = schedule_problem(cs, problem, **kw)
+    return tabu_optimize(rows, problem, cs, time_budget_s=cs.optimizer_time_s,
+                         earliest_day_by_course=kw.get("earliest_day_by_course"),
+                         room_busy=fixed, student_busy=kw.get("student_busy"))[0]
+
+register_strategy("kempe", _kempe_strategy)
+register_strategy("tabu", _tabu_strategy)
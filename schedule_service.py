@@ -0,0 +1,553 @@
+# schedule_service.py — isteğe bağlı yerel planlama hizmeti (HTTP/JSON + kalıcı işçi havuzu)
+# Koordinatör masaüstü DB'den problemi hazırlar (prepare_problem), çözümü bu hizmete gönderir;
+# yoğun dönemde tek güçlü makine birden çok koordinatöre hizmet verebilir.
+#
+# Sunucu:  python schedule_service.py --port 8765 --workers 4 --token GIZLI   (varsayılan 127.0.0.1)
+# İstemci: SCHEDULE_SERVICE_URL=http://127.0.0.1:8765 (+ SCHEDULE_SERVICE_TOKEN) → ExamProgramPage
+#
+# Hizmet düz HTTP konuşur; belirteç ve öğrenci verisi şifresiz gider. Başka makinelerden
+# kullanılacaksa yalnız 127.0.0.1'de dinletip önüne TLS sonlandıran bir ters vekil
+# (nginx/IIS vb.) ya da SSH tüneli konmalı; --host ile doğrudan ağa açmak önerilmez.
+#
+# Uç noktalar:
+#   POST   /jobs              iş gönder → 202 {"id": …}
+#   GET    /jobs/<id>         durum (+ bittiyse sonuç)
+#   GET    /jobs/<id>/events  NDJSON akışı: her ilerlemede bir satır, son satırda sonuç
+#   DELETE /jobs/<id>         kuyruktaki işi iptal et
+#   GET    /health            işçi / kuyruk bilgisi
+from __future__ import annotations
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
+from datetime import date, time, datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib import request as _urlreq
+from urllib.error import URLError, HTTPError
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import threading
+import time as _time
+import uuid
+
+import numpy as np
+
+import scheduler_core
+from scheduler_core import (
+    Constraints, ScheduleProblem, ScheduleRun, CourseExplain, SchedulingError,
+    compile_problem, solve_problem
+)
+from schedule_validator import Violation
+from student_registry import StudentRegistry
+
+DEFAULT_PORT = 8765
+TOKEN_HEADER = "X-Schedule-Token"
+DEFAULT_MAX_BODY_MB = 64   # POST /jobs gövdesi üst sınırı (derlenmiş problem JSON'u)
+
+class ScheduleServiceError(SchedulingError):
+    """Hizmete ulaşılamadı / beklenmeyen yanıt (planlama hatası değil)."""
+
+# ───────────────────── JSON kodlama ─────────────────────
+# Etiketli kodlama: date/time/datetime, set, tuple, int olmayan anahtarlı dict ve izinli
+# dataclass'lar ({"__dc__": ad}) kayıpsız taşınır. Yalnız veri çözülür; kod çalıştırılmaz.
+_DATACLASSES = {cls.__name__: cls for cls in (Constraints, CourseExplain, Violation)}
+
+def _enc(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return {"__dt__": obj.isoformat()}
+    if isinstance(obj, date):
+        return {"__date__": obj.isoformat()}
+    if isinstance(obj, time):
+        return {"__time__": obj.isoformat()}
+    if isinstance(obj, (set, frozenset)):
+        return {"__set__": [_enc(x) for x in sorted(obj)]}
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_enc(x) for x in obj]}
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.ndarray):
+        return [_enc(x) for x in obj.tolist()]
+    if is_dataclass(obj) and type(obj).__name__ in _DATACLASSES:
+        return {"__dc__": type(obj).__name__, "fields": {f.name: _enc(getattr(obj, f.name)) for f in fields(obj)}}
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {k: _enc(v) for k, v in obj.items()}
+        return {"__dict__": [[_enc(k), _enc(v)] for k, v in obj.items()]}
+    if isinstance(obj, list):
+        return [_enc(x) for x in obj]
+    return obj
+
+def _dec(obj: Any) -> Any:
+    if isinstance(obj, list):
+        return [_dec(x) for x in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "__dt__" in obj:
+        return datetime.fromisoformat(obj["__dt__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    if "__time__" in obj:
+        return time.fromisoformat(obj["__time__"])
+    if "__set__" in obj:
+        return {_dec(x) for x in obj["__set__"]}
+    if "__tuple__" in obj:
+        return tuple(_dec(x) for x in obj["__tuple__"])
+    if "__dict__" in obj:
+        return {_dec(k): _dec(v) for k, v in obj["__dict__"]}
+    if "__dc__" in obj:
+        cls = _DATACLASSES.get(obj["__dc__"])
+        if cls is None:
+            raise ValueError(f"Bilinmeyen tür: {obj['__dc__']}")
+        return cls(**{k: _dec(v) for k, v in obj["fields"].items()})
+    return {k: _dec(v) for k, v in obj.items()}
+
+def encode_job(cs: Constraints, problem: ScheduleProblem,
+               previous: Optional[Dict[int, datetime]] = None) -> Dict[str, Any]:
+    """
+    İş yükü: kısıtlar + problemi yeniden derlemeye yetecek ham girdiler (dersler, nominal salonlar,
+    ders → öğrenci kimlikleri, varsa kayıt numaraları). Derleme DB'siz ve hızlıdır; sunucu
+    ScheduleProblem'i aynı sonuçla yeniden kurar.
+    Kayıt varsa yalnız derslerde geçen öğrencilerin numaraları gider; kayıt indeksleri sıra
+    korunarak 0..k-1'e sıkıştırılır (tüm kurum kaydı her işte taşınmaz).
+    """
+    derived = ("NominalCapacity", "SharedCapacity")
+    classrooms = [{**{k: v for k, v in r.items() if k not in derived}, "Capacity": r["NominalCapacity"]}
+                  for r in problem.rooms_sorted]
+    sbc = problem.students_by_course
+    numbers = None
+    if problem.registry is not None:
+        used = sorted({st for sts in sbc.values() for st in sts})
+        remap = {st: i for i, st in enumerate(used)}
+        numbers = problem.registry.numbers(used)
+        sbc = {cid: [remap[st] for st in sts] for cid, sts in sbc.items()}
+    return _enc({
+        "constraints": cs,
+        "courses": problem.courses,
+        "classrooms": classrooms,
+        "students_by_course": {cid: sorted(sts) for cid, sts in sbc.items()},
+        "student_numbers": numbers,
+        "previous": previous,
+    })
+
+def decode_job(payload: Dict[str, Any]) -> Tuple[Constraints, ScheduleProblem, Optional[Dict[int, datetime]]]:
+    data = _dec(payload)
+    registry = None
+    if data.get("student_numbers") is not None:
+        registry = StudentRegistry()
+        for no in data["student_numbers"]:
+            registry.intern(no)
+        registry.loaded = True
+    problem = compile_problem(data["courses"], data["classrooms"],
+                              {cid: set(sts) for cid, sts in data["students_by_course"].items()},
+                              registry=registry)
+    return data["constraints"], problem, data.get("previous")
+
+def encode_run(run: ScheduleRun) -> Dict[str, Any]:
+    return _enc({"rows": run.rows, "violations": run.violations, "explain": run.explain})
+
+def decode_run(payload: Dict[str, Any]) -> ScheduleRun:
+    data = _dec(payload)
+    return ScheduleRun(rows=data["rows"], violations=data["violations"], explain=data["explain"])
+
+def _encode_error(e: SchedulingError) -> Dict[str, Any]:
+    return {"type": type(e).__name__, "message": str(e), "details": _enc(getattr(e, "details", {}) or {})}
+
+def _raise_error(err: Dict[str, Any]) -> None:
+    """Sunucudaki planlama hatasını aynı SchedulingError alt sınıfıyla yeniden fırlatır."""
+    cls = getattr(scheduler_core, str(err.get("type")), None)
+    if not (isinstance(cls, type) and issubclass(cls, SchedulingError)):
+        cls = SchedulingError
+    raise cls(err.get("message", "Planlama hatası"), _dec(err.get("details") or {}))
+
+# ───────────────────── İşçi ─────────────────────
+_PROGRESS_STEPS = 50   # iş başına en çok ~50 ilerleme bildirimi
+
+def _solve_job(job_id: str, payload: Dict[str, Any], progress_queue=None) -> Dict[str, Any]:
+    """İşçi sürecinde çalışır. Dönüş: {"ok": True, "run": …} veya {"ok": False, "error": …}."""
+    def report(done: int, total: int):
+        if progress_queue is not None and (done == total or done % max(1, total // _PROGRESS_STEPS) == 0):
+            progress_queue.put((job_id, done, total))
+    try:
+        cs, problem, previous = decode_job(payload)
+        report(0, len(cs.chosen_courses))
+        run = solve_problem(cs, problem, previous, progress=report)
+        return {"ok": True, "run": encode_run(run)}
+    except SchedulingError as e:
+        return {"ok": False, "error": _encode_error(e)}
+    except Exception as e:   # işçi düşmesin; hata istemciye taşınır
+        return {"ok": False, "error": {"type": "SchedulingError", "message": f"Sunucu hatası: {e}", "details": {}}}
+
+# ───────────────────── Sunucu ─────────────────────
+@dataclass
+class _Job:
+    id: str
+    status: str = "queued"            # queued | running | done | failed | cancelled
+    done: int = 0
+    total: int = 0
+    result: Optional[Dict[str, Any]] = None
+    created: float = field(default_factory=_time.time)
+    version: int = 0
+    future: Optional[Future] = None
+
+    def public(self, with_result: bool = True) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"id": self.id, "status": self.status, "progress": [self.done, self.total]}
+        if with_result and self.result is not None:
+            out.update(self.result)
+        return out
+
+class ScheduleService:
+    """
+    Kalıcı işçi havuzu + iş kuyruğu. workers=0 → işler süreç açılmadan tek arka plan
+    iş parçacığında çözülür (test/yerel sahte sunucu için).
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: Optional[int] = None,
+                 token: Optional[str] = None, keep_s: float = 3600.0, max_queued: int = 100,
+                 max_body_bytes: int = DEFAULT_MAX_BODY_MB * 1024 * 1024):
+        self.token = token or None
+        self.keep_s = keep_s
+        self.max_queued = max_queued
+        self.max_body_bytes = max(1, int(max_body_bytes))
+        self._pool_lock = threading.Lock()
+        self.jobs: Dict[str, _Job] = {}
+        self.cond = threading.Condition()
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, int(workers))
+        self._manager = None
+        self._progress_queue = None
+        if self.workers > 0:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._manager = multiprocessing.Manager()
+            self._progress_queue = self._manager.Queue()
+            threading.Thread(target=self._drain_progress, daemon=True).start()
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=1)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ── yaşam döngüsü ──
+    def serve_forever(self) -> None:
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def start(self) -> "ScheduleService":
+        """Sunucuyu arka plan iş parçacığında başlatır (testler / gömülü kullanım)."""
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    # ── işler ──
+    def _touch(self, job: _Job, **changes) -> None:
+        with self.cond:
+            for k, v in changes.items():
+                setattr(job, k, v)
+            job.version += 1
+            self.cond.notify_all()
+
+    def _purge(self) -> None:
+        limit = _time.time() - self.keep_s
+        with self.cond:
+            for jid in [j.id for j in self.jobs.values()
+                        if j.status in ("done", "failed", "cancelled") and j.created < limit]:
+                del self.jobs[jid]
+
+    def submit(self, payload: Dict[str, Any]) -> _Job:
+        self._purge()
+        with self.cond:
+            queued = sum(1 for j in self.jobs.values() if j.status in ("queued", "running"))
+            if queued >= self.max_queued:
+                raise ScheduleServiceError("İş kuyruğu dolu", {"queued": queued})
+            job = _Job(uuid.uuid4().hex)
+            self.jobs[job.id] = job
+        try:
+            fut = self._submit_to_pool(job, payload)
+        except ScheduleServiceError:
+            with self.cond:
+                del self.jobs[job.id]
+            raise
+        job.future = fut
+        fut.add_done_callback(lambda f, job=job: self._finished(job, f))
+        return job
+
+    def _submit_to_pool(self, job: _Job, payload: Dict[str, Any]) -> Future:
+        """
+        İşi havuza verir. Bir işçi süreci çökerse (bellek yetmedi, öldürüldü …) ProcessPoolExecutor
+        kalıcı olarak bozulur; havuz bir kez yeniden kurulup iş tekrar denenir.
+        """
+        progress = self._progress_queue if self.workers > 0 else _DirectProgress(self)
+        pool = self.pool
+        try:
+            return pool.submit(_solve_job, job.id, payload, progress)
+        except (BrokenProcessPool, RuntimeError) as e:
+            if self.workers <= 0:
+                raise ScheduleServiceError(f"İşçi havuzu kullanılamıyor: {e}", {"job_id": job.id})
+            self._restart_pool(pool)
+        try:
+            return self.pool.submit(_solve_job, job.id, payload, progress)
+        except (BrokenProcessPool, RuntimeError) as e:
+            raise ScheduleServiceError(f"İşçi havuzu kullanılamıyor: {e}", {"job_id": job.id})
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Bozulan havuzu yenisiyle değiştirir (eşzamanlı isteklerden yalnız biri kurar)."""
+        with self._pool_lock:
+            if self.pool is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def _finished(self, job: _Job, fut: Future) -> None:
+        if fut.cancelled():
+            self._touch(job, status="cancelled")
+            return
+        try:
+            res = fut.result()
+        except Exception as e:   # süreç çöktü vb.
+            res = {"ok": False, "error": {"type": "SchedulingError", "message": f"Sunucu hatası: {e}", "details": {}}}
+        self._touch(job, status="done" if res.get("ok") else "failed", result=res, done=max(job.done, job.total))
+
+    def progress(self, job_id: str, done: int, total: int) -> None:
+        job = self.jobs.get(job_id)
+        if job is not None and job.status in ("queued", "running"):
+            self._touch(job, status="running", done=done, total=total)
+
+    def _drain_progress(self) -> None:
+        while True:
+            try:
+                job_id, done, total = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            self.progress(job_id, done, total)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        return bool(job and job.future and job.status == "queued" and job.future.cancel())
+
+    def health(self) -> Dict[str, Any]:
+        with self.cond:
+            return {"workers": self.workers,
+                    "queued": sum(1 for j in self.jobs.values() if j.status == "queued"),
+                    "running": sum(1 for j in self.jobs.values() if j.status == "running")}
+
+class _DirectProgress:
+    """workers=0 kipinde ilerlemeyi kuyruk yerine doğrudan sunucuya iletir."""
+    def __init__(self, service: ScheduleService):
+        self.service = service
+
+    def put(self, item: Tuple[str, int, int]) -> None:
+        self.service.progress(*item)
+
+def _make_handler(service: ScheduleService):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "ScheduleService/1.0"
+
+        def log_message(self, fmt, *args):   # sessiz
+            pass
+
+        def _send(self, code: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            if service.token and not hmac.compare_digest(
+                    (self.headers.get(TOKEN_HEADER) or "").encode("utf-8"), service.token.encode("utf-8")):
+                self._send(401, {"error": "yetkisiz"})
+                return False
+            return True
+
+        def _job(self, parts: List[str]) -> Optional[_Job]:
+            job = service.jobs.get(parts[1]) if len(parts) >= 2 else None
+            if job is None:
+                self._send(404, {"error": "iş bulunamadı"})
+            return job
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            if self.path.rstrip("/") != "/jobs":
+                self._send(404, {"error": "bilinmeyen yol"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                self._send(400, {"error": "geçersiz Content-Length"})
+                return
+            if length < 0:
+                self._send(400, {"error": "geçersiz Content-Length"})
+                return
+            if length > service.max_body_bytes:
+                self.close_connection = True   # okunmayan gövde bağlantıda kalmasın
+                self._send(413, {"error": f"istek gövdesi çok büyük (üst sınır {service.max_body_bytes} bayt)"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length).decode("utf-8"))
+            except (ValueError, UnicodeDecodeError) as e:
+                self._send(400, {"error": f"geçersiz JSON: {e}"})
+                return
+            try:
+                job = service.submit(payload)
+            except ScheduleServiceError as e:
+                self._send(503, {"error": str(e)})
+                return
+            self._send(202, {"id": job.id})
+
+        def do_DELETE(self):
+            if not self._authorized():
+                return
+            parts = [p for p in self.path.split("/") if p]
+            job = self._job(parts)
+            if job is not None:
+                self._send(200, {"cancelled": service.cancel(job.id)})
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            if parts == ["health"]:
+                self._send(200, service.health())
+                return
+            if not parts or parts[0] != "jobs":
+                self._send(404, {"error": "bilinmeyen yol"})
+                return
+            job = self._job(parts)
+            if job is None:
+                return
+            if len(parts) == 3 and parts[2] == "events":
+                self._stream(job)
+            else:
+                self._send(200, job.public())
+
+        def _stream(self, job: _Job) -> None:
+            # HTTP/1.0: gövde bağlantı kapanınca biter; her satır bir JSON olayı
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.end_headers()
+            seen = -1
+            while True:
+                with service.cond:
+                    if job.version == seen:
+                        service.cond.wait(timeout=15.0)   # olay yoksa da satır (canlılık) gönderilir
+                    seen = job.version
+                    final = job.status in ("done", "failed", "cancelled")
+                    event = job.public(with_result=final)
+                try:
+                    self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                if final:
+                    return
+    return Handler
+
+# ───────────────────── İstemci ─────────────────────
+class ScheduleServiceClient:
+    """ScheduleService istemcisi (yalnız standart kütüphane)."""
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.token = token or None
+        self.timeout = timeout
+
+    def _open(self, method: str, path: str, body: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = _urlreq.Request(self.url + path, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header(TOKEN_HEADER, self.token)
+        try:
+            return _urlreq.urlopen(req, timeout=timeout or self.timeout)
+        except HTTPError as e:
+            try:
+                msg = json.loads(e.read().decode("utf-8")).get("error", e.reason)
+            except ValueError:
+                msg = e.reason
+            raise ScheduleServiceError(f"Planlama hizmeti hata döndürdü ({e.code}): {msg}",
+                                       {"url": self.url, "status": e.code})
+        except (URLError, OSError) as e:
+            raise ScheduleServiceError(f"Planlama hizmetine ulaşılamadı: {e}", {"url": self.url})
+
+    def _json(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self._open(method, path, body) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def health(self) -> Dict[str, Any]:
+        return self._json("GET", "/health")
+
+    def submit(self, cs: Constraints, problem: ScheduleProblem,
+               previous: Optional[Dict[int, datetime]] = None) -> str:
+        return self._json("POST", "/jobs", encode_job(cs, problem, previous))["id"]
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> bool:
+        return bool(self._json("DELETE", f"/jobs/{job_id}").get("cancelled"))
+
+    def events(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """İlerleme olayları; son olay sonucu (veya hatayı) taşır."""
+        with self._open("GET", f"/jobs/{job_id}/events", timeout=max(self.timeout, 60.0)) as resp:
+            for line in resp:
+                line = line.strip()
+                if line:
+                    yield json.loads(line.decode("utf-8"))
+
+    def run(self, cs: Constraints, problem: ScheduleProblem,
+            previous: Optional[Dict[int, datetime]] = None,
+            progress: Optional[Callable[[int, int], None]] = None) -> ScheduleRun:
+        """Gönder, ilerlemeyi izle, sonucu ScheduleRun olarak döndür (planlama hatası aynen fırlar)."""
+        job_id = self.submit(cs, problem, previous)
+        last: Dict[str, Any] = {}
+        for event in self.events(job_id):
+            last = event
+            if progress and event.get("status") == "running":
+                progress(*event["progress"])
+        if last.get("status") == "done":
+            return decode_run(last["run"])
+        if last.get("status") == "failed":
+            _raise_error(last.get("error") or {})
+        raise ScheduleServiceError(f"Planlama işi tamamlanmadı ({last.get('status', 'bağlantı koptu')})",
+                                   {"job_id": job_id})
+
+def client_from_env() -> Optional[ScheduleServiceClient]:
+    """SCHEDULE_SERVICE_URL tanımlıysa istemci (SCHEDULE_SERVICE_TOKEN isteğe bağlı); yoksa None."""
+    url = (os.getenv("SCHEDULE_SERVICE_URL") or "").strip()
+    if not url:
+        return None
+    return ScheduleServiceClient(url, token=os.getenv("SCHEDULE_SERVICE_TOKEN"))
+
+def main():
+    ap = argparse.ArgumentParser(description="Yerel sınav planlama hizmeti")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=None, help="işçi süreç sayısı (0 → süreç açmadan)")
+    ap.add_argument("--token", default=os.getenv("SCHEDULE_SERVICE_TOKEN"))
+    ap.add_argument("--max-body-mb", type=int, default=DEFAULT_MAX_BODY_MB,
+                    help="iş gövdesi üst sınırı (MB); aşan istek 413 alır")
+    args = ap.parse_args()
+    if args.host not in ("127.0.0.1", "localhost", "::1"):
+        print("Uyarı: hizmet düz HTTP konuşur; ağa açılacaksa önüne TLS sonlandıran bir vekil konmalı.")
+        if not args.token:
+            print("Uyarı: ağa açık sunucu için --token verilmesi önerilir.")
+    service = ScheduleService(args.host, args.port, args.workers, args.token,
+                              max_body_bytes=args.max_body_mb * 1024 * 1024)
+    print(f"Planlama hizmeti: {service.url} • işçi: {service.workers}")
+    service.serve_forever()
+
+if __name__ == "__main__":
+    main()
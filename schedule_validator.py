@@ -0,0 +1,256 @@
+# schedule_validator.py — tamamlanmış programın bağımsız doğrulaması
+# Planlayıcının iç takip yapılarına güvenmez; yalnız satırlar + kayıtlar üzerinden çalışır.
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Set, Tuple, Optional, Iterable, Callable
+from datetime import datetime, timedelta
+from collections import defaultdict
+from bisect import bisect_right
+
+from seat_plan_repo import pack_room_layers
+
+KIND_OVERLAP  = "overlap"               # öğrencinin iki sınavı zamanda kesişiyor
+KIND_BUFFER   = "buffer"                # iki sınav arası bekleme süresinden kısa
+KIND_ROOM     = "room_double_booking"   # aynı salon aynı anda iki sınavda
+KIND_CAPACITY = "capacity"              # salon demeti öğrenci sayısını karşılamıyor
+KIND_WEEKDAY  = "excluded_weekday"      # programa alınmayan güne sınav konmuş
+KIND_GROUP    = "exam_group_split"      # birlikte sınav grubunun dersleri farklı zamanlarda
+KIND_INSTRUCTOR = "instructor_unavailable"  # öğretim elemanının kapalı aralığına denk geliyor
+KIND_BLACKOUT = "room_blackout"         # salon kapalı olduğu aralıkta kullanılmış
+
+@dataclass
+class Violation:
+    kind: str
+    message: str
+    details: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class _Exam:
+    course_id: int
+    code: str
+    start: datetime
+    end: datetime
+    room_ids: Set[int]
+    shared_rooms: Set[int] = field(default_factory=set)   # SharedRoom işaretli salonlar
+    members: List[int] = field(default_factory=list)      # birlikte sınav grubunda tüm CourseID'ler
+
+    def students(self, students_by_course: Dict[int, Iterable[int]]) -> Set[int]:
+        out: Set[int] = set()
+        for cid in self.members or (self.course_id,):
+            out.update(students_by_course.get(cid, ()))
+        return out
+
+class _IntervalIndex:
+    """Sıralanıp birleştirilmiş kapalı aralıklar; [start, end) ile kesişen ilk aralık bisect ile O(log n)."""
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]]):
+        merged: List[Tuple[datetime, datetime]] = []
+        for bs, be in sorted(intervals):
+            if be <= bs:
+                continue
+            if merged and bs <= merged[-1][1]:
+                if be > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], be)
+            else:
+                merged.append((bs, be))
+        self.intervals = merged
+        self.ends = [be for _, be in merged]
+
+    def first_hit(self, start: datetime, end: datetime) -> Optional[Tuple[datetime, datetime]]:
+        i = bisect_right(self.ends, start)      # bitişi start'tan sonra olan ilk aralık
+        if i < len(self.intervals) and self.intervals[i][0] < end:
+            return self.intervals[i]
+        return None
+
+def _exams_from_rows(rows: Iterable[Dict[str, Any]]) -> List[_Exam]:
+    """
+    Satırları (CourseID, Date, Start) bazında tek sınava indirger (çok salonlu sınavlar).
+    ExamGroup taşıyan satırlar (birlikte sınav grubu) aynı başlangıçta tek sınav sayılır.
+    """
+    by_key: Dict[Tuple[Any, Any, Any], _Exam] = {}
+    for r in rows:
+        cid = int(r["CourseID"])
+        group = r.get("ExamGroup")
+        key = (("group", int(group)) if group is not None else cid, r["Date"], r["Start"])
+        ex = by_key.get(key)
+        if ex is None:
+            start = datetime.combine(r["Date"], r["Start"])
+            ex = _Exam(int(group) if group is not None else cid, str(r.get("CourseCode", cid)), start,
+                       start + timedelta(minutes=int(r.get("DurationMin") or 0)), set())
+            by_key[key] = ex
+        if group is not None and cid not in ex.members:
+            if ex.members:
+                ex.code = f"{ex.code} / {r.get('CourseCode', cid)}"
+            ex.members.append(cid)
+        if r.get("ClassroomID") is not None:
+            ex.room_ids.add(int(r["ClassroomID"]))
+            if r.get("SharedRoom"):
+                ex.shared_rooms.add(int(r["ClassroomID"]))
+    return list(by_key.values())
+
+def validate_schedule(
+    rows: List[Dict[str, Any]],
+    students_by_course: Dict[int, Iterable[int]],
+    classrooms: Optional[List[Dict[str, Any]]] = None,
+    buffer_min: int = 0,
+    exclude_weekdays: Optional[Set[int]] = None,
+    student_label: Optional[Callable[[int], str]] = None,
+    unavailable: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None,
+    room_blackouts: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None
+) -> List[Violation]:
+    """
+    Öğrenci ve salon bazında sıralı aralık taraması. Karmaşıklık O(E log E),
+    E = Σ (sınav × öğrenci) kayıt sayısı.
+    Kontroller: aralık çakışması, bekleme süresi, salon çift rezervasyonu,
+    kapasite yetersizliği, hariç tutulan haftagünü, birlikte sınav grubunun bölünmesi,
+    öğretim elemanı ve salon kapalı aralıkları.
+    SharedRoom işaretli ve aynı aralıktaki sınavlar salonu paylaşabilir; bu durumda
+    katmanlara sığma (pack_room_layers) kapasite olarak denetlenir.
+    student_label: mesajlarda öğrenci kimliğini StudentNo'ya çevirir (örn. kayıt indeksleri için).
+    unavailable: CourseID → öğretim elemanının kapalı aralıkları (bkz. scheduler_core.course_unavailability).
+    room_blackouts: ClassroomID → salonun kapalı aralıkları.
+    """
+    label = student_label or str
+    out: List[Violation] = []
+    exams = _exams_from_rows(rows)
+    buffer_td = timedelta(minutes=int(buffer_min))
+
+    # 1) Haftagünü
+    if exclude_weekdays:
+        for ex in exams:
+            if ex.start.weekday() in exclude_weekdays:
+                out.append(Violation(KIND_WEEKDAY,
+                                     f"{ex.code}: hariç tutulan güne yerleştirilmiş ({ex.start:%Y-%m-%d}).",
+                                     {"course_id": ex.course_id, "date": ex.start.date()}))
+
+    # 1b) Birlikte sınav grupları: tüm dersler aynı başlangıçta olmalı
+    starts_by_group: Dict[int, Set[datetime]] = defaultdict(set)
+    for ex in exams:
+        if ex.members:
+            starts_by_group[ex.course_id].add(ex.start)
+    for group, starts in starts_by_group.items():
+        if len(starts) > 1:
+            codes = sorted({ex.code for ex in exams if ex.members and ex.course_id == group})
+            out.append(Violation(KIND_GROUP,
+                                 f"Birlikte sınav grubu bölünmüş: {', '.join(codes)} "
+                                 f"({', '.join(f'{st:%d.%m %H:%M}' for st in sorted(starts))}).",
+                                 {"group": group, "starts": sorted(starts)}))
+
+    # 1c) Öğretim elemanı müsaitliği (ders başına bir kez sıralanmış aralıklar, bisect)
+    if unavailable:
+        blocked_by_course = {int(cid): _IntervalIndex(ivs) for cid, ivs in unavailable.items()}
+        for ex in exams:
+            for cid in ex.members or (ex.course_id,):
+                idx = blocked_by_course.get(cid)
+                hit = idx.first_hit(ex.start, ex.end) if idx else None
+                if hit:
+                    out.append(Violation(KIND_INSTRUCTOR,
+                                         f"{ex.code}: öğretim elemanı {hit[0]:%d.%m %H:%M}–{hit[1]:%d.%m %H:%M} "
+                                         f"arasında müsait değil ({ex.start:%d.%m %H:%M}).",
+                                         {"course_id": cid, "blocked": hit}))
+                    break
+
+    # 1d) Salon kapalı aralıkları (salon başına bir kez sıralanmış aralıklar, bisect)
+    if room_blackouts:
+        blocked_by_room = {int(rid): _IntervalIndex(ivs) for rid, ivs in room_blackouts.items()}
+        for ex in exams:
+            for rid in sorted(ex.room_ids):
+                idx = blocked_by_room.get(rid)
+                hit = idx.first_hit(ex.start, ex.end) if idx else None
+                if hit:
+                    out.append(Violation(KIND_BLACKOUT,
+                                         f"{ex.code}: Salon #{rid} {hit[0]:%d.%m %H:%M}–{hit[1]:%d.%m %H:%M} "
+                                         f"arasında kapalı ({ex.start:%d.%m %H:%M}).",
+                                         {"course_id": ex.course_id, "classroom_id": rid, "blocked": hit}))
+
+    # 2) Kapasite
+    cap: Dict[int, int] = {}
+    shared_cap: Dict[int, int] = {}
+    if classrooms is not None:
+        cap = {int(r["ClassroomID"]): int(r.get("Capacity") or 0) for r in classrooms}
+        shared_cap = {int(r["ClassroomID"]): int(r.get("SharedCapacity") or 0) for r in classrooms}
+        for ex in exams:
+            need = len(ex.students(students_by_course))
+            have = sum(cap.get(rid, 0) + (shared_cap.get(rid, 0) if rid in ex.shared_rooms else 0)
+                       for rid in ex.room_ids)
+            if need > have:
+                out.append(Violation(KIND_CAPACITY,
+                                     f"{ex.code}: kapasite yetersiz (öğrenci {need}, kapasite {have}).",
+                                     {"course_id": ex.course_id, "need": need, "capacity": have}))
+
+    # 3) Öğrenci taraması: (öğrenci, başlangıç) sıralı; her adımda en geç biten önceki sınavla kıyas
+    entries: List[Tuple[int, datetime, datetime, int]] = []
+    for i, ex in enumerate(exams):
+        for st in ex.students(students_by_course):
+            entries.append((st, ex.start, ex.end, i))
+    entries.sort()
+
+    prev_st = None
+    max_end: Optional[datetime] = None
+    max_idx = -1
+    for st, start, end, i in entries:
+        if st != prev_st:
+            prev_st, max_end, max_idx = st, end, i
+            continue
+        a, b = exams[max_idx], exams[i]
+        if start < max_end:
+            out.append(Violation(KIND_OVERLAP,
+                                 f"Öğrenci {label(st)}: {a.code} ile {b.code} aynı anda.",
+                                 {"student": st, "courses": (a.course_id, b.course_id)}))
+        elif start - max_end < buffer_td:
+            out.append(Violation(KIND_BUFFER,
+                                 f"Öğrenci {label(st)}: {a.code} → {b.code} arası {int((start - max_end).total_seconds() // 60)} dk.",
+                                 {"student": st, "courses": (a.course_id, b.course_id),
+                                  "gap_min": int((start - max_end).total_seconds() // 60)}))
+        if end > max_end:
+            max_end, max_idx = end, i
+
+    # 4) Salon taraması — aynı aralıkta SharedRoom işaretli sınavlar tek rezervasyon sayılır
+    by_room: Dict[int, List[Tuple[datetime, datetime, int]]] = defaultdict(list)
+    for i, ex in enumerate(exams):
+        for rid in ex.room_ids:
+            by_room[rid].append((ex.start, ex.end, i))
+    for rid, lst in by_room.items():
+        lst.sort()
+        max_end, max_idx = None, -1
+        group: List[int] = []
+        for start, end, i in lst:
+            a = exams[max_idx] if max_idx >= 0 else None
+            if (a is not None and (start, end) == (a.start, a.end)
+                    and rid in a.shared_rooms and rid in exams[i].shared_rooms):
+                group.append(i)
+                continue
+            if max_end is not None and start < max_end:
+                b = exams[i]
+                out.append(Violation(KIND_ROOM,
+                                     f"Salon #{rid}: {a.code} ile {b.code} çakışıyor ({start:%d.%m %H:%M}).",
+                                     {"classroom_id": rid, "courses": (a.course_id, b.course_id)}))
+            if max_end is None or end > max_end:
+                _check_shared(rid, group, exams, students_by_course, cap, shared_cap, out)
+                group = [i]
+                max_end, max_idx = end, i
+        _check_shared(rid, group, exams, students_by_course, cap, shared_cap, out)
+
+    return out
+
+def _check_shared(rid: int, group: List[int], exams: List[_Exam],
+                  students_by_course: Dict[int, Iterable[int]],
+                  cap: Dict[int, int], shared_cap: Dict[int, int], out: List[Violation]) -> None:
+    """Paylaşılan salon: dersler iki koltuk katmanına sığıyor mu (salon bilgisi verildiyse)."""
+    if len(group) < 2 or rid not in cap:
+        return
+    members = sorted((exams[i] for i in group), key=lambda e: e.course_id)
+    needs = [len(e.students(students_by_course)) for e in members]
+    pinned = [len(e.room_ids) > 1 for e in members]
+    if pack_room_layers(needs, pinned, cap[rid], shared_cap.get(rid, 0)) is None:
+        out.append(Violation(KIND_CAPACITY,
+                             f"Salon #{rid}: paylaşan sınavlar ({', '.join(e.code for e in members)}) "
+                             f"koltuk düzenine sığmıyor ({members[0].start:%d.%m %H:%M}).",
+                             {"classroom_id": rid, "courses": tuple(e.course_id for e in members),
+                              "need": sum(needs)}))
+
+def summarize(violations: List[Violation]) -> Dict[str, int]:
+    """Tür → adet."""
+    counts: Dict[str, int] = defaultdict(int)
+    for v in violations:
+        counts[v.kind] += 1
+    return dict(counts)
@@ -1,9 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Dict, Any, Set, Tuple, Optional
+from dataclasses import dataclass, field, replace
+from typing import List, Dict, Any, Set, Tuple, Optional, Callable, Iterable
 from datetime import date, time, datetime, timedelta
 from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
+import numpy as np
 from db import get_connection
+from seat_plan_repo import exam_capacity, exam_shared_capacity, pack_room_layers
+from student_registry import StudentRegistry, get_registry
+from schedule_validator import KIND_GROUP, KIND_WEEKDAY, Violation, validate_schedule
 
 # ───────────────────── İstisnalar ─────────────────────
 class SchedulingError(Exception):
@@ -15,6 +20,7 @@ class DateRangeError(SchedulingError): ...
 class ClassroomNotFoundError(SchedulingError): ...
 class CapacityError(SchedulingError): ...
 class StudentOverlapError(SchedulingError): ...
+class InstructorUnavailableError(SchedulingError): ...
 
 # ───────────────────── Veri Modeli ────────────────────
 @dataclass
@@ -34,10 +40,99 @@ class Constraints:
     day_start_hour: int = 9
     day_end_hour: int   = 20
     slot_step_min: int  = 15
+    coarse_step_min: Optional[int] = None   # örn. 60/90: önce kaba ızgara, sonra ince ızgara
+                                            # (yalnız öğrenci/buffer kısıtında ince taramayla aynı sonuç)
 
     # Gün dağıtımı
     rotate_days_per_year: bool = True     # round-robin başlatma
 
+    # Sıcak başlangıç: önceki dönemin (aynı tür) tarih aralığı → dbo.Exams'tan okunur
+    warm_start_from: Optional[Tuple[date, date]] = None
+
+    # Yöntem: "greedy" | "kempe" | "tabu" (bkz. register_strategy)
+    strategy: str = "greedy"
+    optimizer_time_s: float = 2.0         # greedy sonrası iyileştirme bütçesi (sn)
+    objective_weights: Optional[Dict[str, int]] = None   # None → schedule_optimizer.OBJECTIVE_WEIGHTS
+
+    # Salon paylaşımı: aynı anda başlayan küçük sınavlar tek salonda, dönüşümlü koltuklarda
+    room_share_max: int = 1               # salon başına en çok ders (1 → paylaşım kapalı)
+
+    # Birlikte sınav grupları: aynı anda yapılması gereken dersler (şubeler, ortak kodlu dersler).
+    # Gruplar union-find ile birleştirilir; ortak eleman içeren gruplar tek grup olur.
+    exam_groups: Optional[List[List[int]]] = None
+
+    # Öğretim elemanı müsaitliği: InstructorID → kapalı [başlangıç, bitiş) aralıkları.
+    # Derse bağlanması chosen_courses içindeki "InstructorID" alanıyla olur (bkz. instructors_repo).
+    instructor_unavailability: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None
+
+    # Salon kapalı aralıkları (bakım, başka etkinlik): ClassroomID → [başlangıç, bitiş) aralıkları.
+    # Salon derslik listesinden çıkarılmaz; yerleştirici o aralıklarda salonu dolu sayar.
+    room_blackouts: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None
+
+@dataclass
+class ExamPeriod:
+    """Kampanya içindeki tek dönem (örn. Vize / Final / Bütünleme)."""
+    exam_type: str
+    date_start: date
+    date_end: date
+    exclude_weekdays: Optional[Set[int]] = None   # None → Constraints'teki değer
+
+@dataclass
+class ScheduleProblem:
+    """
+    DB'den bir kez yüklenip derlenen, dönemler arasında paylaşılan yapı:
+    kayıtlar, çakışma grafı ve salon modeli.
+    """
+    courses: List[Dict[str, Any]]
+    students_by_course: Dict[int, Set[int]]
+    student_counts: Dict[int, int]
+    conflicts: Dict[int, Dict[int, int]]   # CourseID -> {komşu CourseID: ortak öğrenci sayısı}
+    rooms_sorted: List[Dict[str, Any]]     # kapasiteye göre büyükten küçüğe
+    total_capacity: int
+    student_ids: Optional[np.ndarray] = None                 # sıralı öğrenci kimlikleri (int64)
+    course_student_idx: Optional[Dict[int, np.ndarray]] = None   # CourseID -> yoğun öğrenci indeksleri (int32)
+    registry: Optional[StudentRegistry] = None   # verilirse students_by_course kayıt indeksleri tutar
+
+    def student_no(self, st: int) -> str:
+        """UI/DB kenarı: öğrenci kimliğini StudentNo metnine çevirir."""
+        return self.registry.number(st) if self.registry is not None else str(st)
+
+# Slot ret nedenleri (CourseExplain.rejected indeksleri)
+REJ_GLOBAL, REJ_SAME_TIME, REJ_BUFFER, REJ_DAY_TARGET, REJ_ROOM_CAPACITY, REJ_ROOM_BUNDLE, REJ_INSTRUCTOR = range(7)
+REJECT_REASONS = ("global", "same_time", "buffer", "day_target", "room_capacity", "room_bundle", "instructor")
+
+@dataclass
+class CourseExplain:
+    """
+    Bir dersin yerleştirilme izi (greedy aşaması). Sayaçlar düz tamsayı artışlarıdır;
+    her çalıştırmada açıktır.
+    rejected[i]: REJECT_REASONS[i] nedeniyle elenen aday slot (gün hedefi için gün) sayısı.
+    rank: seçilen slotun incelenen adaylar arasındaki sırası (1 = ilk incelenen).
+    """
+    course_id: int
+    course_code: str
+    examined: int = 0
+    rejected: List[int] = field(default_factory=lambda: [0] * len(REJECT_REASONS))
+    rank: int = 0
+    via: str = ""                       # "hint" | "target" | "over_target"
+    chosen: Optional[Tuple[date, time]] = None
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(zip(REJECT_REASONS, self.rejected))
+
+@dataclass
+class ScheduleRun:
+    """Tek dönem çalıştırmasının sonucu: satırlar + bağımsız doğrulama bulguları + açıklama izi."""
+    rows: List[Dict[str, Any]]
+    violations: List[Violation]
+    explain: Dict[int, CourseExplain] = field(default_factory=dict)
+
+@dataclass
+class CampaignRun:
+    """Kampanya çalıştırmasının sonucu: dönem başına satırlar + birleşik programın doğrulama bulguları."""
+    rows: Dict[str, List[Dict[str, Any]]]
+    violations: List[Violation]
+
 # ───────────────────── Yardımcılar ────────────────────
 def _iter_days(cs: Constraints) -> List[date]:
     d = cs.date_start
@@ -48,24 +143,11 @@ def _iter_days(cs: Constraints) -> List[date]:
         d += timedelta(days=1)
     return days
 
-def _count_students_by_course(dept_id: int, course_ids: List[int]) -> Dict[int, int]:
-    if not course_ids:
-        return {}
-    conn = get_connection(); cur = conn.cursor()
-    q = f"""
-        SELECT CourseID, COUNT(DISTINCT StudentNo) AS cnt
-        FROM dbo.StudentCourses
-        WHERE DepartmentID=? AND CourseID IN ({",".join("?"*len(course_ids))})
-        GROUP BY CourseID
-    """
-    cur.execute(q, (dept_id, *course_ids))
-    out = {int(r[0]): int(r[1]) for r in cur.fetchall()}
-    conn.close()
-    return out
-
 def _course_students_map(dept_id: int, course_ids: List[int]) -> Dict[int, Set[int]]:
+    """CourseID → öğrenci kümesi; öğrenciler StudentRegistry indeksleriyle temsil edilir."""
     if not course_ids:
         return {}
+    reg = get_registry()
     conn = get_connection(); cur = conn.cursor()
     q = f"""
         SELECT CourseID, StudentNo
@@ -75,10 +157,41 @@ def _course_students_map(dept_id: int, course_ids: List[int]) -> Dict[int, Set[i
     cur.execute(q, (dept_id, *course_ids))
     mp: Dict[int, Set[int]] = defaultdict(set)
     for cid, s in cur.fetchall():
-        mp[int(cid)].add(int(s))
+        mp[int(cid)].add(reg.intern(s))
     conn.close()
     return mp
 
+def load_previous_schedule(dept_id: int, exam_type: str,
+                           date_start: date, date_end: date) -> Dict[int, datetime]:
+    """Önceki dönemin dbo.Exams kayıtları → {CourseID: StartDT} (bölüm + tür + aralık)."""
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("""
+        SELECT E.CourseID, MIN(E.StartDT)
+        FROM dbo.Exams E
+        JOIN dbo.Courses C ON C.CourseID = E.CourseID
+        WHERE C.DepartmentID = ? AND E.ExamType = ?
+          AND E.StartDT >= ? AND E.StartDT < ?
+        GROUP BY E.CourseID
+    """, (int(dept_id), exam_type, date_start, date_end + timedelta(days=1)))
+    out = {int(r[0]): r[1] for r in cur.fetchall()}
+    conn.close()
+    return out
+
+def _build_conflict_graph(students_by_course: Dict[int, Set[int]]) -> Dict[int, Dict[int, int]]:
+    """Ortak öğrencisi olan ders çiftleri → ortak öğrenci sayısı (iki yönlü)."""
+    courses_by_student: Dict[int, List[int]] = defaultdict(list)
+    for cid, studs in students_by_course.items():
+        for st in studs:
+            courses_by_student[st].append(cid)
+    graph: Dict[int, Dict[int, int]] = {cid: defaultdict(int) for cid in students_by_course}
+    for cids in courses_by_student.values():
+        for i in range(len(cids)):
+            for j in range(i + 1, len(cids)):
+                a, b = cids[i], cids[j]
+                graph[a][b] += 1
+                graph[b][a] += 1
+    return {cid: dict(nb) for cid, nb in graph.items()}
+
 def _duration_for_course(cs: Constraints, course_id: int) -> timedelta:
     if cs.per_course_durations and course_id in cs.per_course_durations:
         return timedelta(minutes=int(cs.per_course_durations[course_id]))
@@ -98,6 +211,47 @@ def _build_candidate_times(start_hour: int = 9, end_hour: int = 20, step_min: in
         cur += step
     return times
 
+def _map_warm_start(
+    previous: Dict[int, datetime],
+    prev_start: date,
+    new_start: date,
+    days: List[date],
+    daily_times: List[time]
+) -> Dict[int, Tuple[date, time]]:
+    """
+    Eski programı yeni aralığa taşır: gün ofseti korunur; gün uygun değilse
+    aynı haftagününün en yakını, o da yoksa en yakın gün seçilir.
+    Saat, aday saat ızgarasındaki en yakın değere yuvarlanır.
+    """
+    if not days or not daily_times:
+        return {}
+    day_set = set(days)
+    minutes = [t.hour * 60 + t.minute for t in daily_times]
+    hints: Dict[int, Tuple[date, time]] = {}
+    for cid, old in previous.items():
+        target = new_start + timedelta(days=(old.date() - prev_start).days)
+        if target in day_set:
+            d = target
+        else:
+            same_wd = [x for x in days if x.weekday() == old.weekday()]
+            d = min(same_wd or days, key=lambda x: (abs((x - target).days), x))
+        om = old.hour * 60 + old.minute
+        k = min(range(len(minutes)), key=lambda i: abs(minutes[i] - om))
+        hints[int(cid)] = (d, daily_times[k])
+    return hints
+
+def _exam_capacity(room: Dict[str, Any]) -> int:
+    """Oturma deseninden çıkan sınav kapasitesi (bkz. seat_plan_repo.exam_capacity)."""
+    return exam_capacity(room.get("Capacity"), room.get("Rows"), room.get("Cols"), room.get("DeskGroupSize"))
+
+def _shared_capacity(room: Dict[str, Any]) -> int:
+    """Paylaşımlı salonda ikincil katman kapasitesi (bkz. seat_plan_repo.exam_shared_capacity)."""
+    return exam_shared_capacity(room.get("Capacity"), room.get("Rows"), room.get("Cols"),
+                                room.get("DeskGroupSize"))
+
+def _room_label(room: Dict[str, Any], part: int) -> str:
+    return f"{room['Code']} - {room['Name']}" + (f" (Salon {part})" if part > 1 else "")
+
 # ── Gün hedefleri (sınıf başına) — 8 ders / 5 gün → 2-2-2-1-1 gibi ──
 def _build_year_day_targets(num_courses_for_year: int, days: List[date]) -> Dict[date, int]:
     """
@@ -126,8 +280,8 @@ def _build_year_day_targets(num_courses_for_year: int, days: List[date]) -> Dict
             remain -= 1
         i += 1
 
-    # Aşırı durum: 2 sınırı korunarak döngü
-    while remain > 0:
+    # Aşırı durum: 2 sınırı korunarak döngü (tüm günler 2'deyse kalan dersler hedef dışı kalır)
+    while remain > 0 and any(b < 2 for b in base):
         for i in range(D):
             if base[i] < 2:
                 add = min(2 - base[i], remain)
@@ -160,100 +314,404 @@ def _ordered_days_by_target(
         ordered = ordered[k:] + ordered[:k]
     return ordered
 
+class _DayQueue:
+    """
+    Tek sınıf yılının gün sırası: (load - target, gün) anahtarları sıralı listede tutulur.
+    Yerleştirmede yalnız değişen günün anahtarı bisect ile çıkarılıp yeniden eklenir; böylece
+    her ders için tüm günler yeniden sıralanmaz. Sıra _ordered_days_by_target ile birebir aynıdır.
+    """
+    def __init__(self, days: List[date], targets: Dict[date, int]):
+        self.targets = targets
+        self.load: Dict[date, int] = defaultdict(int)
+        self.keys: List[Tuple[int, date]] = sorted((-targets.get(d, 0), d) for d in days)
+
+    def bump(self, d: date) -> None:
+        """d gününe bu yıldan bir sınav eklendi."""
+        t = self.targets.get(d, 0)
+        i = bisect_left(self.keys, (self.load[d] - t, d))
+        del self.keys[i]
+        self.load[d] += 1
+        insort(self.keys, (self.load[d] - t, d))
+
+    def ordered(self, days: List[date], offset: int) -> List[date]:
+        if len(days) == len(self.keys):
+            ordered = [d for _, d in self.keys]
+        else:
+            # kampanya: dersin izinli günleri dönemin alt kümesi
+            allowed = set(days)
+            ordered = [d for _, d in self.keys if d in allowed]
+        if offset and len(ordered) > 1:
+            k = offset % len(ordered)
+            ordered = ordered[k:] + ordered[:k]
+        return ordered
+
+def _times_by_day(slots: List[Tuple[date, time]]) -> Dict[date, List[time]]:
+    """Slot listesinden gün → saatler dizisi (slot sırası korunur)."""
+    out: Dict[date, List[time]] = defaultdict(list)
+    for d, t in slots:
+        out[d].append(t)
+    return out
+
+class _SlotMask:
+    """
+    Aday başlangıçlar (gün, saat) → bit indeksi (zaman sırasıyla). Bir dersin kapalı başlangıçları
+    tek int bit maskesidir; aday filtresi ders başına tek AND: blocked >> bit & 1.
+    """
+    def __init__(self, slots: Iterable[Tuple[date, time]]):
+        keys = sorted(set(slots))
+        self.bit: Dict[Tuple[date, time], int] = {k: i for i, k in enumerate(keys)}
+        self.starts: List[datetime] = [datetime.combine(d, t) for d, t in keys]
+
+    def mask_for(self, intervals: List[Tuple[datetime, datetime]], duration: timedelta) -> int:
+        """[s, s + duration) bir kapalı aralıkla kesişen her başlangıç s için bit 1."""
+        m = 0
+        for bs, be in intervals:
+            lo = bisect_right(self.starts, bs - duration)   # s + duration > bs
+            hi = bisect_left(self.starts, be)               # s < be
+            if hi > lo:
+                m |= ((1 << (hi - lo)) - 1) << lo
+        return m
+
+    def blocked(self, mask: int, sk: Tuple[date, time]) -> bool:
+        i = self.bit.get(sk)
+        return bool(mask and i is not None and (mask >> i) & 1)
+
+def course_unavailability(cs: Constraints) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """CourseID → dersin öğretim elemanlarının (birleşik grupta tüm üyelerin) kapalı aralıkları."""
+    if not cs.instructor_unavailability:
+        return {}
+    out: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for c in cs.chosen_courses:
+        ids = c.get("InstructorIDs") or ([c["InstructorID"]] if c.get("InstructorID") is not None else [])
+        intervals = [iv for iid in ids for iv in cs.instructor_unavailability.get(int(iid), ())]
+        if intervals:
+            out[int(c["CourseID"])] = sorted(intervals)
+    return out
+
+def merge_intervals(intervals: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Başlangıca göre sıralı, kesişen/bitişik aralıkları birleştirilmiş (kesişmeyen) liste."""
+    out: List[Tuple[datetime, datetime]] = []
+    for s, e in sorted(intervals):
+        if e <= s:
+            continue
+        if out and s <= out[-1][1]:
+            if e > out[-1][1]:
+                out[-1] = (out[-1][0], e)
+        else:
+            out.append((s, e))
+    return out
+
+def interval_hit(lst: Optional[List[Tuple[datetime, datetime]]],
+                 start: datetime, end: datetime) -> bool:
+    """lst (sıralı, kesişmeyen) içinde [start, end) ile kesişen aralık var mı — bisect, O(log n)."""
+    if not lst:
+        return False
+    i = bisect_left(lst, (start,))
+    if i > 0 and lst[i - 1][1] > start:
+        return True
+    return i < len(lst) and lst[i][0] < end
+
+def room_blackout_index(cs: Constraints) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """ClassroomID → birleştirilmiş, sıralı kapalı aralıklar (bkz. Constraints.room_blackouts)."""
+    return {int(rid): merged for rid, ivs in (cs.room_blackouts or {}).items()
+            if (merged := merge_intervals(ivs))}
+
+def _slot_reject_reason(
+    sk: Tuple[date, time],
+    global_no_overlap: bool,
+    slot_courses: Dict[Tuple[date, time], List[int]],
+    neighbours: Dict[int, int],
+    latest_end: Optional[datetime],
+    buffer_td: timedelta
+) -> int:
+    """
+    Tek slot için global kısıt + öğrenci çakışma/buffer kontrolü. Uygunsa -1, değilse REJ_*.
+    latest_end: dersin öğrencilerinin en geç biten önceki sınavı (ders başına bir kez hesaplanır);
+    aynı slot çakışması çakışma grafındaki komşuluktan okunur (öğrenci kümeleri taranmaz).
+    """
+    placed = slot_courses.get(sk)
+    if global_no_overlap and placed:
+        return REJ_GLOBAL
+    if latest_end is not None:
+        start_dt = datetime.combine(sk[0], sk[1])
+        if (start_dt - latest_end) < buffer_td:
+            # önceki sınavı henüz bitmemiş öğrenci → zaman çakışması; bitmişse bekleme
+            return REJ_SAME_TIME if start_dt < latest_end else REJ_BUFFER
+    if placed:
+        for c in placed:
+            if c in neighbours:
+                return REJ_SAME_TIME
+    return -1
+
+def _slot_is_free(
+    sk: Tuple[date, time],
+    global_no_overlap: bool,
+    slot_courses: Dict[Tuple[date, time], List[int]],
+    neighbours: Dict[int, int],
+    latest_end: Optional[datetime],
+    buffer_td: timedelta
+) -> bool:
+    return _slot_reject_reason(sk, global_no_overlap, slot_courses, neighbours,
+                               latest_end, buffer_td) < 0
+
+# İdeal olmayan demette, gün içinde en fazla bu kadar uygun slot daha karşılaştırılır
+_ROOM_LOOKAHEAD = 8
+
 def _choose_slot_with_year_balance(
     days: List[date],
     slots: List[Tuple[date, time]],
     class_year: int,
     day_year_load: Dict[date, Dict[int, int]],
     global_no_overlap: bool,
-    slot_students: Dict[Tuple[date, time], Set[int]],
-    students: Set[int],
+    slot_courses: Dict[Tuple[date, time], List[int]],
+    neighbours: Dict[int, int],
     buffer_td: timedelta,
-    last_end_by_student: Dict[int, datetime],
+    latest_end: Optional[datetime],
     duration: timedelta,
     targets_for_year: Dict[date, int],
-    offset: int
+    offset: int,
+    coarse_slots: Optional[List[Tuple[date, time]]] = None,
+    allocator: Optional["_RoomAllocator"] = None,
+    need: int = 0,
+    explain: Optional[CourseExplain] = None,
+    day_times: Optional[Dict[date, List[time]]] = None,
+    coarse_day_times: Optional[Dict[date, List[time]]] = None,
+    day_queue: Optional[_DayQueue] = None,
+    blocked: int = 0,
+    slot_mask: Optional[_SlotMask] = None,
+    carried: int = 0
 ) -> Optional[Tuple[date, time]]:
     """
     1) Önce hedef ≤ günlerde slot ara.
     2) Bulamazsak, hedefi aşsa da en az sapmalı güne yerleştir (kitlenmeyi önlemek için).
+    coarse_slots verilirse her gün önce kaba ızgarada ilk uygun blok bulunur, ince ızgara
+    (slots) o bloğun alt sınırından itibaren pick_day ile taranır; kazanç, günün başındaki
+    uygunsuz başlangıçların kaba adımla atlanmasıdır. Öğrenci/buffer kısıtı zamanda monoton
+    olduğundan yalnız bu kısıt eleme yapıyorsa seçim ince taramayla aynıdır. Salon doluluğu,
+    öğretim elemanı/önceki dönem maskeleri ve global tek sınav kısıtı monoton değildir:
+    kaba noktalar kapalıyken aradaki bir ince başlangıç açık kalabilir, o zaman daha geç
+    bir saat ya da başka bir gün seçilebilir. İnce taramaya yalnız hiçbir gün bulunamazsa düşülür.
+    allocator verilirse slot, o aralıkta boş salonlardan kurulabilen en iyi demetle
+    birlikte puanlanır: boş koltuğu yetmeyen slot öğrenci kontrolünden önce O(1) elenir,
+    gün içinde (salon sayısı, waste) en iyi olan seçilir; ideal demet bulunursa hemen döner.
+    explain verilirse incelenen/elenen aday sayaçları ve seçilen sıra ona yazılır.
+    day_times/coarse_day_times (gün → saatler) ve day_queue (sınıf yılının gün sırası)
+    çağıran tarafından bir kez kurulup verilirse ders başına yeniden hesaplanmaz.
+    blocked: öğretim elemanı kapalı başlangıç maskesi (slot_mask bit indeksleriyle).
+    carried: öğrencilerin önceki kampanya dönemi sınavlarıyla çakışan başlangıç maskesi.
     """
-    # 1) Hedefi aşmadan dene
-    for d in _ordered_days_by_target(days, class_year, day_year_load, targets_for_year, offset):
-        if day_year_load[d].get(class_year, 0) >= targets_for_year.get(d, 0):
-            continue
-        for t in [s for (sd, s) in slots if sd == d]:
-            sk = (d, t)
-            if global_no_overlap and slot_students[sk]:
+    ex = explain if explain is not None else CourseExplain(0, "")
+    if day_times is None:
+        day_times = _times_by_day(slots)
+    if coarse_slots and coarse_day_times is None:
+        coarse_day_times = _times_by_day(coarse_slots)
+    rej = ex.rejected
+    room_blocked = [False]
+    instructor_blocked = [False]
+    carried_blocked = [False]
+    ideal: Optional[Tuple[int, ...]] = None
+    if allocator is not None:
+        full = allocator.best_bundle(need)
+        ideal = allocator.score_tuple(full, need)[:2] if full else None
+
+    bit = slot_mask.bit if ((blocked or carried) and slot_mask is not None) else None
+
+    def free(d: date, t: time) -> bool:
+        ex.examined += 1
+        if bit is not None:
+            b = bit[(d, t)]
+            if (blocked >> b) & 1:
+                instructor_blocked[0] = True
+                rej[REJ_INSTRUCTOR] += 1
+                return False
+            if (carried >> b) & 1:
+                carried_blocked[0] = True
+                rej[REJ_SAME_TIME] += 1
+                return False
+        if allocator is not None and not allocator.has_free_capacity(datetime.combine(d, t), duration, need):
+            room_blocked[0] = True
+            rej[REJ_ROOM_CAPACITY] += 1
+            return False
+        reason = _slot_reject_reason((d, t), global_no_overlap, slot_courses, neighbours,
+                                     latest_end, buffer_td)
+        if reason >= 0:
+            rej[reason] += 1
+            return False
+        return True
+
+    def room_fit(d: date, t: time) -> Optional[Tuple[int, ...]]:
+        if allocator is None:
+            return ()
+        start = datetime.combine(d, t)
+        if allocator.shared_room(need, start, start + duration) is not None:
+            return (0, 0)   # yeni salon açmadan paylaşım → en iyi olası uyum
+        bundle = allocator.best_bundle(need, allocator.free_rooms(start, start + duration))
+        if not bundle:
+            room_blocked[0] = True
+            rej[REJ_ROOM_BUNDLE] += 1
+            return None
+        return allocator.score_tuple(bundle, need)[:2]
+
+    def pick_day(d: date, times: Optional[Iterable[time]] = None) -> Optional[Tuple[date, time]]:
+        best: Optional[Tuple[Tuple[int, ...], Tuple[date, time], int]] = None
+        extra = 0
+        for t in (day_times.get(d, ()) if times is None else times):
+            if not free(d, t):
+                continue
+            fit = room_fit(d, t)
+            if fit is None:
                 continue
-            start_dt = datetime.combine(d, t)
-            # öğrenci çakışma/buffer
-            conflict = False
-            for st in students:
-                last = last_end_by_student.get(st)
-                if last and (start_dt - last) < buffer_td:
-                    conflict = True; break
-                if slot_students[sk] and st in slot_students[sk]:
-                    conflict = True; break
-            if not conflict:
+            if ideal is None or fit <= ideal:
+                ex.rank = ex.examined
                 return (d, t)
+            if best is None or fit < best[0]:
+                best = (fit, (d, t), ex.examined)
+            extra += 1
+            if extra >= _ROOM_LOOKAHEAD:
+                break
+        if best is None:
+            return None
+        ex.rank = best[2]
+        return best[1]
 
-    # 2) Hedefi aşarak en az sapmalı güne yerleştir
-    for d in _ordered_days_by_target(days, class_year, day_year_load, targets_for_year, offset):
-        for t in [s for (sd, s) in slots if sd == d]:
-            sk = (d, t)
-            if global_no_overlap and slot_students[sk]:
+    def scan_day_coarse(d: date) -> Optional[Tuple[date, time]]:
+        # Kaba bloklar [T_önceki, T] üzerinde ilk uygun T bulunur; ince ızgaraya T_önceki'den
+        # sonra inilir ve adaylar pick_day ile aynı salon uyumu/lookahead ölçütüyle puanlanır.
+        # Uygun T yoksa son bloktan sonraki kuyruk aynı şekilde denenir.
+        fine = day_times.get(d, [])
+        prev_t: Optional[time] = None
+        for t in coarse_day_times.get(d, ()):
+            if free(d, t) and room_fit(d, t) is not None:
+                break
+            prev_t = t
+        lo = 0 if prev_t is None else bisect_right(fine, prev_t)
+        return pick_day(d, fine[lo:])
+
+    def scan(respect_target: bool) -> Optional[Tuple[date, time]]:
+        if day_queue is not None:
+            ordered = day_queue.ordered(days, offset)
+        else:
+            ordered = _ordered_days_by_target(days, class_year, day_year_load, targets_for_year, offset)
+        if coarse_slots:
+            for d in ordered:
+                if respect_target and day_year_load[d].get(class_year, 0) >= targets_for_year.get(d, 0):
+                    rej[REJ_DAY_TARGET] += 1
+                    continue
+                found = scan_day_coarse(d)
+                if found:
+                    return found
+            # Öğrenci/buffer kısıtı zamanda monoton → bu kısıtla elenen gün ince taramada da elenir.
+            # Global tek sınav kısıtı, salon doluluğu, öğretim elemanı kapalı aralıkları ve önceki
+            # dönem sınavları ise kaba noktaları kapatıp araları açık bırakabilir; o zaman kaba
+            # tarama bir günü (ya da gün içindeki erken bir saati) kaçırabilir. Hiç gün bulunamadıysa
+            # ve bunlardan biri eleme yaptıysa ince taramaya düşülür.
+            if (not global_no_overlap and not room_blocked[0] and not instructor_blocked[0]
+                    and not carried_blocked[0]):
+                return None
+        for d in ordered:
+            if respect_target and day_year_load[d].get(class_year, 0) >= targets_for_year.get(d, 0):
+                rej[REJ_DAY_TARGET] += 1
                 continue
-            start_dt = datetime.combine(d, t)
-            conflict = False
-            for st in students:
-                last = last_end_by_student.get(st)
-                if last and (start_dt - last) < buffer_td:
-                    conflict = True; break
-                if slot_students[sk] and st in slot_students[sk]:
-                    conflict = True; break
-            if not conflict:
-                return (d, t)
-    return None
+            found = pick_day(d)
+            if found:
+                return found
+        return None
+
+    # 1) Hedefi aşmadan dene
+    chosen = scan(True)
+    if chosen:
+        ex.via = "target"
+        return chosen
+
+    # 2) Hedefi aşarak en az sapmalı güne yerleştir
+    ex.via = "over_target"
+    return scan(False)
 
 def _collect_student_conflict_examples(
     all_slots: List[Tuple[date, time]],
-    duration: timedelta,
     students: Set[int],
-    slot_students: Dict[Tuple[date, time], Set[int]],
-    last_end_by_student: Dict[int, datetime],
+    occupancy: "_Occupancy",
     buffer_td: timedelta,
-    slot_courses: Dict[Tuple[date, time], Set[str]],
-    last_course_by_student: Dict[int, str],
+    course_codes: Dict[int, str],
     limit: int = 10
 ) -> List[Dict[str, Any]]:
-    """Çakışma olduğunda örnek birkaç öğrenciyi açıklar."""
+    """Çakışma olduğunda örnek birkaç öğrenciyi açıklar (yalnız hata yolunda çalışır)."""
     examples: List[Dict[str, Any]] = []
-    seen: Set[int] = set()
-    for st in students:
+    first_start = min((datetime.combine(d, t) for d, t in all_slots), default=None)
+    for st in sorted(students):
         if len(examples) >= limit:
             break
-        same_time_courses: Set[str] = set()
-        buffer_block = False
-        for d, t in all_slots:
-            sk = (d, t)
-            if st in slot_students.get(sk, set()):
-                same_time_courses.update(slot_courses.get(sk, set()))
-            last = last_end_by_student.get(st)
-            if last:
-                start_dt = datetime.combine(d, t)
-                if (start_dt - last) < buffer_td:
-                    buffer_block = True
-        if same_time_courses and st not in seen:
-            examples.append({"student": st, "type": "same-time",
-                             "conflict_with": sorted(list(same_time_courses))[:5]})
-            seen.add(st)
-        elif buffer_block and st not in seen:
-            examples.append({"student": st, "type": "buffer",
-                             "conflict_with": [last_course_by_student.get(st, "")]})
-            seen.add(st)
+        placed = occupancy.placed_courses_of(st)
+        last = occupancy.last_end_of(st)
+        if placed:
+            examples.append({"student": occupancy.problem.student_no(st), "type": "same-time",
+                             "conflict_with": sorted(course_codes.get(c, str(c)) for c in placed)[:5]})
+        elif last and first_start and (first_start - last) < buffer_td:
+            examples.append({"student": occupancy.problem.student_no(st), "type": "buffer",
+                             "conflict_with": [course_codes.get(occupancy.last_course_of(st), "")]})
     return examples
 
+# ───────────────── Yerleşim Durumu ─────────────────
+_NO_EXAM = np.iinfo(np.int64).min
+
+class _Occupancy:
+    """
+    Yerleştirme sırasında tutulan durum:
+    - slot → o slota yerleşen CourseID listesi (öğrenci kümesi kopyalanmaz),
+    - öğrenci başına son sınav bitişi (dakika) ve son ders: yoğun öğrenci indeksli NumPy dizileri.
+    """
+    def __init__(self, problem: ScheduleProblem, base: datetime):
+        if problem.student_ids is None or problem.course_student_idx is None:
+            _intern_students(problem)
+        self.problem = problem
+        self.base = base
+        self.slot_courses: Dict[Tuple[date, time], List[int]] = defaultdict(list)
+        n = len(problem.student_ids)
+        self.last_end = np.full(n, _NO_EXAM, dtype=np.int64)
+        self.last_course = np.full(n, -1, dtype=np.int64)
+        self.placed: Dict[int, Tuple[date, time]] = {}
+
+    def _minutes(self, dt: datetime) -> int:
+        return int((dt - self.base).total_seconds() // 60)
+
+    def latest_end(self, cid: int) -> Optional[datetime]:
+        """Dersin öğrencilerinin en geç biten sınavı (hiç yoksa None)."""
+        idx = self.problem.course_student_idx.get(cid)
+        if idx is None or idx.size == 0:
+            return None
+        m = int(self.last_end[idx].max())
+        if m == _NO_EXAM:
+            return None
+        return self.base + timedelta(minutes=m)
+
+    def place(self, cid: int, sk: Tuple[date, time], end_dt: datetime) -> None:
+        self.slot_courses[sk].append(cid)
+        self.placed[cid] = sk
+        idx = self.problem.course_student_idx.get(cid)
+        if idx is not None and idx.size:
+            self.last_end[idx] = self._minutes(end_dt)
+            self.last_course[idx] = cid
+
+    # ── hata yolu yardımcıları ──
+    def _student_pos(self, st: int) -> int:
+        ids = self.problem.student_ids
+        i = int(np.searchsorted(ids, st))
+        return i if i < len(ids) and int(ids[i]) == st else -1
+
+    def last_end_of(self, st: int) -> Optional[datetime]:
+        i = self._student_pos(st)
+        if i < 0 or int(self.last_end[i]) == _NO_EXAM:
+            return None
+        return self.base + timedelta(minutes=int(self.last_end[i]))
+
+    def last_course_of(self, st: int) -> int:
+        i = self._student_pos(st)
+        return int(self.last_course[i]) if i >= 0 else -1
+
+    def placed_courses_of(self, st: int) -> List[int]:
+        sbc = self.problem.students_by_course
+        return [c for c in self.placed if st in sbc.get(c, ())]
+
 # ───────────────── Derslik Yerleştirici ─────────────────
 class _RoomAllocator:
     """
@@ -261,12 +719,131 @@ class _RoomAllocator:
     Amaç 1'de aynı sayıda salonla çözüm varsa, boş koltuk (waste) en az olanı seç.
     Amaç 2 (ikincil): Program genelinde aynı salonları tekrar kullanmaya eğilim (reuse).
     Amaç 3 (eşitlik bozucu): Toplam kullanım dakikası az olana öncelik (yük dengeleme).
+
+    Salon takvimi: her salon için başlangıca göre sıralı, kesişmeyen (başlangıç, bitiş)
+    aralıkları (bisect ile O(log n) kontrol) ve tick başına dolu kapasite indeksi
+    (aday başlangıçta boş koltuk yetmiyorsa O(1) ret). Salon kapalı aralıkları (blackouts)
+    kurulumda aynı takvime işlenir; salonun listeden elle çıkarılması gerekmez.
+
+    Paylaşım (share_max > 1): salon, aynı (başlangıç, bitiş) aralığındaki en çok share_max
+    derse iki katmanlı koltuk haritasıyla verilir (birincil = bench maskesi, ikincil = maskenin
+    arasındaki koltuklar); katmanlara dağıtım seat_plan_repo.pack_room_layers ile yapılır.
     """
-    def __init__(self, rooms_sorted: List[Dict[str, Any]]):
+    def __init__(self, rooms_sorted: List[Dict[str, Any]], tick_min: int = 15, share_max: int = 1,
+                 blackouts: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None):
         # beklenen alanlar: ClassroomID, Code, Name, Capacity
         self.rooms = rooms_sorted[:]
         self.used_minutes = defaultdict(int)  # room_id -> toplam kullanım dakikası
         self.used_once: Set[int] = set()      # programda en az 1 kez kullanılan salonlar
+        self.tick = timedelta(minutes=max(1, int(tick_min)))
+        self.total_capacity = sum(int(r["Capacity"]) for r in self.rooms)
+        self.busy: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+        self.busy_cap: Dict[datetime, int] = defaultdict(int)   # tick başlangıcı -> dolu kapasite
+        self.share_max = max(1, int(share_max))
+        self.room_by_id = {int(r["ClassroomID"]): r for r in self.rooms}
+        # (salon, başlangıç) -> (bitiş, [(CourseID, öğrenci, çok salonlu mu)])
+        self.shares: Dict[Tuple[int, datetime], Tuple[datetime, List[Tuple[int, int, bool]]]] = {}
+        self.share_rooms: Dict[datetime, List[int]] = defaultdict(list)   # başlangıç -> paylaşıma açık salonlar
+        self.share_free: Dict[datetime, int] = defaultdict(int)   # başlangıç -> paylaşımda boş koltuk (üst sınır)
+        if blackouts:
+            self._block(blackouts)
+
+    # ── Salon takvimi ──
+    def _tick_floor(self, dt: datetime) -> datetime:
+        midnight = datetime.combine(dt.date(), time(0, 0))
+        return dt - ((dt - midnight) % self.tick)
+
+    def has_free_capacity(self, start: datetime, duration: timedelta, need: int) -> bool:
+        """
+        O(1) ön eleme: başlangıç tick'inde boş koltuk toplamı need'den azsa False.
+        Izgara dışı başlangıç veya tick'ten kısa sınavda kesin değildir → True (elemez).
+        """
+        if duration < self.tick or self._tick_floor(start) != start:
+            return True
+        if self.share_free.get(start, 0) >= need:
+            return True
+        return self.total_capacity - self.busy_cap.get(start, 0) >= need
+
+    def is_room_free(self, room_id: int, start: datetime, end: datetime) -> bool:
+        return not interval_hit(self.busy.get(room_id), start, end)
+
+    def _block(self, blackouts: Dict[int, List[Tuple[datetime, datetime]]]) -> None:
+        """
+        Salon kapalı aralıkları takvime rezervasyon gibi işlenir (kurulumda, takvim boşken):
+        is_room_free'nin bisect kontrolü ve tick kapasite indeksi onları da görür.
+        Listede olmayan salonların kayıtları yok sayılır.
+        """
+        for rid, intervals in blackouts.items():
+            room = self.room_by_id.get(int(rid))
+            if room is None:
+                continue
+            for start, end in merge_intervals(intervals):
+                self._book([room], start, end)
+
+    def calendar(self) -> Dict[int, List[Tuple[datetime, datetime]]]:
+        """Salon → sıralı dolu aralıklar (kapalı aralıklar dahil) kopyası; yerleştirme öncesi alınırsa sabit takvimdir."""
+        return {rid: list(ivs) for rid, ivs in self.busy.items() if ivs}
+
+    def free_rooms(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        return [r for r in self.rooms if self.is_room_free(int(r["ClassroomID"]), start, end)]
+
+    def _book(self, bundle: List[Dict[str, Any]], start: datetime, end: datetime,
+              course_id: Optional[int] = None, need: int = 0) -> None:
+        for r in bundle:
+            insort(self.busy[int(r["ClassroomID"])], (start, end))
+            cap = int(r["Capacity"])
+            t = self._tick_floor(start)
+            while t < end:
+                self.busy_cap[t] += cap
+                t += self.tick
+        if self.share_max > 1 and course_id is not None:
+            # çok salonlu ders her salonunun birincil katmanını tümüyle tutar
+            pinned = len(bundle) > 1
+            for r in bundle:
+                rid = int(r["ClassroomID"])
+                entry = (int(course_id), int(need), pinned)
+                self.shares[(rid, start)] = (end, [entry])
+                self.share_rooms[start].append(rid)
+                self.share_free[start] += self._share_slack(r, [entry])
+
+    # ── Salon paylaşımı ──
+    @staticmethod
+    def _share_slack(room: Dict[str, Any], entries: List[Tuple[int, int, bool]]) -> int:
+        cap = int(room["Capacity"])
+        return cap + int(room.get("SharedCapacity") or 0) - sum(cap if p else n for _, n, p in entries)
+
+    def shared_room(self, need: int, start: datetime, end: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Aynı aralıkta zaten ayrılmış ve need kadar öğrenciyi katmanlarına alabilen en sıkı
+        salon (boş koltuğu en az kalan); yoksa None. Kaydetmez.
+        """
+        if self.share_max <= 1 or self.share_free.get(start, 0) < need:
+            return None
+        best: Optional[Tuple[int, int]] = None
+        for rid in self.share_rooms.get(start, ()):
+            g_end, entries = self.shares[(rid, start)]
+            if g_end != end or len(entries) >= self.share_max:
+                continue
+            room = self.room_by_id[rid]
+            slack = self._share_slack(room, entries) - need
+            if slack < 0 or (best is not None and slack >= best[0]):
+                continue
+            layers = pack_room_layers([n for _, n, _ in entries] + [need],
+                                      [p for _, _, p in entries] + [False],
+                                      int(room["Capacity"]), int(room.get("SharedCapacity") or 0))
+            if layers is not None:
+                best = (slack, rid)
+        return self.room_by_id[best[1]] if best else None
+
+    def _join(self, room: Dict[str, Any], start: datetime, course_id: int, need: int) -> None:
+        _, entries = self.shares[(int(room["ClassroomID"]), start)]
+        entries.append((int(course_id), int(need), False))
+        self.share_free[start] -= int(need)
+
+    def shared_groups(self) -> List[Tuple[int, datetime, List[int]]]:
+        """Birden çok dersin paylaştığı (salon, başlangıç, [CourseID]) kayıtları."""
+        return [(rid, start, [c for c, _, _ in entries])
+                for (rid, start), (_, entries) in self.shares.items() if len(entries) > 1]
 
     # Reuse önceliği için anahtar: (yeni mi, kullanılan dakika, -kapasite)
     def _key_for_reuse_desc(self, r: Dict[str, Any]) -> Tuple[int, int, int]:
@@ -278,13 +855,15 @@ class _RoomAllocator:
         # büyükten küçüğe, reuse & düşük yük öne
         return sorted(self.rooms, key=self._key_for_reuse_desc)
 
-    def _sorted_by_capacity_desc(self) -> List[Dict[str, Any]]:
-        return sorted(self.rooms, key=lambda r: int(r["Capacity"]), reverse=True)
+    @staticmethod
+    def _sorted_by_capacity_desc(rooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return sorted(rooms, key=lambda r: int(r["Capacity"]), reverse=True)
 
-    def _sorted_by_capacity_asc(self) -> List[Dict[str, Any]]:
-        return sorted(self.rooms, key=lambda r: int(r["Capacity"]))
+    @staticmethod
+    def _sorted_by_capacity_asc(rooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return sorted(rooms, key=lambda r: int(r["Capacity"]))
 
-    def _score_tuple(self, bundle: List[Dict[str, Any]], need: int) -> Tuple[int, int, int, int]:
+    def score_tuple(self, bundle: List[Dict[str, Any]], need: int) -> Tuple[int, int, int, int]:
         """
         Karşılaştırma için skor: (kardinalite, waste, new_used_total, used_minutes_total)
         Daha küçük daha iyidir.
@@ -296,16 +875,39 @@ class _RoomAllocator:
         used_minutes_total = sum(self.used_minutes[int(r["ClassroomID"])] for r in bundle)
         return (len(bundle), waste, new_used_total, used_minutes_total)
 
-    def _commit(self, bundle: List[Dict[str, Any]], duration_min: int) -> List[Dict[str, Any]]:
+    def _commit(self, bundle: List[Dict[str, Any]], duration_min: int,
+                start: Optional[datetime] = None, course_id: Optional[int] = None,
+                need: int = 0) -> List[Dict[str, Any]]:
         for r in bundle:
             rid = int(r["ClassroomID"])
             self.used_minutes[rid] += duration_min
             self.used_once.add(rid)
+        if start is not None:
+            self._book(bundle, start, start + timedelta(minutes=duration_min), course_id, need)
         return bundle
 
-    def _best_single(self, need: int) -> Optional[List[Dict[str, Any]]]:
+    def book_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Tamamlanmış bir programın satırlarını takvime işler (kampanyada önceki dönemler).
+        Satırlar iyileştiricilerin son hâlidir; paylaşılan salon aynı aralıkta bir kez işlenir
+        ve paylaşıma açılmaz (önceki dönemin sınavına yeni ders eklenmez).
+        """
+        seen: Set[Tuple[int, datetime, datetime]] = set()
+        for r in rows:
+            room = self.room_by_id.get(int(r["ClassroomID"]))
+            if room is None:
+                continue
+            start = datetime.combine(r["Date"], r["Start"])
+            end = start + timedelta(minutes=int(r["DurationMin"]))
+            key = (int(r["ClassroomID"]), start, end)
+            if key in seen:
+                continue
+            seen.add(key)
+            self._commit([room], int(r["DurationMin"]), start)
+
+    def _best_single(self, need: int, rooms: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
         # En küçük kapasiteyle ihtiyacı tek başına karşılayan salon
-        asc = self._sorted_by_capacity_asc()
+        asc = self._sorted_by_capacity_asc(rooms)
         candidates = [r for r in asc if int(r["Capacity"]) >= need]
         if not candidates:
             return None
@@ -315,9 +917,9 @@ class _RoomAllocator:
                                        int(r["Capacity"])))  # küçük kapasite öne
         return [candidates[0]]
 
-    def _best_pair(self, need: int) -> Optional[List[Dict[str, Any]]]:
+    def _best_pair(self, need: int, rooms: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
         # Two-pointer: toplam >= need ve toplam en küçük
-        asc = self._sorted_by_capacity_asc()
+        asc = self._sorted_by_capacity_asc(rooms)
         n = len(asc)
         i, j = 0, n - 1
         best_sum = None
@@ -341,53 +943,48 @@ class _RoomAllocator:
         # tek alternatif olmadığı için burada ekstra sıralamaya gerek yok
         return pair
 
-    def _best_triple(self, need: int) -> Optional[List[Dict[str, Any]]]:
-        # O(n^3): derslik sayısı genelde küçük olduğundan kabul edilebilir
-        asc = self._sorted_by_capacity_asc()
+    def _best_triple(self, need: int, rooms: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        # O(n^2 log n): (x, y) çifti için ihtiyacı tamamlayan en küçük z ikili aramayla bulunur
+        asc = self._sorted_by_capacity_asc(rooms)
         n = len(asc)
+        caps = [int(r["Capacity"]) for r in asc]
+        if n < 3 or sum(caps[-3:]) < need:
+            return None
         best_sum = None
         best = None
         for x in range(n):
-            for y in range(x+1, n):
-                for z in range(y+1, n):
-                    s = int(asc[x]["Capacity"]) + int(asc[y]["Capacity"]) + int(asc[z]["Capacity"])
-                    if s >= need:
-                        if best_sum is None or s < best_sum:
-                            best_sum = s
-                            best = [asc[x], asc[y], asc[z]]
+            for y in range(x+1, n - 1):
+                z = bisect_left(caps, need - caps[x] - caps[y], y + 1)
+                if z >= n:
+                    continue
+                s = caps[x] + caps[y] + caps[z]
+                if best_sum is None or s < best_sum:
+                    best_sum = s
+                    best = [asc[x], asc[y], asc[z]]
         return best
 
-    def allocate(self, need: int, duration_min: int) -> List[Dict[str, Any]]:
+    def best_bundle(self, need: int, rooms: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
+        Kaydetmeden en iyi demeti döndürür (yoksa []). rooms verilmezse tüm salonlar.
         0) Tek salon: ihtiyacı karşılayan EN KÜÇÜK kapasite (boşluğu minimize eder).
         1) Çift salon: toplam kapasite en küçük (two-pointer, waste minimize).
         2) Üç salon: toplam kapasite en küçük (waste minimize).
         3) Hâlâ yoksa: salon sayısını minimize etmek için büyükten küçüğe greedy.
-        Tüm adaylar eşitse: reuse & düşük yük öne.
+        Skorun ilk anahtarı salon sayısı olduğundan daha az salonlu aday bulunduğunda
+        daha kalabalık demetler hiç hesaplanmaz.
         """
-        candidates: List[List[Dict[str, Any]]] = []
-
-        s1 = self._best_single(need)
-        if s1:
-            candidates.append(s1)
-
-        s2 = self._best_pair(need)
-        if s2:
-            candidates.append(s2)
+        if rooms is None:
+            rooms = self.rooms
 
-        s3 = self._best_triple(need)
-        if s3:
-            candidates.append(s3)
-
-        if candidates:
-            # En iyi skoru seç
-            candidates.sort(key=lambda bundle: self._score_tuple(bundle, need))
-            return self._commit(candidates[0], duration_min)
+        for finder in (self._best_single, self._best_pair, self._best_triple):
+            bundle = finder(need, rooms)
+            if bundle:
+                return bundle
 
         # 4) Greedy: en az salon sayısı için büyükten küçüğe doldur
         plan: List[Dict[str, Any]] = []
         remain = int(need)
-        for r in self._sorted_by_capacity_desc():
+        for r in self._sorted_by_capacity_desc(rooms):
             if remain <= 0:
                 break
             cap = int(r["Capacity"])
@@ -404,10 +1001,306 @@ class _RoomAllocator:
         plan.sort(key=lambda r: (0 if int(r["ClassroomID"]) in self.used_once else 1,
                                  self.used_minutes[int(r["ClassroomID"])],
                                  -int(r["Capacity"])))
-        return self._commit(plan, duration_min)
+        return plan
+
+    def allocate(self, need: int, duration_min: int,
+                 start: Optional[datetime] = None,
+                 course_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        En iyi demeti seçip kaydeder. start verilirse yalnız o aralıkta boş salonlar
+        aday olur ve seçilen salonlar takvime işlenir.
+        Paylaşım açıksa (start ve course_id ile) önce aynı aralıktaki bir salona katılmak denenir.
+        """
+        rooms = None
+        if start is not None:
+            end = start + timedelta(minutes=duration_min)
+            if course_id is not None:
+                shared = self.shared_room(need, start, end)
+                if shared is not None:
+                    self._join(shared, start, course_id, need)
+                    return [shared]
+            rooms = self.free_rooms(start, end)
+        bundle = self.best_bundle(need, rooms)
+        if not bundle:
+            return []
+        return self._commit(bundle, duration_min, start, course_id, need)
+
+# ───────────────── Problem Derleme ──────────────────────
+def compile_problem(courses: List[Dict[str, Any]],
+                    classrooms: List[Dict[str, Any]],
+                    students_by_course: Dict[int, Set[int]],
+                    registry: Optional[StudentRegistry] = None) -> ScheduleProblem:
+    """
+    Yüklenmiş kayıtlardan çakışma grafını ve salon modelini kurar (DB'ye gitmez).
+    Salon modelinde Capacity = sınav kapasitesi (_exam_capacity); nominal değer
+    NominalCapacity alanında, paylaşımdaki ikincil katman SharedCapacity alanında tutulur.
+    """
+    course_ids = [int(c["CourseID"]) for c in courses]
+    sbc = {cid: set(students_by_course.get(cid, set())) for cid in course_ids}
+    rooms = [{**r, "NominalCapacity": int(r.get("Capacity") or 0), "Capacity": _exam_capacity(r),
+              "SharedCapacity": _shared_capacity(r)}
+             for r in classrooms]
+    problem = ScheduleProblem(
+        courses=list(courses),
+        students_by_course=sbc,
+        student_counts={cid: len(st) for cid, st in sbc.items()},
+        conflicts=_build_conflict_graph(sbc),
+        rooms_sorted=sorted(rooms, key=lambda r: int(r["Capacity"]), reverse=True),
+        total_capacity=sum(int(r["Capacity"]) for r in rooms),
+        registry=registry,
+    )
+    _intern_students(problem)
+    return problem
+
+def _intern_students(problem: ScheduleProblem) -> None:
+    """
+    Ders → int32 öğrenci indeks dizisi. Kayıt (registry) varsa kimlikler zaten yoğun indekstir;
+    yoksa (örn. bench, testler) özgün numaralar sıralanıp yoğunlaştırılır.
+    """
+    if problem.registry is not None:
+        problem.student_ids = np.arange(len(problem.registry), dtype=np.int64)
+        problem.course_student_idx = {
+            cid: np.fromiter(sts, dtype=np.int32, count=len(sts))
+            for cid, sts in problem.students_by_course.items()
+        }
+        return
+    all_ids = np.fromiter((st for sts in problem.students_by_course.values() for st in sts), dtype=np.int64)
+    problem.student_ids = np.unique(all_ids)
+    problem.course_student_idx = {
+        cid: np.searchsorted(problem.student_ids,
+                             np.fromiter(sts, dtype=np.int64, count=len(sts))).astype(np.int32)
+        for cid, sts in problem.students_by_course.items()
+    }
+
+def load_problem(department_id: int,
+                 courses: List[Dict[str, Any]],
+                 classrooms: List[Dict[str, Any]]) -> ScheduleProblem:
+    """Tek DB yüklemesi + derleme."""
+    course_ids = [int(c["CourseID"]) for c in courses]
+    sbc = _course_students_map(department_id, course_ids)
+    return compile_problem(courses, classrooms, sbc, registry=get_registry())
+
+def _check_capacity(problem: ScheduleProblem) -> None:
+    for c in problem.courses:
+        cid = int(c["CourseID"]); need = max(1, problem.student_counts.get(cid, 0))
+        if need > problem.total_capacity:
+            raise CapacityError(
+                f"Sınıf kapasitesi yetersiz! (Ders: {c['CourseCode']}, ihtiyaç: {need}, toplam sınav kapasitesi: {problem.total_capacity})",
+                {"course_code": c["CourseCode"], "need": need, "total_capacity": problem.total_capacity}
+            )
+
+# ───────────────── Birlikte Sınav Grupları ──────────────────────
+class _UnionFind:
+    """CourseID üzerinde ayrık kümeler (yol yarılama + boyuta göre birleştirme)."""
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+        self.size: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+def exam_group_members(cs: Constraints) -> Dict[int, List[int]]:
+    """
+    Temsilci CourseID → sıralı üye CourseID'leri (yalnız seçili derslerden, en az iki üyeli gruplar).
+    Temsilci grubun en küçük CourseID'sidir; böylece sonuç girdi sırasından bağımsızdır.
+    """
+    if not cs.exam_groups:
+        return {}
+    chosen = {int(c["CourseID"]) for c in cs.chosen_courses}
+    uf = _UnionFind()
+    for group in cs.exam_groups:
+        ids = [int(c) for c in group if int(c) in chosen]
+        for a, b in zip(ids, ids[1:]):
+            uf.union(a, b)
+        if ids:
+            uf.find(ids[0])
+    by_root: Dict[int, List[int]] = defaultdict(list)
+    for cid in uf.parent:
+        by_root[uf.find(cid)].append(cid)
+    return {min(m): sorted(m) for m in by_root.values() if len(m) > 1}
+
+def merge_exam_groups(cs: Constraints, problem: ScheduleProblem,
+                      groups: Dict[int, List[int]]) -> Tuple[Constraints, ScheduleProblem]:
+    """
+    Her grubu temsilci CourseID altında tek düğüme indirger: kayıtlar birleşir (ortak öğrenci
+    bir kez sayılır), süre üyelerin en uzunudur, çakışma grafı birleşik kayıtlardan yeniden kurulur.
+    Salon modeli ve öğrenci kaydı paylaşılır (DB'ye gitmez).
+    """
+    rep_of = {m: rep for rep, members in groups.items() for m in members}
+    course_by_id = {int(c["CourseID"]): c for c in cs.chosen_courses}
+
+    courses: List[Dict[str, Any]] = []
+    for c in cs.chosen_courses:
+        cid = int(c["CourseID"])
+        rep = rep_of.get(cid)
+        if rep is None:
+            courses.append(c)
+        elif cid == rep:
+            members = [course_by_id[m] for m in groups[rep]]
+            courses.append({**c, "CourseCode": " / ".join(str(m["CourseCode"]) for m in members),
+                            "InstructorIDs": sorted({int(i) for m in members
+                                                     for i in (m.get("InstructorIDs") or [m.get("InstructorID")])
+                                                     if i is not None})})
+
+    sbc: Dict[int, Set[int]] = {}
+    for cid, sts in problem.students_by_course.items():
+        rep = rep_of.get(cid, cid)
+        if rep in sbc:
+            sbc[rep] |= sts
+        else:
+            sbc[rep] = set(sts)
+
+    durations = dict(cs.per_course_durations or {})
+    for rep, members in groups.items():
+        durations[rep] = max(int(_duration_for_course(cs, m).total_seconds() // 60) for m in members)
+        for m in members:
+            if m != rep:
+                durations.pop(m, None)
+
+    merged = ScheduleProblem(
+        courses=[c for c in problem.courses if int(c["CourseID"]) not in rep_of]
+                + [c for c in courses if int(c["CourseID"]) in groups],
+        students_by_course=sbc,
+        student_counts={cid: len(st) for cid, st in sbc.items()},
+        conflicts=_build_conflict_graph(sbc),
+        rooms_sorted=problem.rooms_sorted,
+        total_capacity=problem.total_capacity,
+        registry=problem.registry,
+    )
+    _intern_students(merged)
+    return replace(cs, chosen_courses=courses, per_course_durations=durations), merged
+
+def _expand_group_rows(rows: List[Dict[str, Any]], groups: Dict[int, List[int]],
+                       cs: Constraints, problem: ScheduleProblem) -> List[Dict[str, Any]]:
+    """
+    Grup satırlarını ders başına satırlara açar. Demetteki salonlar üyelere sırayla dağıtılır
+    (kalabalık üye önce, büyük salon önce); bir salonu iki üye paylaşabilir. Her satır
+    ExamGroup = temsilci CourseID taşır.
+    """
+    course_by_id = {int(c["CourseID"]): c for c in cs.chosen_courses}
+    cap = {int(r["ClassroomID"]): int(r["Capacity"]) for r in problem.rooms_sorted}
+    out: List[Dict[str, Any]] = []
+    by_exam: Dict[Tuple[int, date, time], List[Dict[str, Any]]] = defaultdict(list)
+    for r in rows:
+        cid = int(r["CourseID"])
+        if cid in groups:
+            by_exam[(cid, r["Date"], r["Start"])].append(r)
+        else:
+            out.append(r)
+
+    for (rep, _, _), exam_rows in by_exam.items():
+        members = sorted(groups[rep], key=lambda m: (-problem.student_counts.get(m, 0), m))
+        exam_rows = sorted(exam_rows, key=lambda r: -cap.get(int(r["ClassroomID"]), 0))
+        i, left = 0, cap.get(int(exam_rows[0]["ClassroomID"]), 0)
+        for k, m in enumerate(members):
+            need = problem.student_counts.get(m, 0)
+            mine = [exam_rows[i]]
+            while need > left and i + 1 < len(exam_rows):
+                need -= left
+                i += 1
+                left = cap.get(int(exam_rows[i]["ClassroomID"]), 0)
+                mine.append(exam_rows[i])
+            left -= need
+            if k == len(members) - 1:
+                mine.extend(exam_rows[i + 1:])   # kalan salonlar son üyeye (rezervasyonla tutarlı)
+            elif left <= 0 and i + 1 < len(exam_rows):
+                i += 1
+                left = cap.get(int(exam_rows[i]["ClassroomID"]), 0)
+            course = course_by_id[m]
+            for r in mine:
+                out.append({**r, "CourseID": m, "CourseCode": course["CourseCode"],
+                            "CourseName": course["CourseName"], "ExamGroup": rep})
+    return out
+
+# ───────────────── Strateji Arayüzü ──────────────────────
+# Strateji: (cs, problem, **kw) -> satırlar. kw, schedule_problem parametreleridir
+# (allocator, earliest_day_by_course, previous, explain, progress); iyileştiriciler önce greedy'yi çağırır.
+_STRATEGIES: Dict[str, Callable[..., List[Dict[str, Any]]]] = {}
+
+def register_strategy(name: str, fn: Callable[..., List[Dict[str, Any]]]) -> None:
+    _STRATEGIES[name] = fn
+
+def _resolve_strategy(name: str) -> Callable[..., List[Dict[str, Any]]]:
+    if name not in _STRATEGIES:
+        import schedule_optimizer  # noqa: F401  (import sırasında kendi stratejilerini kaydeder)
+    fn = _STRATEGIES.get(name)
+    if fn is None:
+        raise SchedulingError(f"Bilinmeyen planlama yöntemi: {name}", {"strategy": name})
+    return fn
+
+def run_strategy(cs: Constraints, problem: ScheduleProblem, **kw) -> List[Dict[str, Any]]:
+    """
+    cs.strategy'yi çalıştırır. Birlikte sınav grupları varsa strateji birleşik problem üzerinde
+    çalışır (ders başına anahtarlı kw'ler temsilciye taşınır), satırlar sonra derslere açılır.
+    """
+    strategy = _resolve_strategy(cs.strategy)
+    groups = exam_group_members(cs)
+    if not groups:
+        return strategy(cs, problem, **kw)
+
+    mcs, merged = merge_exam_groups(cs, problem, groups)
+    _check_capacity(merged)
+    rep_of = {m: rep for rep, members in groups.items() for m in members}
+    if kw.get("earliest_day_by_course"):
+        earliest: Dict[int, date] = {}
+        for cid, d in kw["earliest_day_by_course"].items():
+            rep = rep_of.get(cid, cid)
+            earliest[rep] = max(d, earliest.get(rep, d))
+        kw["earliest_day_by_course"] = earliest
+    if kw.get("student_busy"):
+        busy: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+        for cid, ivs in kw["student_busy"].items():
+            busy[rep_of.get(cid, cid)].extend(ivs)
+        kw["student_busy"] = {rep: merge_intervals(ivs) for rep, ivs in busy.items()}
+    if kw.get("previous"):
+        previous: Dict[int, datetime] = {}
+        for cid in sorted(kw["previous"]):
+            previous.setdefault(rep_of.get(cid, cid), kw["previous"][cid])
+        kw["previous"] = previous
+    explain = kw.get("explain")
+
+    rows = _expand_group_rows(strategy(mcs, merged, **kw), groups, cs, problem)
+    if explain is not None:
+        for rep, members in groups.items():
+            ex = explain.get(rep)
+            if ex is not None:
+                for m in members:
+                    explain[m] = replace(ex, course_id=m, rejected=list(ex.rejected))
+    return rows
 
 # ───────────────── Ana Fonksiyon ──────────────────────
 def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return run_schedule(cs, classrooms).rows
+
+def run_schedule(cs: Constraints, classrooms: List[Dict[str, Any]],
+                 progress: Optional[Callable[[int, int], None]] = None) -> ScheduleRun:
+    """generate_schedule + üretilen programın schedule_validator ile bağımsız kontrolü."""
+    problem, previous = prepare_problem(cs, classrooms)
+    return solve_problem(cs, problem, previous, progress=progress)
+
+def prepare_problem(cs: Constraints, classrooms: List[Dict[str, Any]]
+                    ) -> Tuple[ScheduleProblem, Optional[Dict[int, datetime]]]:
+    """
+    DB'ye giden hazırlık: ön kontroller, kayıtlar + derleme ve (varsa) önceki dönem programı.
+    Dönüş çözüm için yeterlidir; solve_problem yerelde ya da schedule_service'te çalıştırılabilir.
+    """
     # 1) Uygun günler
     days = _iter_days(cs)
     if not days:
@@ -418,40 +1311,206 @@ def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List
     if not classrooms:
         raise ClassroomNotFoundError("Derslik bulunamadı!", {})
 
-    # 3) Öğrenci sayıları ve mapping
-    course_ids = [int(c["CourseID"]) for c in cs.chosen_courses]
-    student_counts = _count_students_by_course(cs.department_id, course_ids)
-    students_by_course = _course_students_map(cs.department_id, course_ids)
+    # 3) Öğrenci sayıları, mapping ve çakışma grafı
+    problem = load_problem(cs.department_id, cs.chosen_courses, classrooms)
 
     # 4) Kapasite ön kontrol (kritik)
-    total_capacity = sum(int(r["Capacity"]) for r in classrooms)
-    for c in cs.chosen_courses:
-        cid = int(c["CourseID"]); need = max(1, student_counts.get(cid, 0))
-        if need > total_capacity:
-            raise CapacityError(
-                f"Sınıf kapasitesi yetersiz! (Ders: {c['CourseCode']}, ihtiyaç: {need}, toplam kapasite: {total_capacity})",
-                {"course_code": c["CourseCode"], "need": need, "total_capacity": total_capacity}
-            )
+    _check_capacity(problem)
+
+    # 5) (opsiyonel) Önceki dönem programı
+    previous = None
+    if cs.warm_start_from:
+        ps, pe = cs.warm_start_from
+        previous = load_previous_schedule(cs.department_id, cs.exam_type, ps, pe)
+    return problem, previous
+
+def solve_problem(cs: Constraints, problem: ScheduleProblem,
+                  previous: Optional[Dict[int, datetime]] = None,
+                  progress: Optional[Callable[[int, int], None]] = None) -> ScheduleRun:
+    """Derlenmiş problem üzerinde seçili strateji + bağımsız doğrulama (DB'ye gitmez)."""
+    explain: Dict[int, CourseExplain] = {}
+    rows = run_strategy(cs, problem, previous=previous, explain=explain, progress=progress)
+
+    # 6) Bağımsız doğrulama (planlayıcının kendi kayıtlarına güvenmeden)
+    violations = validate_schedule(rows, problem.students_by_course, problem.rooms_sorted,
+                                   buffer_min=cs.buffer_min, exclude_weekdays=cs.exclude_weekdays,
+                                   student_label=problem.student_no,
+                                   unavailable=course_unavailability(cs),
+                                   room_blackouts=cs.room_blackouts)
+    return ScheduleRun(rows=rows, violations=violations, explain=explain)
+
+def _carried_student_busy(problem: ScheduleProblem, rows: List[Dict[str, Any]],
+                          buffer_td: timedelta) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """
+    Önceki dönem satırlarından CourseID → dersin en az bir öğrencisinin sınavda olduğu aralıklar
+    (dersin kendisi + çakışma grafındaki komşuları), her iki yanda bekleme payıyla genişletilip
+    birleştirilmiş. schedule_problem(student_busy=…) ve iyileştiriciler bu aralıklara sınav koymaz.
+    """
+    exams: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    seen: Set[Tuple[int, date, time]] = set()
+    for r in rows:
+        key = (int(r["CourseID"]), r["Date"], r["Start"])
+        if key in seen:
+            continue
+        seen.add(key)
+        start = datetime.combine(r["Date"], r["Start"])
+        exams[key[0]].append((start - buffer_td, start + timedelta(minutes=int(r["DurationMin"])) + buffer_td))
+    out: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for cid in problem.students_by_course:
+        ivs = list(exams.get(cid, ()))
+        for nb in problem.conflicts.get(cid, {}):
+            ivs.extend(exams.get(nb, ()))
+        if ivs:
+            out[cid] = merge_intervals(ivs)
+    return out
+
+def generate_campaign(
+    cs: Constraints,
+    periods: List[ExamPeriod],
+    classrooms: List[Dict[str, Any]],
+    min_gap_days: Optional[int] = None
+) -> CampaignRun:
+    """
+    Birden çok dönemi (Vize, Final, Bütünleme …) tek çağrıda planlar.
+    Kayıtlar bir kez yüklenir; çakışma grafı ve salon modeli dönemler arasında paylaşılır.
+    min_gap_days verilirse bir dersin sınavı, önceki dönemdeki sınavından en az
+    bu kadar gün sonra yapılır (örn. final ≥ vize + N gün).
+    Dönem aralıkları kesişebilir: önceki dönemlerin salon takvimi ve öğrenci sınav aralıkları
+    sonraki dönemlere taşınır, çakışma sonradan raporlanmak yerine yerleştirmede önlenir.
+    Dönüş: CampaignRun — {exam_type: satırlar} + birleşik programın doğrulama bulguları
+    """
+    if not periods:
+        return CampaignRun(rows={}, violations=[])
+    if not classrooms:
+        raise ClassroomNotFoundError("Derslik bulunamadı!", {})
+
+    period_cs: List[Constraints] = []
+    for p in periods:
+        pcs = replace(
+            cs, exam_type=p.exam_type, date_start=p.date_start, date_end=p.date_end,
+            exclude_weekdays=set(cs.exclude_weekdays if p.exclude_weekdays is None else p.exclude_weekdays)
+        )
+        if not _iter_days(pcs):
+            raise DateRangeError(f"Seçilen tarih aralığı sınavları barındırmıyor! ({p.exam_type})",
+                                 {"date_start": p.date_start, "date_end": p.date_end,
+                                  "exam_type": p.exam_type})
+        period_cs.append(pcs)
+
+    problem = load_problem(cs.department_id, cs.chosen_courses, classrooms)
+    _check_capacity(problem)
+
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    done: List[Dict[str, Any]] = []   # önceki dönemlerin son satırları
+    prev_day_by_course: Dict[int, date] = {}
+    for pcs in period_cs:
+        earliest: Optional[Dict[int, date]] = None
+        if min_gap_days is not None and prev_day_by_course:
+            earliest = {cid: d + timedelta(days=int(min_gap_days)) for cid, d in prev_day_by_course.items()}
+        # Takvim her dönemde son satırlardan yeniden kurulur: kempe/tabu sınavları
+        # ayırıcıya haber vermeden taşır, paylaşılan ayırıcı eski yerleri dolu sanırdı.
+        # Kullanım sayaçları da işlenir; reuse tercihi tüm kampanyada geçerli kalır.
+        allocator = _RoomAllocator(problem.rooms_sorted, cs.slot_step_min, cs.room_share_max,
+                                   cs.room_blackouts)
+        allocator.book_rows(done)
+        # Öğrenciler de taşınır: dönem aralıkları kesişirse önceki dönem sınavları (bekleme
+        # payıyla) dersin öğrencileri için kapalı aralık sayılır
+        busy = _carried_student_busy(problem, done, timedelta(minutes=int(pcs.buffer_min))) if done else None
+        rows = run_strategy(pcs, problem, allocator=allocator, earliest_day_by_course=earliest,
+                            student_busy=busy)
+        out[pcs.exam_type] = rows
+        done.extend(rows)
+        prev_day_by_course = {}
+        for r in rows:
+            cid = int(r["CourseID"])
+            if cid not in prev_day_by_course or r["Date"] < prev_day_by_course[cid]:
+                prev_day_by_course[cid] = r["Date"]
+
+    # Bağımsız doğrulama birleşik program üzerinde: dönemler arası salon ve öğrenci çakışmaları.
+    # Hariç tutulan günler ve birlikte sınav grupları (grup her dönemde bir kez sınava girer)
+    # döneme özgü olduğundan ayrıca dönem dönem denetlenir.
+    violations = [v for v in validate_schedule(done, problem.students_by_course, problem.rooms_sorted,
+                                               buffer_min=cs.buffer_min, student_label=problem.student_no,
+                                               unavailable=course_unavailability(cs),
+                                               room_blackouts=cs.room_blackouts)
+                  if v.kind != KIND_GROUP]
+    for pcs in period_cs:
+        violations.extend(v for v in validate_schedule(out[pcs.exam_type], {},
+                                                       exclude_weekdays=pcs.exclude_weekdays)
+                          if v.kind in (KIND_WEEKDAY, KIND_GROUP))
+    return CampaignRun(rows=out, violations=violations)
+
+def schedule_problem(
+    cs: Constraints,
+    problem: ScheduleProblem,
+    allocator: Optional["_RoomAllocator"] = None,
+    earliest_day_by_course: Optional[Dict[int, date]] = None,
+    previous: Optional[Dict[int, datetime]] = None,
+    explain: Optional[Dict[int, CourseExplain]] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    student_busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Derlenmiş problem üzerinde tek dönemlik yerleştirme (DB'ye gitmez).
+    previous verilirse (sıcak başlangıç) eski program yeni aralığa taşınıp
+    başlangıç ataması olarak denenir; yalnız uymayan dersler yeniden aranır.
+    explain verilirse her ders için CourseExplain (aday/ret sayaçları) doldurulur.
+    progress(yerleşen, toplam) her dersten sonra çağrılır.
+    student_busy: CourseID → öğrencilerinin önceki kampanya dönemlerinde sınavda olduğu
+    (bekleme payıyla genişletilmiş) aralıklar; bu aralıklara değen başlangıçlar elenir.
+    """
+    days = _iter_days(cs)
+    if not days:
+        raise DateRangeError("Seçilen tarih aralığı sınavları barındırmıyor!",
+                             {"date_start": cs.date_start, "date_end": cs.date_end})
+    student_counts = problem.student_counts
+    students_by_course = problem.students_by_course
 
     # 5) Sıralama (en kalabalık dersler önce)
     courses_sorted = sorted(cs.chosen_courses,
                             key=lambda c: student_counts.get(int(c["CourseID"]), 0),
                             reverse=True)
-    rooms_sorted = sorted(classrooms, key=lambda r: int(r["Capacity"]), reverse=True)
 
     # 6) Slot listesi (kayan zaman çizelgesi)
     daily_times = _build_candidate_times(cs.day_start_hour, cs.day_end_hour, cs.slot_step_min)
     slots: List[Tuple[date, time]] = [(d, t) for d in days for t in daily_times]
+    day_times: Dict[date, List[time]] = {d: daily_times for d in days}
+
+    # 6a) Kaba → ince ızgara: pahalı ilk tarama kaba başlangıçlarla yapılır
+    coarse_slots: Optional[List[Tuple[date, time]]] = None
+    if cs.coarse_step_min and int(cs.coarse_step_min) > int(cs.slot_step_min):
+        if int(cs.coarse_step_min) % int(cs.slot_step_min):
+            # kaba başlangıçlar ince ızgarada olmalı; yoksa ince tarama komşuluğu ıskalar
+            raise SchedulingError(
+                f"Kaba ızgara adımı ({cs.coarse_step_min} dk) slot adımının ({cs.slot_step_min} dk) katı olmalı!",
+                {"coarse_step_min": cs.coarse_step_min, "slot_step_min": cs.slot_step_min}
+            )
+        coarse_times = _build_candidate_times(cs.day_start_hour, cs.day_end_hour, int(cs.coarse_step_min))
+        coarse_slots = [(d, t) for d in days for t in coarse_times]
+    coarse_day_times = {d: coarse_times for d in days} if coarse_slots else None
+
+    # 6b) Öğretim elemanı kapalı aralıkları → ders başına kapalı başlangıç bit maskesi
+    unavailable = course_unavailability(cs)
+    student_busy = student_busy or {}
+    slot_mask = _SlotMask(slots + (coarse_slots or [])) if (unavailable or student_busy) else None
+
+    # 6c) Sıcak başlangıç: ipucu olan dersler eski kronolojik sırayla, kalanlar kalabalık önce
+    hints: Dict[int, Tuple[date, time]] = {}
+    if previous and cs.warm_start_from:
+        hints = _map_warm_start(previous, cs.warm_start_from[0], cs.date_start, days, daily_times)
+        hinted = sorted((c for c in courses_sorted if int(c["CourseID"]) in hints),
+                        key=lambda c: hints[int(c["CourseID"])])
+        courses_sorted = hinted + [c for c in courses_sorted if int(c["CourseID"]) not in hints]
 
     # 7) Takip yapıları
-    slot_students: Dict[Tuple[date, time], Set[int]] = defaultdict(set)
-    slot_courses:  Dict[Tuple[date, time], Set[str]] = defaultdict(set)
-    last_end_by_student: Dict[int, datetime] = {}
-    last_course_by_student: Dict[int, str] = {}
+    occ = _Occupancy(problem, datetime.combine(days[0], time(0, 0)))
+    slot_courses = occ.slot_courses
+    course_codes = {int(c["CourseID"]): c["CourseCode"] for c in cs.chosen_courses}
     day_year_load: Dict[date, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
 
     # 8) Salon yerleştirici
-    allocator = _RoomAllocator(rooms_sorted)
+    if allocator is None:
+        allocator = _RoomAllocator(problem.rooms_sorted, cs.slot_step_min, cs.room_share_max,
+                                   cs.room_blackouts)
 
     # 9) Round-robin ofsetleri
     year_day_offsets: Dict[int, int] = defaultdict(int)
@@ -464,6 +1523,7 @@ def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List
     targets_for_year: Dict[int, Dict[date, int]] = {}
     for y, n in year_course_count.items():
         targets_for_year[y] = _build_year_day_targets(n, days)
+    day_queues: Dict[int, _DayQueue] = {}   # yıl → gün sırası (yerleştirmede artımlı güncellenir)
 
     # 11) Yerleştirme
     result: List[Dict[str, Any]] = []
@@ -474,47 +1534,102 @@ def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List
         year = int(course.get("ClassYear", 0))
         need = max(1, student_counts.get(cid, 0))
         students = students_by_course.get(cid, set())
+        neighbours = problem.conflicts.get(cid, {})
+        latest_end = occ.latest_end(cid)
         duration = _duration_for_course(cs, cid)
 
-        chosen = _choose_slot_with_year_balance(
-            days, slots, year, day_year_load, cs.global_no_overlap,
-            slot_students, students, buffer_td, last_end_by_student, duration,
-            targets_for_year=targets_for_year.get(year, {d: 1 for d in days}),
-            offset=year_day_offsets[year] if cs.rotate_days_per_year else 0
-        )
+        # Kampanya kuralı: önceki dönem sınavından en az N gün sonra
+        course_days = days
+        if earliest_day_by_course and cid in earliest_day_by_course:
+            course_days = [d for d in days if d >= earliest_day_by_course[cid]]
+            if not course_days:
+                raise DateRangeError(
+                    f"Dönemler arası en az gün kuralı sınavı dönem dışına itiyor! "
+                    f"(Ders: {course['CourseCode']} — en erken {earliest_day_by_course[cid]:%d.%m.%Y}, "
+                    f"dönem sonu {days[-1]:%d.%m.%Y})",
+                    {"course_code": course["CourseCode"], "reason": "min_gap_past_period",
+                     "earliest_day": earliest_day_by_course[cid], "date_end": days[-1]}
+                )
+
+        duration_min = int(duration.total_seconds() // 60)
+        blocked = slot_mask.mask_for(unavailable[cid], duration) if cid in unavailable else 0
+        carried = slot_mask.mask_for(student_busy[cid], duration) if cid in student_busy else 0
+        ex = CourseExplain(cid, course["CourseCode"])
+        if explain is not None:
+            explain[cid] = ex
+        chosen = None
+        hint = hints.get(cid)
+        if hint and hint[0] in course_days and not (
+                (blocked or carried) and slot_mask.blocked(blocked | carried, hint)) and _slot_is_free(
+                hint, cs.global_no_overlap, slot_courses, neighbours, latest_end, buffer_td):
+            hs = datetime.combine(*hint)
+            if (allocator.shared_room(need, hs, hs + duration) is not None
+                    or allocator.best_bundle(need, allocator.free_rooms(hs, hs + duration))):
+                chosen = hint
+                ex.examined = ex.rank = 1
+                ex.via = "hint"
+        year_targets = targets_for_year.setdefault(year, {d: 1 for d in days})
+        if year not in day_queues:
+            day_queues[year] = _DayQueue(days, year_targets)
+        if chosen is None:
+            chosen = _choose_slot_with_year_balance(
+                course_days, slots, year, day_year_load, cs.global_no_overlap,
+                slot_courses, neighbours, buffer_td, latest_end, duration,
+                targets_for_year=year_targets,
+                offset=year_day_offsets[year] if cs.rotate_days_per_year else 0,
+                coarse_slots=coarse_slots,
+                allocator=allocator, need=need, explain=ex,
+                day_times=day_times, coarse_day_times=coarse_day_times,
+                day_queue=day_queues[year], blocked=blocked, slot_mask=slot_mask, carried=carried
+            )
         if not chosen:
             # Neden analizi
             cause = None
-            for d, t in slots:
-                sk = (d, t)
-                if cs.global_no_overlap and slot_students[sk]:
-                    cause = "global"; break
+            if cs.global_no_overlap and any(slot_courses.get(sk) for sk in slots):
+                cause = "global"
             if cause != "global":
-                start_end_list = [(datetime.combine(d, t), datetime.combine(d, t) + duration) for (d, t) in slots]
-                student_block = False
-                for (d, t), (start_dt, end_dt) in zip(slots, start_end_list):
-                    sk = (d, t)
-                    for st in students:
-                        last = last_end_by_student.get(st)
-                        if last and (start_dt - last) < buffer_td:
-                            student_block = True; break
-                        if slot_students[sk] and st in slot_students[sk]:
-                            student_block = True; break
-                    if student_block:
-                        break
+                student_block = any(
+                    _slot_reject_reason(sk, False, slot_courses, neighbours, latest_end, buffer_td) >= 0
+                    for sk in slots)
                 cause = "student" if student_block else "none"
+            # Öğrenci açısından uygun slot varsa tıkanıklık önceki dönem sınavlarından,
+            # öğretim elemanının kapalı aralıklarından ya da salon doluluğundandır
+            if cause != "global":
+                open_slots = [(d, t) for (d, t) in slots if d in course_days and _slot_is_free(
+                    (d, t), cs.global_no_overlap, slot_courses, neighbours, latest_end, buffer_td)]
+                free_slots = [sk for sk in open_slots if not (carried and slot_mask.blocked(carried, sk))]
+                if any(not (blocked and slot_mask.blocked(blocked, sk)) for sk in free_slots):
+                    cause = "room"
+                elif free_slots:
+                    cause = "instructor"
+                elif open_slots:
+                    cause = "previous_period"
 
             if cause == "student":
                 examples = _collect_student_conflict_examples(
-                    all_slots=slots, duration=duration, students=students,
-                    slot_students=slot_students, last_end_by_student=last_end_by_student,
-                    buffer_td=buffer_td, slot_courses=slot_courses, last_course_by_student=last_course_by_student,
-                    limit=10
+                    all_slots=slots, students=students, occupancy=occ,
+                    buffer_td=buffer_td, course_codes=course_codes, limit=10
                 )
                 raise StudentOverlapError(
                     f"Öğrencinin dersleri çakışıyor! (Ders: {course['CourseCode']})",
                     {"course_code": course["CourseCode"], "examples": examples}
                 )
+            elif cause == "previous_period":
+                raise StudentOverlapError(
+                    f"Öğrencinin önceki dönem sınavlarıyla çakışıyor! (Öğrenciler için uygun tüm slotlarda "
+                    f"önceki dönemden sınavı olan öğrenci var — Ders: {course['CourseCode']})",
+                    {"course_code": course["CourseCode"], "reason": "previous_period_overlap"}
+                )
+            elif cause == "instructor":
+                raise InstructorUnavailableError(
+                    f"Öğretim elemanı müsait değil! (Öğrenciler için uygun tüm slotlar kapalı aralıkta — Ders: {course['CourseCode']})",
+                    {"course_code": course["CourseCode"], "reason": "instructor_unavailable"}
+                )
+            elif cause == "room":
+                raise ClassroomNotFoundError(
+                    f"Derslik bulunamadı! (Uygun slotlarda yeterli boş derslik yok — Ders: {course['CourseCode']})",
+                    {"course_code": course["CourseCode"], "reason": "no_room_bundle"}
+                )
             elif cause == "global":
                 raise ClassroomNotFoundError(
                     f"Derslik bulunamadı! (Global tek sınav kısıtı nedeniyle uygun boş slot yok — Ders: {course['CourseCode']})",
@@ -528,10 +1643,10 @@ def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List
 
         d, t = chosen
         sk = (d, t)
+        ex.chosen = chosen
 
         # Derslik ataması — ÖNCELİK: (1) en az salon sayısı (2) en az waste (3) reuse (4) düşük yük
-        duration_min = int(duration.total_seconds() // 60)
-        bundle = allocator.allocate(need, duration_min)
+        bundle = allocator.allocate(need, duration_min, start=datetime.combine(d, t), course_id=cid)
         if not bundle:
             raise ClassroomNotFoundError(
                 f"Derslik bulunamadı! (Ders: {course['CourseCode']})",
@@ -542,9 +1657,8 @@ def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List
         part = 1
         start_dt = datetime.combine(d, t)
         end_dt   = start_dt + duration
-        slot_courses[sk].add(course["CourseCode"])
         for room in bundle:
-            room_label = f"{room['Code']} - {room['Name']}" + (f" (Salon {part})" if part > 1 else "")
+            room_label = _room_label(room, part)
             result.append({
                 "Date": d,
                 "Start": t,
@@ -560,17 +1674,27 @@ def generate_schedule(cs: Constraints, classrooms: List[Dict[str, Any]]) -> List
             part += 1
 
         # Öğrenci & gün yükü izleme
-        slot_students[sk].update(students)
-        for st in students:
-            last_end_by_student[st] = end_dt
-            last_course_by_student[st] = course["CourseCode"]
+        occ.place(cid, sk, end_dt)
         day_year_load[d][year] += 1
+        day_queues[year].bump(d)
 
         # round-robin ilerlet
         if cs.rotate_days_per_year:
             year_day_offsets[year] += 1
 
+        if progress:
+            progress(len(occ.placed), len(courses_sorted))
+
     if not result:
         raise SchedulingError("Kısıtlara uygun sınav bulunamadı.", {})
 
+    # Paylaşılan salon satırları işaretlenir (doğrulayıcı ve oturma planı bu bilgiyi kullanır)
+    if allocator.share_max > 1:
+        shared = {(cid, rid, st) for rid, st, cids in allocator.shared_groups() for cid in cids}
+        for r in result:
+            if (r["CourseID"], r["ClassroomID"], datetime.combine(r["Date"], r["Start"])) in shared:
+                r["SharedRoom"] = True
+
     return result
+
+register_strategy("greedy", schedule_problem)
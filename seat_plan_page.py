@@ -11,13 +11,13 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
     QTableWidget, QTableWidgetItem, QAbstractItemView, QMessageBox,
     QSplitter, QScrollArea, QHeaderView, QFileDialog, QListWidget, QListWidgetItem,
-    QComboBox, QSlider, QSizePolicy, QCheckBox
+    QComboBox, QSlider, QSizePolicy, QCheckBox, QApplication
 )
 from PyQt6.QtPrintSupport import QPrinter
 
 from db import get_connection
 from seat_plan_repo import (
-    list_exam_slots, build_plan_for_slot,
+    list_exam_slots, build_plan_for_slot, build_plans_for_department, get_plan_cache,
     PlanResult, Placement, RoomLayout
 )
 
@@ -75,8 +75,9 @@ class SeatPlanPage(QWidget):
         self._rooms_for_slot: List[RoomLayout] = []
         self._placement_by_room: Dict[int, List[Placement]] = {}
 
-        # Program fingerprint (değişiklik algılama)
+        # Program fingerprint (değişiklik algılama) + slot başına özet (önbellek temizliği)
         self._schedule_fingerprint: Optional[str] = None
+        self._slot_fingerprints: Dict[Tuple[int, datetime], str] = {}
 
         root = QVBoxLayout(self); root.setSpacing(10)
 
@@ -106,9 +107,12 @@ class SeatPlanPage(QWidget):
         self.btn_refresh.setCursor(Qt.CursorShape.PointingHandCursor)
         self.chk_auto = QCheckBox("Otomatik Yenile")
         self.chk_auto.setChecked(True)
+        self.chk_same_year = QCheckBox("Aynı sınıf yılı yan yana oturmasın")
+        self.chk_same_year.setToolTip("Aynı bench bloğuna aynı sınıf yılından iki öğrenci konmaz (mümkün olduğunca).")
 
         ctrl.addWidget(self.btn_refresh)
         ctrl.addWidget(self.chk_auto)
+        ctrl.addWidget(self.chk_same_year)
         ctrl.addStretch(1)
         ctrl.addWidget(self.chk_names); ctrl.addWidget(self.chk_grid)
         ctrl.addSpacing(12); ctrl.addWidget(zoom_lbl); ctrl.addWidget(self.zoom)
@@ -138,7 +142,16 @@ class SeatPlanPage(QWidget):
             QPushButton:hover  {{ background:#2b6be0; }}
             QPushButton:pressed{{ background:#1f56c4; }}
         """)
-        lv.addWidget(cap); lv.addWidget(self.slot_list, 1); lv.addWidget(self.btn_build)
+        self.btn_build_all = QPushButton("Tüm Slotlar İçin Oluştur ve Kaydet")
+        self.btn_build_all.setStyleSheet(f"""
+            QPushButton {{
+                background:#F3F4F6; color:{TEXT_DARK}; border:1px solid {BORDER}; border-radius:12px;
+                padding:8px 12px; font-weight:600;
+            }}
+            QPushButton:hover  {{ background:#E5E7EB; }}
+            QPushButton:disabled {{ color:#9CA3AF; }}
+        """)
+        lv.addWidget(cap); lv.addWidget(self.slot_list, 1); lv.addWidget(self.btn_build); lv.addWidget(self.btn_build_all)
         main.addWidget(left)
 
         # Sağ panel: çizim + tablo
@@ -180,6 +193,7 @@ class SeatPlanPage(QWidget):
         # Sinyaller
         self.slot_list.itemSelectionChanged.connect(self._on_selected)
         self.btn_build.clicked.connect(self._build_for_selected)
+        self.btn_build_all.clicked.connect(self._build_all)
         self.btn_refresh.clicked.connect(self._on_refresh_clicked)
         self.chk_names.toggled.connect(lambda v: self.canvas.set_options(show_names=v))
         self.chk_grid.toggled.connect(lambda v: self.canvas.set_options(show_grid=v))
@@ -232,9 +246,10 @@ class SeatPlanPage(QWidget):
 
         # fingerprint’i güncelle ve ilk yüklemede set et
         try:
-            fp = self._compute_schedule_fingerprint(dep_id)
+            fp, slot_fps = self._compute_schedule_fingerprint(dep_id)
             if initial or self._schedule_fingerprint is None:
                 self._schedule_fingerprint = fp
+                self._slot_fingerprints = slot_fps
         except Exception:
             # fingerprint okunamazsa sessiz geç
             pass
@@ -262,10 +277,11 @@ class SeatPlanPage(QWidget):
         return [RoomLayout(int(r[0]), r[1], int(r[2]), int(r[3]), int(r[4])) for r in rows]
 
     # --------------- Program Yenile ---------------
-    def _compute_schedule_fingerprint(self, dep_id: Optional[int]) -> str:
+    def _compute_schedule_fingerprint(self, dep_id: Optional[int]) -> Tuple[str, Dict[Tuple[int, datetime], str]]:
         """
         Exams + ExamRooms + Classrooms satırlarından deterministik fingerprint üretir.
         Bitiş zamanı EndDT yerine StartDT + DurationMin’den hesaplanır.
+        İkinci dönüş: (CourseID, StartDT) → o slotun satırlarının özeti.
         """
         conn = get_connection(); cur = conn.cursor()
 
@@ -300,17 +316,19 @@ class SeatPlanPage(QWidget):
         rows = cur.fetchall()
         conn.close()
 
-        import hashlib
         h = hashlib.sha256()
+        per_slot: dict = {}
         for r in rows:
-            h.update(("|".join(str(x) for x in r)).encode("utf-8"))
-        return h.hexdigest()
+            line = ("|".join(str(x) for x in r)).encode("utf-8")
+            h.update(line)
+            per_slot.setdefault((int(r[1]), r[3]), hashlib.sha256()).update(line)
+        return h.hexdigest(), {k: v.hexdigest() for k, v in per_slot.items()}
 
 
     def _on_refresh_clicked(self):
         dep_id = self._current_dep_id()
         try:
-            new_fp = self._compute_schedule_fingerprint(dep_id)
+            new_fp, new_slot_fps = self._compute_schedule_fingerprint(dep_id)
         except Exception as e:
             QMessageBox.warning(self, "Uyarı", f"Program okunamadı:\n{e}")
             # yine de listeyi yenilemeyi dene
@@ -319,6 +337,14 @@ class SeatPlanPage(QWidget):
 
         changed = (new_fp != self._schedule_fingerprint)
         self._schedule_fingerprint = new_fp
+        if changed:
+            # Yalnız satırları değişen/kalkan slotların önbellek kayıtları atılır
+            old_slot_fps = self._slot_fingerprints
+            cache = get_plan_cache()
+            for key in set(old_slot_fps) | set(new_slot_fps):
+                if old_slot_fps.get(key) != new_slot_fps.get(key):
+                    cache.invalidate_slot(*key)
+        self._slot_fingerprints = new_slot_fps
 
         self._load_slots()  # listeyi tazele
 
@@ -346,7 +372,8 @@ class SeatPlanPage(QWidget):
             course_id=slot.course_id,
             start_dt=slot.start_dt,
             forbidden_pairs=set(),
-            prefer_front_student_nos=[]
+            prefer_front_student_nos=[],
+            avoid_same_year=self.chk_same_year.isChecked()
         )
         self._plan = plan
         if plan.errors:
@@ -366,6 +393,52 @@ class SeatPlanPage(QWidget):
         self._sync_canvas_width()
         self._fill_table(plan.placements)
 
+    def _build_all(self):
+        n = self.slot_list.count()
+        if n == 0:
+            QMessageBox.information(self, "Slot Yok", "Oturma planı üretilecek sınav slotu yok."); return
+        ans = QMessageBox.question(self, "Onay", f"{n} slotun oturma planı üretilip kaydedilecek "
+                                                 f"(mevcut kayıtlı planların yerine). Devam edilsin mi?")
+        if ans != QMessageBox.StandardButton.Yes:
+            return
+
+        def progress(done: int, total: int):
+            self.btn_build_all.setText(f"Oluşturuluyor… {done}/{total}")
+            QApplication.processEvents()
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self.btn_build_all.setEnabled(False)
+        try:
+            batch = build_plans_for_department(self._current_dep_id(),
+                                               avoid_same_year=self.chk_same_year.isChecked(),
+                                               progress=progress)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Toplu plan oluşturulamadı:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+            self.btn_build_all.setEnabled(True)
+            self.btn_build_all.setText("Tüm Slotlar İçin Oluştur ve Kaydet")
+
+        ok = len(batch.plans) - len(batch.errors)
+        warned = sum(1 for k, p in batch.plans.items() if p.warnings and k not in batch.errors)
+        msg = f"Plan üretilen slot: {ok} / {len(batch.plans)}\nKaydedilen yerleşim: {batch.saved}"
+        if warned:
+            msg += f"\nUyarılı slot: {warned}"
+        if batch.errors:
+            labels: Dict[Tuple[int, datetime], str] = {}
+            for i in range(n):
+                slot: SlotItem = self.slot_list.item(i).data(Qt.ItemDataRole.UserRole)
+                labels[(slot.course_id, slot.start_dt)] = slot.info
+            lines = [f"• {labels.get(key, f'#{key[0]} {key[1]:%d.%m %H:%M}')}: {'; '.join(errs)}"
+                     for key, errs in list(batch.errors.items())[:10]]
+            if len(batch.errors) > 10:
+                lines.append("…")
+            msg += f"\n\nHatalı slot: {len(batch.errors)}\n" + "\n".join(lines)
+            QMessageBox.warning(self, "Toplu Oturma Planı", msg)
+        else:
+            QMessageBox.information(self, "Toplu Oturma Planı", msg)
+
     def _sync_canvas_width(self):
         """Yatay scrollbar için içerik genişliğini, en geniş salonun sütununa göre ayarla."""
         if not self._rooms_for_slot:
@@ -621,7 +694,7 @@ class _SeatCanvas(QWidget):
 
                 brush = seat_bg
                 if allowed and not filled: brush = seat_empty
-                if allowed and filled:      brush = seat_fill
+                if filled:                  brush = seat_fill   # paylaşımlı salonda ikincil koltuk da dolu olabilir
 
                 pen = QPen(seat_line)
                 pen.setWidthF(0.6 if for_pdf else 1.1 * z)
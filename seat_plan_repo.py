@@ -1,46 +1,114 @@
 # seat_plan_repo.py
 # SQL Server şema: Exams, Courses, ExamRooms, Classrooms, Students, StudentCourses
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional, Set
+from dataclasses import dataclass, field, replace
+from typing import List, Tuple, Dict, Optional, Set, Sequence, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import OrderedDict
+from itertools import product
 from datetime import datetime
+from functools import lru_cache
+import hashlib
+import os
+
+import numpy as np
 
 from db import get_connection
+from student_registry import normalize_no
 
 # ───────────── Veri Modelleri ─────────────
-@dataclass(frozen=True)
+# Değişmez ve __slots__'lu: plan başına binlerce örnek, örnek başına __dict__ yok
+@dataclass(frozen=True, slots=True)
 class Student:
     no: str
     name: str
     class_year: Optional[int] = None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RoomLayout:
     classroom_id: int
     classroom_name: str
     rows: int
     cols: int
     bench_size: int  # Classrooms.DeskGroupSize (2/3/4)
+    # Paylaşımlı salon: 0 → birincil koltuklar (bench maskesi), 1 → ikincil koltuklar.
+    # seat_skip/seat_limit: katmanda bu derse düşen ardışık koltuk dilimi (None → tamamı)
+    layer: int = 0
+    seat_skip: int = 0
+    seat_limit: Optional[int] = None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SeatPos:
     row: int  # 0-index
     col: int  # 0-index
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Placement:
     student: Student
     classroom_id: int
     classroom_name: str
     pos: SeatPos
 
+# Salon ızgarası hücre değerleri (≥ 0 → PlanResult.students indeksi)
+SEAT_EMPTY = -1      # oturulabilir, boş
+SEAT_BLOCKED = -2    # bu plan için koltuk yok (bench maskesi / başka dersin dilimi)
+
 @dataclass
 class PlanResult:
+    """
+    Plan dizi tabanlı tutulur: salon başına rows×cols int32 ızgara (grids) ve ızgara
+    değerlerinin işaret ettiği öğrenci listesi (yerleşme sırası). Placement/SeatPos
+    nesneleri yalnız placements / empty_slots okunduğunda (UI) üretilir.
+    """
     exam_id: int                       # ExamID; slot planında -1
-    placements: List[Placement]
     warnings: List[str]
     errors: List[str]
-    empty_slots: Dict[int, List[SeatPos]]  # classroom_id -> boş slotlar
+    students: List[Student] = field(default_factory=list)
+    rooms: List[RoomLayout] = field(default_factory=list)
+    grids: Dict[int, np.ndarray] = field(default_factory=dict)   # classroom_id -> ızgara (salt okunur)
+    _placements: Optional[List[Placement]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def n_placed(self) -> int:
+        return sum(int(np.count_nonzero(g >= 0)) for g in self.grids.values())
+
+    def seats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Yerleşen öğrenciler, yerleşme sırasıyla: (öğrenci indeksi, ClassroomID, satır, sütun) dizileri."""
+        parts = []
+        for rid, g in self.grids.items():
+            rs, cs = np.nonzero(g >= 0)
+            parts.append((g[rs, cs], np.full(len(rs), rid, dtype=np.int32), rs, cs))
+        if not parts:
+            e = np.empty(0, dtype=np.int32)
+            return e, e, e, e
+        k, rid, rs, cs = (np.concatenate(x) for x in zip(*parts))
+        o = np.argsort(k, kind="stable")
+        return k[o], rid[o], rs[o].astype(np.int32), cs[o].astype(np.int32)
+
+    def seat_rows(self) -> List[Tuple[str, int, int, int]]:
+        """Kayıt satırları (StudentNo, ClassroomID, RowIndex, ColIndex); Placement üretmez."""
+        k, rid, rs, cs = self.seats()
+        sts = self.students
+        return [(sts[a].no, b, c, d) for a, b, c, d in zip(k.tolist(), rid.tolist(), rs.tolist(), cs.tolist())]
+
+    @property
+    def placements(self) -> List[Placement]:
+        if self._placements is None:
+            names = {r.classroom_id: r.classroom_name for r in self.rooms}
+            k, rid, rs, cs = self.seats()
+            sts = self.students
+            self._placements = [Placement(sts[a], b, names.get(b, ""), SeatPos(c, d))
+                                for a, b, c, d in zip(k.tolist(), rid.tolist(), rs.tolist(), cs.tolist())]
+        return self._placements
+
+    @property
+    def empty_slots(self) -> Dict[int, List[SeatPos]]:
+        """classroom_id -> boş slotlar (slot sırası)."""
+        out: Dict[int, List[SeatPos]] = {}
+        for rid, g in self.grids.items():
+            rs, cs = np.nonzero(g == SEAT_EMPTY)
+            out[rid] = [SeatPos(r, c) for r, c in zip(rs.tolist(), cs.tolist())]
+        return out
 
 # ─────────────────────────────────────────────────────────────
 # 1) LISTELEME — ExamID bazlı
@@ -188,25 +256,28 @@ def list_exam_slots(department_id: Optional[int] = None) -> List[Tuple[int, date
 def build_plan_for_exam(
     exam_id: int,
     forbidden_pairs: Optional[Set[Tuple[str, str]]] = None,   # (StudentNo, StudentNo)
-    prefer_front_student_nos: Optional[List[str]] = None
+    prefer_front_student_nos: Optional[List[str]] = None,
+    avoid_same_year: bool = False
 ) -> PlanResult:
     """
     1) StudentCourses → öğrencileri, ExamRooms/Classrooms → salon düzenini çeker
-    2) Kurallara göre yerleştirir
+    2) Kurallara göre yerleştirir (yasak çiftler / avoid_same_year → komşu koltuk kısıtı)
     3) PlanResult döndürür
     """
     students, rooms, _meta = _fetch_exam_context(exam_id)
     if not rooms:
-        return PlanResult(exam_id, [], [], ["Bu sınav için derslik atanmamış."], {})
+        return PlanResult(exam_id, [], ["Bu sınav için derslik atanmamış."])
     if not students:
-        return PlanResult(exam_id, [], [], ["Bu sınavı alan öğrenci bulunamadı."], {})
+        return PlanResult(exam_id, [], ["Bu sınavı alan öğrenci bulunamadı."])
 
     result = _build_seating_plan(
         students=students,
         rooms=rooms,
         forbidden_pairs={(min(a, b), max(a, b)) for (a, b) in (forbidden_pairs or set())},
-        prefer_front=prefer_front_student_nos or []
+        prefer_front=prefer_front_student_nos or [],
+        avoid_same_year=avoid_same_year
     )
+    result.warnings.extend(_meta.get("ShareWarnings") or [])
     result.exam_id = exam_id  # type: ignore
     return result
 
@@ -217,89 +288,493 @@ def build_plan_for_slot(
     course_id: int,
     start_dt: datetime,
     forbidden_pairs: Optional[Set[Tuple[str, str]]] = None,
-    prefer_front_student_nos: Optional[List[str]] = None
+    prefer_front_student_nos: Optional[List[str]] = None,
+    avoid_same_year: bool = False,
+    use_cache: bool = True
 ) -> PlanResult:
     """
     Aynı CourseID + StartDT’ye sahip TÜM ExamID’lerin salonlarını birleştirir ve tek plan üretir.
+    Salonu aynı anda başka derslerle paylaşıyorsa yalnız bu derse düşen koltuk dilimi kullanılır.
+    use_cache: girdiler (salonlar, kayıtlar, seçenekler) değişmediyse önce bellekteki, sonra
+    aynı PlanKey ile kaydedilmiş plan döner; yerleştirme yeniden çalışmaz.
     """
-    students, rooms = _fetch_slot_context(course_id, start_dt)
+    students, rooms, share_warnings = _fetch_slot_context(course_id, start_dt)
     if not rooms:
-        return PlanResult(-1, [], [], ["Bu ders-slot için derslik atanmamış."], {})
+        return PlanResult(-1, [], ["Bu ders-slot için derslik atanmamış."])
     if not students:
-        return PlanResult(-1, [], [], ["Bu dersi alan öğrenci bulunamadı."], {})
+        return PlanResult(-1, [], ["Bu dersi alan öğrenci bulunamadı."])
+
+    key = plan_key(course_id, start_dt, rooms, students,
+                   seating_options_hash(forbidden_pairs, prefer_front_student_nos, avoid_same_year))
+    cache = get_plan_cache()
+    if use_cache:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        stored = _load_persisted_slot_plan(course_id, start_dt, rooms, students, plan_key_digest(key))
+        if stored is not None:
+            stored.warnings.extend(share_warnings)
+            cache.put(key, stored)
+            return stored
 
     res = _build_seating_plan(
         students=students,
         rooms=rooms,
         forbidden_pairs={(min(a, b), max(a, b)) for (a, b) in (forbidden_pairs or set())},
-        prefer_front=prefer_front_student_nos or []
+        prefer_front=prefer_front_student_nos or [],
+        avoid_same_year=avoid_same_year
     )
+    res.warnings.extend(share_warnings)
+    if not res.errors:
+        cache.put(key, res)
     return res
 
+# ─────────────────────────────────────────────────────────────
+# 4b) TOPLU PLAN — bölümün tüm slotları (küme tabanlı sorgu + süreç havuzu)
+# ─────────────────────────────────────────────────────────────
+@dataclass
+class SlotContext:
+    course_id: int
+    start_dt: datetime
+    students: List[Student]
+    rooms: List[RoomLayout]
+    warnings: List[str] = field(default_factory=list)
+    exam_ids: List[int] = field(default_factory=list)              # slottaki tüm ExamID'ler
+    exam_by_room: Dict[int, int] = field(default_factory=dict)      # ClassroomID → ExamID (kayıt için)
+
+@dataclass
+class BatchPlanResult:
+    plans: Dict[Tuple[int, datetime], PlanResult]
+    errors: Dict[Tuple[int, datetime], List[str]]   # slot → hata mesajları (plan üretilemedi)
+    saved: int = 0                                   # yazılan yerleşim satırı
+
+_DEPT_STARTS_CTE = """
+    DeptStarts AS (
+        SELECT DISTINCT e.StartDT
+        FROM dbo.Exams e
+        JOIN dbo.Courses c ON c.CourseID = e.CourseID
+        {dep_filter}
+    )
+"""
+
+def fetch_slot_contexts(department_id: Optional[int] = None) -> Dict[Tuple[int, datetime], SlotContext]:
+    """
+    Bölümün tüm slotlarının (CourseID + StartDT) öğrenci ve salon bilgisi iki sorguda:
+      1) bölümün başlangıç saatlerindeki tüm sınav-salon satırları (paylaşılan salonlardaki
+         diğer bölüm dersleri dahil; paylaşım dilimi bellekte hesaplanır),
+      2) bu sınavlardaki derslerin öğrencileri.
+    Slot başına sorgu yoktur; anahtar sırası list_exam_slots ile aynıdır (StartDT, CourseID).
+    """
+    dep_filter = "WHERE c.DepartmentID = ?" if department_id is not None else ""
+    params = (int(department_id),) if department_id is not None else ()
+    cte = _DEPT_STARTS_CTE.format(dep_filter=dep_filter)
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            WITH {cte}
+            SELECT e.ExamID, e.CourseID, e.StartDT, c.DepartmentID,
+                   cl.ClassroomID, cl.Name, cl.Rows, cl.Cols, cl.DeskGroupSize
+            FROM dbo.Exams e
+            JOIN DeptStarts ds ON ds.StartDT = e.StartDT
+            JOIN dbo.Courses c ON c.CourseID = e.CourseID
+            LEFT JOIN dbo.ExamRooms er ON er.ExamID = e.ExamID
+            LEFT JOIN dbo.Classrooms cl ON cl.ClassroomID = er.ClassroomID
+            ORDER BY e.StartDT, e.CourseID, cl.Name, e.ExamID
+        """, *params)
+        exam_rows = cur.fetchall()
+        cur.execute(f"""
+            WITH {cte},
+            Involved AS (
+                SELECT DISTINCT e.CourseID FROM dbo.Exams e JOIN DeptStarts ds ON ds.StartDT = e.StartDT
+            )
+            SELECT sc.CourseID, s.StudentNo, s.FullName, s.ClassYear
+            FROM dbo.StudentCourses sc
+            JOIN Involved i ON i.CourseID = sc.CourseID
+            JOIN dbo.Students s ON s.StudentNo = sc.StudentNo
+            ORDER BY sc.CourseID, s.StudentNo
+        """, *params)
+        student_rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    # Öğrenciler
+    students_by_course: Dict[int, List[Student]] = {}
+    seen: Set[Tuple[int, str]] = set()
+    for cid, no, name, year in student_rows:
+        key = (int(cid), str(no))
+        if key in seen:
+            continue
+        seen.add(key)
+        students_by_course.setdefault(int(cid), []).append(
+            Student(no=str(no), name=name, class_year=(int(year) if year is not None else None)))
+
+    out: Dict[Tuple[int, datetime], SlotContext] = {}
+    courses_at: Dict[Tuple[datetime, int], Set[int]] = {}     # (StartDT, salon) → CourseID'ler
+    rooms_of: Dict[Tuple[int, datetime], Set[int]] = {}       # (CourseID, StartDT) → salonlar
+    for exam_id, cid, start, dept, rid, name, rows, cols, bench in exam_rows:
+        cid, exam_id = int(cid), int(exam_id)
+        if rid is not None:
+            courses_at.setdefault((start, int(rid)), set()).add(cid)
+            rooms_of.setdefault((cid, start), set()).add(int(rid))
+        if department_id is not None and (dept is None or int(dept) != int(department_id)):
+            continue
+        ctx = out.get((cid, start))
+        if ctx is None:
+            ctx = out[(cid, start)] = SlotContext(cid, start, students_by_course.get(cid, []), [])
+        if exam_id not in ctx.exam_ids:
+            ctx.exam_ids.append(exam_id)
+        if rid is not None and int(rid) not in ctx.exam_by_room:
+            ctx.exam_by_room[int(rid)] = exam_id
+            ctx.rooms.append(RoomLayout(classroom_id=int(rid), classroom_name=name,
+                                        rows=int(rows), cols=int(cols), bench_size=int(bench)))
+
+    need = {cid: len(v) for cid, v in students_by_course.items()}
+    for (cid, start), ctx in out.items():
+        shared = {r.classroom_id: courses_at[(start, r.classroom_id)] for r in ctx.rooms
+                  if len(courses_at.get((start, r.classroom_id), ())) > 1}
+        if shared:
+            room_count = {c: len(rooms_of.get((c, start), ())) for c in set().union(*shared.values())}
+            ctx.rooms, ctx.warnings = _apply_room_sharing(cid, ctx.rooms, shared, room_count, need)
+    return out
+
+def _plan_slot(ctx: SlotContext, avoid_same_year: bool = False) -> PlanResult:
+    """Süreç havuzunda çalışır: tek slotun planı (build_plan_for_slot ile aynı kurallar)."""
+    if not ctx.rooms:
+        return PlanResult(-1, [], ["Bu ders-slot için derslik atanmamış."])
+    if not ctx.students:
+        return PlanResult(-1, [], ["Bu dersi alan öğrenci bulunamadı."])
+    res = _build_seating_plan(ctx.students, ctx.rooms, set(), [], avoid_same_year=avoid_same_year)
+    res.warnings.extend(ctx.warnings)
+    return res
+
+def build_plans_for_department(
+    department_id: Optional[int],
+    avoid_same_year: bool = False,
+    save: bool = True,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> BatchPlanResult:
+    """
+    Bölümün tüm slotlarının oturma planı: bağlamlar tek seferde okunur, planlar süreç
+    havuzunda üretilir (max_workers=1 → süreç açılmaz), save=True ise hatasız planlar
+    save_plans ile tek işlemde yazılır. Bir slotun hatası diğerlerini durdurmaz.
+    Önbellekte (get_plan_cache) girdileri aynı olan slotlar yeniden yerleştirilmez;
+    üretilen planlar önbelleğe girer ve PlanKey ile kaydedilir.
+    """
+    contexts = fetch_slot_contexts(department_id)
+    keys = list(contexts)
+    options = seating_options_hash(avoid_same_year=avoid_same_year)
+    pkeys = {k: plan_key(k[0], k[1], ctx.rooms, ctx.students, options) for k, ctx in contexts.items()}
+    cache = get_plan_cache()
+    plans: Dict[Tuple[int, datetime], PlanResult] = {}
+    errors: Dict[Tuple[int, datetime], List[str]] = {}
+    done = 0
+
+    def collect(key: Tuple[int, datetime], fn: Callable[[], PlanResult]) -> None:
+        nonlocal done
+        try:
+            res = fn()
+        except Exception as e:
+            res = PlanResult(-1, [], [f"Plan üretilemedi: {e}"])
+        plans[key] = res
+        if res.errors:
+            errors[key] = res.errors
+        else:
+            cache.put(pkeys[key], res)
+        done += 1
+        if progress:
+            progress(done, len(keys))
+
+    todo: List[Tuple[int, datetime]] = []
+    for key in keys:
+        hit = cache.get(pkeys[key])
+        if hit is not None:
+            collect(key, lambda: hit)
+        else:
+            todo.append(key)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(todo))
+    if workers <= 1:
+        for key in todo:
+            collect(key, lambda: _plan_slot(contexts[key], avoid_same_year))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futs = {pool.submit(_plan_slot, contexts[k], avoid_same_year): k for k in todo}
+            for f in as_completed(futs):
+                collect(futs[f], f.result)
+    plans = {k: plans[k] for k in keys}   # slot sırası
+
+    saved = 0
+    if save:
+        by_exam: Dict[int, List[SeatRow]] = {}
+        digests: Dict[int, str] = {}
+        for key, res in plans.items():
+            if res.errors:
+                continue
+            ctx = contexts[key]
+            digest = plan_key_digest(pkeys[key])
+            for exam_id in ctx.exam_ids:
+                by_exam.setdefault(exam_id, [])
+                digests[exam_id] = digest
+            for row in res.seat_rows():     # ızgaradan doğrudan; Placement üretilmez
+                by_exam[ctx.exam_by_room[row[1]]].append(row)
+        saved = _save_rows(by_exam, digests)
+    return BatchPlanResult(plans, errors, saved)
+
+# ─────────────────────────────────────────────────────────────
+# 4c) PLAN ÖNBELLEĞİ — slot içeriği parmak izine göre (LRU + kayıtlı planlar)
+# ─────────────────────────────────────────────────────────────
+# (CourseID, StartDT, salon dizisi, kayıt sürümü, seçenek özeti). Salon dizisi paylaşım
+# dilimi uygulanmış hâlidir (katman/atlama/sınır); sıra planı etkilediği için korunur.
+PlanKey = Tuple[int, datetime, Tuple[Tuple[int, ...], ...], str, str]
+
+def enrollment_version(students: Iterable[Student]) -> str:
+    """Slot öğrencilerinin (sırasıyla numara, ad, sınıf yılı) özeti; kayıt değişince değişir."""
+    h = hashlib.sha1()
+    for st in students:
+        h.update(f"{st.no}\x1f{st.name}\x1f{st.class_year}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+def seating_options_hash(forbidden_pairs: Optional[Set[Tuple[str, str]]] = None,
+                         prefer_front: Optional[Sequence[str]] = None,
+                         avoid_same_year: bool = False) -> str:
+    pairs = sorted((min(a, b), max(a, b)) for a, b in (forbidden_pairs or ()))
+    return hashlib.sha1(repr((pairs, list(prefer_front or ()), bool(avoid_same_year))).encode("utf-8")).hexdigest()
+
+def plan_key(course_id: int, start_dt: datetime, rooms: Sequence[RoomLayout],
+             students: Sequence[Student], options_hash: str) -> PlanKey:
+    room_set = tuple((r.classroom_id, r.rows, r.cols, r.bench_size, r.layer, r.seat_skip,
+                      -1 if r.seat_limit is None else r.seat_limit) for r in rooms)
+    return (int(course_id), start_dt, room_set, enrollment_version(students), options_hash)
+
+def plan_key_digest(key: PlanKey) -> str:
+    """SeatPlans.PlanKey kolonuna yazılan kısa özet."""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+def _copy_plan(plan: PlanResult) -> PlanResult:
+    # listeler kopyalanır: çağıran uyarı eklese de önbellekteki plan değişmez; ızgaralar salt okunur, paylaşılır
+    return replace(plan, warnings=list(plan.warnings), errors=list(plan.errors),
+                   students=list(plan.students), rooms=list(plan.rooms), grids=dict(plan.grids))
+
+class SeatPlanCache:
+    """
+    PlanKey → PlanResult, en az kullanılan önce atılır (OrderedDict). Anahtar girdileri
+    kapsadığı için değişen slot zaten ıskalar; invalidate_slot program parmak izi
+    değiştiğinde yalnız etkilenen slotların eski kayıtlarını boşaltır.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[PlanKey, PlanResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: PlanKey) -> Optional[PlanResult]:
+        plan = self._data.get(key)
+        if plan is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return _copy_plan(plan)
+
+    def put(self, key: PlanKey, plan: PlanResult) -> None:
+        self._data[key] = _copy_plan(plan)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate_slot(self, course_id: int, start_dt: datetime) -> int:
+        drop = [k for k in self._data if k[0] == course_id and k[1] == start_dt]
+        for k in drop:
+            del self._data[k]
+        return len(drop)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+_plan_cache = SeatPlanCache()
+
+def get_plan_cache() -> SeatPlanCache:
+    return _plan_cache
+
+def _load_persisted_slot_plan(course_id: int, start_dt: datetime, rooms: List[RoomLayout],
+                              students: List[Student], digest: str) -> Optional[PlanResult]:
+    """
+    Slotun kayıtlı planı, tüm satırları aynı PlanKey'i taşıyorsa (girdiler değişmemiş) döner;
+    aksi hâlde None. Tek sorgu: anahtar denetimi ve koltuklar birlikte okunur.
+    Öğrenciler kayıttan değil slotun güncel listesinden (ad, sınıf yılı) eşlenir; aynı PlanKey
+    aynı listeyi garanti eder. Boş koltuklar salon düzeninden yeniden hesaplanır.
+    """
+    ensure_seat_plan_schema()   # süreçte ilk çağrıdan sonra yalnız bayrak kontrolü
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT sp.PlanKey, sp.StudentNo, sp.ClassroomID, sp.RowIndex, sp.ColIndex
+            FROM SeatPlans sp
+            JOIN Exams e ON e.ExamID = sp.ExamID
+            WHERE e.CourseID = ? AND e.StartDT = ?
+            ORDER BY sp.ExamID, sp.ClassroomID, sp.RowIndex, sp.ColIndex
+        """, course_id, start_dt)
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+    if not rows or any(r[0] != digest for r in rows):
+        return None
+
+    by_no = {s.no: s for s in students}
+    room_name = {r.classroom_id: r.classroom_name for r in rooms}
+    placements: List[Placement] = []
+    for _, no, rid, row, col in rows:
+        st = by_no.get(str(no))
+        if st is None:
+            return None
+        placements.append(Placement(st, int(rid), room_name.get(int(rid), ""), SeatPos(int(row), int(col))))
+    return _plan_from_placements(rooms, placements, [])
+
 # ─────────────────────────────────────────────────────────────
 # 5) PLAN KAYDET / OKU
 # ─────────────────────────────────────────────────────────────
+SEAT_PLANS_DDL = """
+IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'SeatPlans')
+BEGIN
+    CREATE TABLE SeatPlans(
+        ExamID      INT          NOT NULL,
+        StudentNo   NVARCHAR(32) NOT NULL,
+        ClassroomID INT          NOT NULL,
+        RowIndex    INT          NOT NULL,
+        ColIndex    INT          NOT NULL,
+        CreatedAt   DATETIME2    NOT NULL DEFAULT SYSUTCDATETIME(),
+        PlanKey     NVARCHAR(40) NULL      -- plan_key_digest: planı üreten girdilerin özeti
+    );
+    CREATE INDEX IX_SeatPlans_ExamID ON SeatPlans(ExamID);
+END
+IF COL_LENGTH('SeatPlans', 'PlanKey') IS NULL
+    ALTER TABLE SeatPlans ADD PlanKey NVARCHAR(40) NULL;
+"""
+
+_schema_checked = False
+
+def ensure_seat_plan_schema() -> None:
+    """
+    SeatPlans tablosunu süreç başına bir kez garanti eder. Uygulama açılışında çağrılır;
+    çağrılmamışsa ilk kayıtta devreye girer (betikler, havuz süreçleri).
+    DDL başarısız olsa da yeniden denenmez: hata ilk çağırana fırlar, sonraki kayıt/okumalar
+    tabloya doğrudan gider.
+    """
+    global _schema_checked
+    if _schema_checked:
+        return
+    _schema_checked = True
+    conn = get_connection()
+    try:
+        conn.cursor().execute(SEAT_PLANS_DDL)
+        conn.commit()
+    finally:
+        conn.close()
+
+INSERT_PLAN_SQL = """
+    INSERT INTO SeatPlans(ExamID, StudentNo, ClassroomID, RowIndex, ColIndex, PlanKey)
+    VALUES(?, ?, ?, ?, ?, ?)
+"""
+
+SeatRow = Tuple[str, int, int, int]   # (StudentNo, ClassroomID, RowIndex, ColIndex)
+
+def _write_plans(cur, plans: Dict[int, Sequence[SeatRow]],
+                 plan_keys: Optional[Dict[int, str]] = None) -> int:
+    """
+    Verilen cursor üzerinde (işlemi çağıran yönetir): eski planlar ExamID parçalarıyla
+    silinir, yeniler tek executemany ile yazılır. pyodbc'de fast_executemany açılır →
+    parametre dizisi tek gidişte gönderilir (satır başına gidiş yok).
+    plan_keys: ExamID → plan_key_digest (yoksa NULL; önbellek o planı kullanmaz).
+    """
+    keys = plan_keys or {}
+    ids = sorted(plans)
+    for i in range(0, len(ids), 500):   # SQL Server parametre sınırı (2100) altında kal
+        chunk = ids[i:i + 500]
+        cur.execute(f"DELETE FROM SeatPlans WHERE ExamID IN ({','.join('?' * len(chunk))})", chunk)
+    payload = [(exam_id, no, rid, r, c, keys.get(exam_id))
+               for exam_id in ids for no, rid, r, c in plans[exam_id]]
+    if payload:
+        if hasattr(cur, "fast_executemany"):
+            cur.fast_executemany = True
+        cur.executemany(INSERT_PLAN_SQL, payload)
+    return len(payload)
+
 def save_plan(exam_id: int, placements: List[Placement]) -> None:
     """
-    SeatPlans tablosuna yazar. Şema:
+    SeatPlans tablosuna yazar (tek işlem, toplu ekleme). Şema:
       SeatPlans(ExamID INT, StudentNo NVARCHAR(32), ClassroomID INT,
                 RowIndex INT, ColIndex INT, CreatedAt DATETIME2 DEFAULT SYSUTCDATETIME())
     """
-    conn = get_connection(); cur = conn.cursor()
+    save_plans({int(exam_id): placements})
 
-    cur.execute("""
-    IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'SeatPlans')
-    BEGIN
-        CREATE TABLE SeatPlans(
-            ExamID      INT          NOT NULL,
-            StudentNo   NVARCHAR(32) NOT NULL,
-            ClassroomID INT          NOT NULL,
-            RowIndex    INT          NOT NULL,
-            ColIndex    INT          NOT NULL,
-            CreatedAt   DATETIME2    NOT NULL DEFAULT SYSUTCDATETIME()
-        );
-        CREATE INDEX IX_SeatPlans_ExamID ON SeatPlans(ExamID);
-    END
-    """)
-
-    cur.execute("DELETE FROM SeatPlans WHERE ExamID = ?", exam_id)
-    for p in placements:
-        cur.execute("""
-            INSERT INTO SeatPlans(ExamID, StudentNo, ClassroomID, RowIndex, ColIndex)
-            VALUES(?, ?, ?, ?, ?)
-        """, exam_id, p.student.no, p.classroom_id, p.pos.row, p.pos.col)
+def save_plans(plans: Dict[int, List[Placement]],
+               plan_keys: Optional[Dict[int, str]] = None) -> int:
+    """
+    Toplu kayıt: ExamID → yerleşimler; hepsi tek işlemde (hata → hiçbiri yazılmaz).
+    plan_keys verilirse satırlar PlanKey ile işaretlenir (bkz. build_plan_for_slot).
+    Dönüş: yazılan satır.
+    """
+    return _save_rows({exam_id: [(p.student.no, p.classroom_id, p.pos.row, p.pos.col) for p in ps]
+                       for exam_id, ps in plans.items()}, plan_keys)
 
-    conn.commit()
-    conn.close()
+def _save_rows(plans: Dict[int, Sequence[SeatRow]], plan_keys: Optional[Dict[int, str]] = None) -> int:
+    if not plans:
+        return 0
+    ensure_seat_plan_schema()
+    conn = get_connection(); cur = conn.cursor()
+    try:
+        n = _write_plans(cur, plans, plan_keys)
+        conn.commit()
+        return n
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
-def fetch_saved_plan(exam_id: int) -> List[Placement]:
+def fetch_saved_plans(exam_ids: Sequence[int]) -> Dict[int, List[Placement]]:
     """
-    Kaydedilmiş planı Students ve Classrooms ile birlikte döndürür.
+    Birden çok sınavın kaydedilmiş planı (Students ve Classrooms ile) — ExamID parçaları
+    hâlinde, parça başına tek sorgu. Planı olmayan ExamID sözlükte yer almaz.
     """
+    ids = sorted({int(x) for x in exam_ids})
+    out: Dict[int, List[Placement]] = {}
+    if not ids:
+        return out
     conn = get_connection(); cur = conn.cursor()
-    cur.execute("""
-        SELECT sp.StudentNo, ISNULL(s.FullName, sp.StudentNo) AS FullName,
-               sp.ClassroomID, cl.Name, sp.RowIndex, sp.ColIndex
-        FROM SeatPlans sp
-        LEFT JOIN Students   s  ON s.StudentNo    = sp.StudentNo
-        LEFT JOIN Classrooms cl ON cl.ClassroomID = sp.ClassroomID
-        WHERE sp.ExamID = ?
-        ORDER BY cl.Name, sp.RowIndex, sp.ColIndex, sp.StudentNo
-    """, exam_id)
-    rows = cur.fetchall()
-    conn.close()
-
-    out: List[Placement] = []
-    for r in rows:
-        st = Student(no=str(r[0]), name=r[1])
-        out.append(Placement(
-            student=st,
-            classroom_id=int(r[2]),
-            classroom_name=r[3] or "",
-            pos=SeatPos(int(r[4]), int(r[5]))
-        ))
+    try:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            cur.execute(f"""
+                SELECT sp.ExamID, sp.StudentNo, ISNULL(s.FullName, sp.StudentNo) AS FullName,
+                       sp.ClassroomID, cl.Name, sp.RowIndex, sp.ColIndex
+                FROM SeatPlans sp
+                LEFT JOIN Students   s  ON s.StudentNo    = sp.StudentNo
+                LEFT JOIN Classrooms cl ON cl.ClassroomID = sp.ClassroomID
+                WHERE sp.ExamID IN ({','.join('?' * len(chunk))})
+                ORDER BY sp.ExamID, cl.Name, sp.RowIndex, sp.ColIndex, sp.StudentNo
+            """, chunk)
+            for r in cur.fetchall():
+                out.setdefault(int(r[0]), []).append(Placement(
+                    student=Student(no=str(r[1]), name=r[2]),
+                    classroom_id=int(r[3]),
+                    classroom_name=r[4] or "",
+                    pos=SeatPos(int(r[5]), int(r[6]))
+                ))
+    finally:
+        conn.close()
     return out
 
+def fetch_saved_plan(exam_id: int) -> List[Placement]:
+    """
+    Kaydedilmiş planı Students ve Classrooms ile birlikte döndürür.
+    """
+    return fetch_saved_plans([exam_id]).get(int(exam_id), [])
+
 # ─────────────────────────────────────────────────────────────
 # 6) DB Yardımcıları
 # ─────────────────────────────────────────────────────────────
@@ -354,14 +829,17 @@ def _fetch_exam_context(exam_id: int) -> Tuple[List[Student], List[RoomLayout],
         classroom_id=int(r[0]), classroom_name=r[1],
         rows=int(r[2]), cols=int(r[3]), bench_size=int(r[4])
     ) for r in cur.fetchall()]
+    if course_id is not None and meta.get("StartDT") is not None:
+        rooms, meta["ShareWarnings"] = _resolve_room_sharing(cur, int(course_id), meta["StartDT"], rooms)
 
     conn.close()
     return students, rooms, meta
 
-def _fetch_slot_context(course_id: int, start_dt: datetime) -> Tuple[List[Student], List[RoomLayout]]:
+def _fetch_slot_context(course_id: int, start_dt: datetime) -> Tuple[List[Student], List[RoomLayout], List[str]]:
     """
     Slot = CourseID + StartDT.
     Öğrenciler CourseID'den, salonlar aynı slottaki TÜM ExamID'lerin birleşiminden alınır.
+    Üçüncü dönüş: salon paylaşımı uyarıları.
     """
     conn = get_connection(); cur = conn.cursor()
 
@@ -389,9 +867,87 @@ def _fetch_slot_context(course_id: int, start_dt: datetime) -> Tuple[List[Studen
         classroom_id=int(r[0]), classroom_name=r[1],
         rows=int(r[2]), cols=int(r[3]), bench_size=int(r[4])
     ) for r in cur.fetchall()]
+    rooms, warnings = _resolve_room_sharing(cur, course_id, start_dt, rooms)
 
     conn.close()
-    return students, rooms
+    return students, rooms, warnings
+
+def _resolve_room_sharing(cur, course_id: int, start_dt: datetime,
+                          rooms: List[RoomLayout]) -> Tuple[List[RoomLayout], List[str]]:
+    """
+    Aynı StartDT'de salonu başka derslerle paylaşan sınavlar için bu dersin koltuk dilimini
+    belirler (planlayıcıdaki pack_room_layers ile aynı kural, CourseID sırası).
+    Paylaşım yoksa salonlar olduğu gibi döner (tek sorgu).
+    """
+    if not rooms:
+        return rooms, []
+    ids = [r.classroom_id for r in rooms]
+    marks = ",".join("?" * len(ids))
+    cur.execute(f"""
+        SELECT DISTINCT e.CourseID, er.ClassroomID
+        FROM Exams e
+        JOIN ExamRooms er ON er.ExamID = e.ExamID
+        WHERE e.StartDT = ? AND er.ClassroomID IN ({marks})
+    """, start_dt, *ids)
+    by_room: Dict[int, Set[int]] = {}
+    for cid, rid in cur.fetchall():
+        by_room.setdefault(int(rid), set()).add(int(cid))
+    shared = {rid: cids for rid, cids in by_room.items() if len(cids) > 1 and course_id in cids}
+    if not shared:
+        return rooms, []
+
+    involved = sorted(set().union(*shared.values()))
+    marks = ",".join("?" * len(involved))
+    cur.execute(f"""
+        SELECT e.CourseID, COUNT(DISTINCT er.ClassroomID)
+        FROM Exams e
+        JOIN ExamRooms er ON er.ExamID = e.ExamID
+        WHERE e.StartDT = ? AND e.CourseID IN ({marks})
+        GROUP BY e.CourseID
+    """, start_dt, *involved)
+    room_count = {int(r[0]): int(r[1]) for r in cur.fetchall()}
+    cur.execute(f"""
+        SELECT sc.CourseID, COUNT(DISTINCT s.StudentNo)
+        FROM StudentCourses sc
+        JOIN Students s ON s.StudentNo = sc.StudentNo
+        WHERE sc.CourseID IN ({marks})
+        GROUP BY sc.CourseID
+    """, *involved)
+    need = {int(r[0]): int(r[1]) for r in cur.fetchall()}
+    return _apply_room_sharing(course_id, rooms, shared, room_count, need)
+
+def _apply_room_sharing(course_id: int, rooms: List[RoomLayout], shared: Dict[int, Set[int]],
+                        room_count: Dict[int, int], need: Dict[int, int]) -> Tuple[List[RoomLayout], List[str]]:
+    """
+    Sorgusuz çekirdek: shared (ClassroomID → aynı aralıkta salonu kullanan CourseID'ler),
+    room_count (CourseID → salon sayısı) ve need (CourseID → öğrenci) verisiyle dersin
+    salon katmanı ve koltuk dilimini belirler.
+    """
+    warnings: List[str] = []
+    out: List[RoomLayout] = []
+    for room in rooms:
+        cids = sorted(shared.get(room.classroom_id, ()))
+        if not cids:
+            out.append(room)
+            continue
+        pinned = [room_count.get(c, 1) > 1 for c in cids]
+        needs = [need.get(c, 0) for c in cids]
+        layers = pack_room_layers(needs, pinned,
+                                  effective_capacity(room.rows, room.cols, room.bench_size),
+                                  shared_capacity(room.rows, room.cols, room.bench_size))
+        if layers is None:
+            warnings.append(f"{room.classroom_name}: paylaşılan dersler koltuk düzenine sığmıyor; "
+                            f"salonun tamamı bu derse göre planlandı.")
+            out.append(room)
+            continue
+        k = cids.index(course_id)
+        if pinned[k]:
+            out.append(replace(room, layer=0))
+            continue
+        skip = sum(n for c, n, p, l in zip(cids, needs, pinned, layers)
+                   if l == layers[k] and not p and c < course_id)
+        out.append(replace(room, layer=layers[k], seat_skip=skip, seat_limit=needs[k]))
+    return out, warnings
 
 # ─────────────────────────────────────────────────────────────
 # 7) Yerleştirme Çekirdeği  — Bench deseni BOYUNA (rows) uygulanır
@@ -407,18 +963,130 @@ def _mask_for_bench(bench_size: int) -> List[int]:
     if bench_size == 2: return [1,0]
     return [1]
 
-def _iter_slots(layout: RoomLayout):
+def _secondary_mask(bench_size: int) -> List[int]:
+    """
+    Paylaşımlı salonda ikinci dersin koltukları: her bench bloğunda birincil koltuğun hemen
+    arkasındaki boş koltuk. Böylece iki dersin öğrencileri dönüşümlü oturur, ikinci dersin
+    iki öğrencisi yan yana gelmez.
+    4'lü: [0,1,0,0]  3'lü: [0,1,0]  2'li: [0,1]  tekli: [0] (paylaşım yok)
+    """
+    m = _mask_for_bench(bench_size)
+    return [1 if m[i] == 0 and i > 0 and m[i - 1] == 1 else 0 for i in range(len(m))]
+
+def _mask_capacity(rows: int, cols: int, mask: List[int]) -> int:
+    if rows <= 0 or cols <= 0:
+        return 0
+    full, rest = divmod(rows, len(mask))
+    return (full * sum(mask) + sum(mask[:rest])) * cols
+
+@lru_cache(maxsize=None)
+def effective_capacity(rows: int, cols: int, bench_size: int) -> int:
+    """
+    Sınavda gerçekten kullanılabilen koltuk sayısı (_room_seat_index ile aynı desen):
+    maskede dolu satırlar × sütun. Salon düzeni başına bir kez hesaplanır.
+    """
+    return _mask_capacity(rows, cols, _mask_for_bench(bench_size))
+
+@lru_cache(maxsize=None)
+def shared_capacity(rows: int, cols: int, bench_size: int) -> int:
+    """Paylaşımlı salonda ikincil katmanın koltuk sayısı (bkz. _secondary_mask)."""
+    return _mask_capacity(rows, cols, _secondary_mask(bench_size))
+
+def exam_capacity(capacity: Optional[int], rows: Optional[int], cols: Optional[int],
+                  bench_size: Optional[int]) -> int:
+    """
+    Sınav kapasitesi: düzen (Rows/Cols) biliniyorsa effective_capacity (nominal Capacity'yi
+    aşmaz); düzen yoksa nominal Capacity.
+    """
+    nominal = int(capacity or 0)
+    rows, cols = int(rows or 0), int(cols or 0)
+    if rows <= 0 or cols <= 0:
+        return nominal
+    eff = effective_capacity(rows, cols, int(bench_size or 1))
+    return min(nominal, eff) if nominal > 0 else eff
+
+def exam_shared_capacity(capacity: Optional[int], rows: Optional[int], cols: Optional[int],
+                         bench_size: Optional[int]) -> int:
+    """
+    İkincil katman kapasitesi; birincil katmanla toplamı nominal Capacity'yi aşmaz.
+    Düzen bilinmiyorsa 0 (koltuk haritası olmadan dönüşümlü oturma kurulamaz).
+    """
+    nominal = int(capacity or 0)
+    rows, cols = int(rows or 0), int(cols or 0)
+    if rows <= 0 or cols <= 0:
+        return 0
+    sec = shared_capacity(rows, cols, int(bench_size or 1))
+    if nominal > 0:
+        sec = min(sec, max(0, nominal - exam_capacity(nominal, rows, cols, bench_size)))
+    return sec
+
+def pack_room_layers(needs: Sequence[int], pinned: Sequence[bool],
+                     primary: int, secondary: int) -> Optional[List[int]]:
+    """
+    Aynı salon + aynı aralıktaki sınavları iki katmana yerleştirir (çok boyutlu kutu doldurma).
+    needs/pinned: CourseID sırasıyla öğrenci sayısı ve "birden çok salona yayılmış" bayrağı;
+    yayılmış ders birincil katmanı tümüyle tutar. Dönüş: ders başına katman (0/1) veya None.
+    Ders sayısı küçük (salon başına birkaç ders) olduğundan tüm atamalar sırayla denenir;
+    ilk uygun atama seçilir → planlayıcı, doğrulayıcı ve oturma planı aynı sonucu üretir.
+    """
+    if sum(1 for p in pinned if p) > 1:
+        return None
+    for layers in product((0, 1), repeat=len(needs)):
+        load = [0, 0]
+        ok = True
+        for need, pin, layer in zip(needs, pinned, layers):
+            if pin and layer != 0:
+                ok = False
+                break
+            load[layer] += primary if pin else int(need)
+        if ok and load[0] <= primary and load[1] <= secondary:
+            return list(layers)
+    return None
+
+def _room_seat_index(room: RoomLayout) -> np.ndarray:
     """
-    Bench maskesine göre öğrenci oturabilir slotları üretir (ön sıra önce).
+    Bench maskesine göre öğrenci oturabilir koltuklar, düz indeks (row * cols + col),
+    slot sırası (satır satır), paylaşım dilimi uygulanmış; salt okunur dizi.
     ***DİKKAT***: Desen BOYUNA uygulanır → mask[r % mlen].
+    room.layer == 1 ise paylaşımlı salonun ikincil koltukları üretilir.
     """
-    mask = _mask_for_bench(layout.bench_size)
-    mlen = len(mask)
-    for r in range(layout.rows):
-        if mask[r % mlen] != 1:
+    return _room_seat_index_for(room.rows, room.cols, room.bench_size, room.layer, room.seat_skip, room.seat_limit)
+
+@lru_cache(maxsize=256)
+def _room_seat_index_for(rows: int, cols: int, bench_size: int, layer: int,
+                         seat_skip: int, seat_limit: Optional[int]) -> np.ndarray:
+    mask = _secondary_mask(bench_size) if layer == 1 else _mask_for_bench(bench_size)
+    usable = np.flatnonzero(np.array([mask[r % len(mask)] == 1 for r in range(rows)], dtype=bool))
+    flat = (usable[:, None] * cols + np.arange(cols)).ravel().astype(np.int32)[seat_skip:]
+    if seat_limit is not None:
+        flat = flat[:seat_limit]
+    flat.flags.writeable = False
+    return flat
+
+def _empty_grid(room: RoomLayout) -> np.ndarray:
+    """Bu derse düşen koltuklar SEAT_EMPTY, kalanı SEAT_BLOCKED."""
+    g = np.full(room.rows * room.cols, SEAT_BLOCKED, dtype=np.int32)
+    g[_room_seat_index(room)] = SEAT_EMPTY
+    return g.reshape(room.rows, room.cols)
+
+def _freeze(grids: Dict[int, np.ndarray]) -> Dict[int, np.ndarray]:
+    # önbellek ve kopyalar ızgarayı paylaşır → yerinde değişiklik engellenir
+    for g in grids.values():
+        g.flags.writeable = False
+    return grids
+
+def _plan_from_placements(rooms: List[RoomLayout], placements: List[Placement],
+                          warnings: List[str]) -> PlanResult:
+    """Kayıtlı (Placement) plandan dizi tabanlı PlanResult; salon dışı satırlar atlanır."""
+    grids = {r.classroom_id: _empty_grid(r) for r in rooms}
+    students: List[Student] = []
+    for p in placements:
+        g = grids.get(p.classroom_id)
+        if g is None or not (0 <= p.pos.row < g.shape[0] and 0 <= p.pos.col < g.shape[1]):
             continue
-        for c in range(layout.cols):
-            yield SeatPos(r, c)
+        g[p.pos.row, p.pos.col] = len(students)
+        students.append(p.student)
+    return PlanResult(-1, warnings, [], students, list(rooms), _freeze(grids))
 
 def _adjacency_groups(layout: RoomLayout) -> List[List[SeatPos]]:
     """
@@ -443,98 +1111,235 @@ def _adjacency_groups(layout: RoomLayout) -> List[List[SeatPos]]:
                 groups.append(g)
     return groups
 
+def _slot_neighbours(room: RoomLayout) -> Tuple[Tuple[int, ...], ...]:
+    return _slot_neighbours_for(room.rows, room.cols, room.bench_size, room.layer, room.seat_skip, room.seat_limit)
+
+@lru_cache(maxsize=256)
+def _slot_neighbours_for(rows: int, cols: int, bench_size: int, layer: int,
+                         seat_skip: int, seat_limit: Optional[int]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Salonun kullanılabilir slotları (_room_seat_index sırası) için komşu indeksleri:
+    aynı bench bloğundaki (_adjacency_groups) diğer kullanılabilir koltuklar. Düzen başına bir kez.
+    """
+    layout = RoomLayout(0, "", rows, cols, bench_size, layer, seat_skip, seat_limit)
+    slots = _room_seat_index_for(rows, cols, bench_size, layer, seat_skip, seat_limit)
+    index = {f: i for i, f in enumerate(slots.tolist())}
+    out: List[List[int]] = [[] for _ in slots]
+    for g in _adjacency_groups(layout):
+        members = [index[p.row * cols + p.col] for p in g if p.row * cols + p.col in index]
+        for i in members:
+            out[i].extend(j for j in members if j != i)
+    return tuple(tuple(x) for x in out)
+
+SEAT_SCAN_LIMIT = 64          # kısıtlı öğrenci için ileriye bakılan en çok boş koltuk
+SEAT_REPAIR_CHECKS = 200_000  # onarım evresinde denenecek en çok takas adayı
+
+def _assign_seats(
+    order: List[Tuple[int, int]],
+    n_front: int,
+    room_neighbours: Dict[int, Tuple[Tuple[int, ...], ...]],
+    req_sids: List[int],
+    years: List[Optional[int]],
+    bad: Dict[int, Set[int]],
+    n_front_req: int
+) -> List[int]:
+    """
+    İstek k → order içindeki koltuk indeksi (-1: koltuk kalmadı). Komşu koltuklar arasında
+    kısıt: yasak çift (bad, kayıt indeksleriyle) ya da aynı sınıf yılı (years None değilse).
+    1) Açgözlü boyama: her istek ilk boş koltuğu alır; kısıtlıysa ve oturan komşusuyla
+       çatışıyorsa ileriye en çok SEAT_SCAN_LIMIT boş koltuk bakıp ilk çatışmasızı seçer.
+    2) Onarım: çatışan her öğrenci için, iki tarafı da çatışmasız bırakan bir takas (ya da
+       boş koltuğa geçiş) aranır; toplam SEAT_REPAIR_CHECKS aday ile sınırlı.
+    Ön sıra isteyenler ön sıradan çıkarılmaz. Kısıt yoksa sonuç koltuk sırasının aynısıdır.
+    """
+    n, m = len(order), len(req_sids)
+    seat_of = [-1] * m
+    if not bad and all(y is None for y in years):
+        for k in range(min(n, m)):
+            seat_of[k] = k
+        return seat_of
+
+    g_of = {slot: g for g, slot in enumerate(order)}
+    nb = [[g_of[(rid, j)] for j in room_neighbours[rid][i]] for rid, i in order]
+    occ = [-1] * n
+
+    def conflict(x: int, y: int) -> bool:
+        sx, sy = req_sids[x], req_sids[y]
+        if sx == sy:
+            return False
+        return sy in bad.get(sx, ()) or (years[x] is not None and years[x] == years[y])
+
+    def clashes(x: int, g: int, moved: Optional[Tuple[int, int]] = None) -> int:
+        """x, g koltuğunda otursa kaç komşusuyla çatışır (moved: (koltuk, yeni sakin) varsayımı)."""
+        c = 0
+        for h in nb[g]:
+            y = moved[1] if moved is not None and h == moved[0] else occ[h]
+            if y >= 0 and conflict(x, y):
+                c += 1
+        return c
+
+    # 1) Açgözlü
+    ptr = 0
+    for k in range(m):
+        while ptr < n and occ[ptr] >= 0:
+            ptr += 1
+        if ptr >= n:
+            break
+        g = ptr
+        if (req_sids[k] in bad or years[k] is not None) and clashes(k, g):
+            limit = n_front if (k < n_front_req and ptr < n_front) else n
+            seen, h = 0, ptr + 1
+            while h < limit and seen < SEAT_SCAN_LIMIT:
+                if occ[h] < 0:
+                    seen += 1
+                    if not clashes(k, h):
+                        g = h
+                        break
+                h += 1
+        occ[g] = k
+        seat_of[k] = g
+
+    # 2) Sınırlı onarım
+    def may_sit(x: int, g: int) -> bool:
+        return not (x < n_front_req and seat_of[x] < n_front <= g)
+
+    checks = 0
+    for g in range(n):
+        a = occ[g]
+        if a < 0 or not clashes(a, g):
+            continue
+        for off in range(1, n):
+            if checks >= SEAT_REPAIR_CHECKS:
+                return seat_of
+            checks += 1
+            t = (g + off) % n
+            b = occ[t]
+            if not may_sit(a, t) or (b >= 0 and not may_sit(b, g)):
+                continue
+            if clashes(a, t, (g, b)) == 0 and (b < 0 or clashes(b, g, (t, a)) == 0):
+                occ[g], occ[t] = b, a
+                seat_of[a] = t
+                if b >= 0:
+                    seat_of[b] = g
+                break
+    return seat_of
+
 def _build_seating_plan(
     students: List[Student],
     rooms: List[RoomLayout],
     forbidden_pairs: Set[Tuple[str, str]],   # StudentNo çifti
-    prefer_front: List[str]                  # StudentNo listesi
+    prefer_front: List[str],                 # StudentNo listesi
+    avoid_same_year: bool = False            # aynı sınıf yılı aynı bench'te oturmasın
 ) -> PlanResult:
+    """
+    Koltuk sırası ön sıra önce; yerleştirme kısıtsızken bu sırayı birebir izler.
+    Yasak çiftler (ve istenirse aynı sınıf yılı) aynı bench bloğundaki komşu koltuklar
+    arasında kısıttır: _assign_seats açgözlü boyama + sınırlı onarımla çözer,
+    giderilemeyen komşuluklar uyarı olarak döner.
+    """
     warnings: List[str] = []
     errors: List[str] = []
-    placements: List[Placement] = []
-    empty_slots: Dict[int, List[SeatPos]] = {}
 
-    # Kullanılabilir slotları hazırla
-    room_slots: Dict[int, List[SeatPos]] = {}
-    room_by_id: Dict[int, RoomLayout] = {r.classroom_id: r for r in rooms}
-    for room in rooms:
-        slots = list(_iter_slots(room))
-        room_slots[room.classroom_id] = slots.copy()
-        empty_slots[room.classroom_id] = slots.copy()
+    # Kullanılabilir koltuklar salon başına düz indeks dizisi; sonuç salon başına int32 ızgara
+    seat_index: Dict[int, np.ndarray] = {r.classroom_id: _room_seat_index(r) for r in rooms}
+    grids: Dict[int, np.ndarray] = {r.classroom_id: _empty_grid(r) for r in rooms}
 
-    capacity = sum(len(v) for v in room_slots.values())
+    capacity = sum(len(v) for v in seat_index.values())
     if len(students) > capacity:
         errors.append(f"Toplam kapasite yetersiz! Öğrenci: {len(students)}, kapasite: {capacity}.")
-        return PlanResult(-1, placements, warnings, errors, empty_slots)
+        return PlanResult(-1, warnings, errors, [], list(rooms), _freeze(grids))
 
-    # Ön sıra (row=0) ve diğer slotlar
-    front_q: List[Tuple[int, SeatPos]] = []
-    rest_q:  List[Tuple[int, SeatPos]] = []
-    for room in rooms:
-        front_q.extend([(room.classroom_id, s) for s in room_slots[room.classroom_id] if s.row == 0])
-        rest_q.extend([(room.classroom_id, s) for s in room_slots[room.classroom_id] if s.row != 0])
-
-    placed_nos: Set[str] = set()
-    all_nos = {s.no for s in students}
-
-    def take_slot(front_pref: bool) -> Optional[Tuple[int, SeatPos]]:
-        if front_pref and front_q:
-            return front_q.pop(0)
-        if front_q:
-            return front_q.pop(0)
-        if rest_q:
-            return rest_q.pop(0)
-        return None
+    # Koltuk sırası: önce tüm salonların ön sırası (row=0), sonra diğerleri; g = bu sıradaki indeks.
+    # Sıra paralel dizilerde: salon, salondaki slot indeksi, düz koltuk indeksi
+    parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    for front in (True, False):
+        for room in rooms:
+            idx = seat_index[room.classroom_id]
+            i = np.flatnonzero((idx < room.cols) if front else (idx >= room.cols)).astype(np.int32)
+            parts.append((np.full(len(i), room.classroom_id, dtype=np.int32), i, idx[i]))
+        if front:
+            n_front = sum(len(x[1]) for x in parts)
+    ord_rid, ord_i, ord_flat = (np.concatenate(x) for x in zip(*parts)) if parts else \
+        (np.empty(0, dtype=np.int32),) * 3
+    n_seats = len(ord_rid)
 
-    # 1) Ön sıra isteyenler
+    # Üyelik/yasak çift kontrolleri StudentNo metni yerine plana yerel indeksler üzerinden.
+    # Süreç genelindeki student_registry'ye yazılmaz: havuz süreçleri farklı indeks verirdi
+    # ve her slot kaydı büyütürdü; indeksler bu çağrının dışına çıkmaz.
+    local: Dict[str, int] = {}
+    sids = [local.setdefault(normalize_no(s.no), len(local)) for s in students]
+    student_by_sid: Dict[int, Student] = {}
+    for st, sid in zip(students, sids):
+        student_by_sid.setdefault(sid, st)      # aynı kayıt iki kez gelirse ilki
+
+    # Yerleştirme istekleri: önce ön sıra isteyenler (liste sırasıyla), sonra kalan herkes
+    requests: List[Student] = []
+    req_sids: List[int] = []
+    placed: Set[int] = set()
     for sno in prefer_front:
-        if sno not in all_nos:
+        sid = local.get(normalize_no(sno))
+        st = student_by_sid.get(sid)
+        if st is None:
             continue
-        slot = take_slot(True)
-        if not slot:
+        if len(requests) >= n_seats:
             warnings.append("Belirtilen öğrenci ön sıraya yerleştirilemedi (kapasite dolu)!")
             break
-        room_id, pos = slot
-        st = next(s for s in students if s.no == sno)
-        placements.append(Placement(st, room_id, room_by_id[room_id].classroom_name, pos))
-        placed_nos.add(st.no)
-        empty_slots[room_id].remove(pos)
-
-    # 2) Kalan herkes
-    for st in students:
-        if st.no in placed_nos:
-            continue
-        slot = take_slot(False)
-        if not slot:
-            errors.append("Yerleştirme beklenmedik şekilde durdu (slot kalmadı).")
-            break
-        room_id, pos = slot
-        placements.append(Placement(st, room_id, room_by_id[room_id].classroom_name, pos))
-        empty_slots[room_id].remove(pos)
+        requests.append(st); req_sids.append(sid)
+        placed.add(sid)
+    n_front_req = len(requests)
+    for st, sid in zip(students, sids):
+        if sid not in placed:
+            requests.append(st); req_sids.append(sid)
 
-    if errors:
-        return PlanResult(-1, placements, warnings, errors, empty_slots)
+    bad: Dict[int, Set[int]] = {}
+    for a, b in forbidden_pairs:
+        ia, ib = local.get(normalize_no(a)), local.get(normalize_no(b))
+        if ia is not None and ib is not None and ia != ib:
+            bad.setdefault(ia, set()).add(ib)
+            bad.setdefault(ib, set()).add(ia)
+    years = [st.class_year if avoid_same_year else None for st in requests]
 
-    # 3) Yan yana olmama kontrolü (aynı bench bloğunda)
-    by_room: Dict[int, Dict[Tuple[int, int], str]] = {}
-    for p in placements:
-        by_room.setdefault(p.classroom_id, {})[(p.pos.row, p.pos.col)] = p.student.no
+    if not bad and all(y is None for y in years):
+        # kısıtsız: istek k → sıradaki k. koltuk (sıra nesnesi kurulmaz)
+        seat_of = np.arange(min(n_seats, len(requests)), dtype=np.int64)
+        if len(requests) > n_seats:
+            seat_of = np.concatenate([seat_of, np.full(len(requests) - n_seats, -1, dtype=np.int64)])
+    else:
+        seat_of = np.asarray(_assign_seats(list(zip(ord_rid.tolist(), ord_i.tolist())), n_front,
+                                           {r.classroom_id: _slot_neighbours(r) for r in rooms},
+                                           req_sids, years, bad, n_front_req), dtype=np.int64)
 
-    forbidden_norm = {(min(a, b), max(a, b)) for (a, b) in forbidden_pairs}
+    stop = np.flatnonzero(seat_of < 0)
+    if stop.size:
+        errors.append("Yerleştirme beklenmedik şekilde durdu (slot kalmadı).")
+        seat_of = seat_of[:stop[0]]
+    ks = np.arange(len(seat_of), dtype=np.int32)
+    seat_rid = ord_rid[seat_of]
+    for rid, grid in grids.items():
+        sel = seat_rid == rid
+        grid.reshape(-1)[ord_flat[seat_of[sel]]] = ks[sel]
+    if errors:
+        return PlanResult(-1, warnings, errors, requests, list(rooms), _freeze(grids))
 
-    for room in rooms:
-        groups = _adjacency_groups(room)
-        pos2no = by_room.get(room.classroom_id, {})
-        for g in groups:
-            seated = [pos2no.get((s.row, s.col)) for s in g]
-            seated = [x for x in seated if x is not None]
-            if len(seated) < 2:
+    # 3) Çözücünün gideremediği komşuluklar (aynı bench bloğunda)
+    same_year = 0
+    for room in (rooms if bad or avoid_same_year else ()):
+        rid = room.classroom_id
+        occ = grids[rid].reshape(-1)[seat_index[rid]].tolist()    # slot → istek indeksi (< 0 boş)
+        for i, nbs in enumerate(_slot_neighbours(room)):
+            a = occ[i]
+            if a < 0:
                 continue
-            for i in range(len(seated)):
-                for j in range(i+1, len(seated)):
-                    a, b = seated[i], seated[j]
-                    if (min(a, b), max(a, b)) in forbidden_norm:
-                        warnings.append("Bu iki öğrenci yan yana oturmayacak şekilde plan oluşturulamadı!")
-                        break
+            for j in nbs:
+                b = occ[j]
+                if j < i or b < 0 or req_sids[a] == req_sids[b]:
+                    continue
+                if req_sids[b] in bad.get(req_sids[a], ()):
+                    warnings.append(f"{requests[a].no} ile {requests[b].no} yan yana oturmayacak şekilde "
+                                    f"plan oluşturulamadı!")
+                elif years[a] is not None and years[a] == years[b]:
+                    same_year += 1
+    if same_year:
+        warnings.append(f"Aynı sınıf yılından {same_year} öğrenci çifti yan yana kaldı.")
 
-    return PlanResult(-1, placements, warnings, errors, empty_slots)
+    return PlanResult(-1, warnings, errors, requests, list(rooms), _freeze(grids))
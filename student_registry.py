@@ -0,0 +1,102 @@
+# student_registry.py — StudentNo ↔ yoğun int32 indeks (oturum boyunca süreç genelinde tek kayıt)
+# StudentNo; DB'de INT/NVARCHAR, scheduler_core'da int, seat_plan_repo'da str olarak dolaşıyordu.
+# Çekirdek modüller yoğun indekslerle çalışır; metne yalnız UI/DB kenarında dönülür.
+from __future__ import annotations
+from typing import Dict, List, Iterable, Optional
+import threading
+
+import numpy as np
+
+def normalize_no(no) -> str:
+    """Tek anahtar biçimi: baştaki/sondaki boşluk atılmış metin (123 ve '123' aynı öğrenci)."""
+    return str(no).strip()
+
+class StudentRegistry:
+    """
+    StudentNo → indeks (0, 1, 2 …) ve indeks → StudentNo.
+    İndeksler sabittir: bir kez verilen indeks oturum boyunca değişmez; yeni numaralar sona eklenir.
+    """
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._numbers: List[str] = []
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __getstate__(self):
+        # süreç havuzuna gönderilebilsin (kilit kopyalanmaz)
+        return {"_index": self._index, "_numbers": self._numbers, "loaded": self.loaded}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def intern(self, no) -> int:
+        key = normalize_no(no)
+        i = self._index.get(key)
+        if i is not None:
+            return i
+        with self._lock:
+            i = self._index.get(key)
+            if i is None:
+                i = len(self._numbers)
+                self._numbers.append(key)
+                self._index[key] = i
+            return i
+
+    def intern_many(self, nos: Iterable) -> np.ndarray:
+        return np.fromiter((self.intern(n) for n in nos), dtype=np.int32)
+
+    def index_of(self, no) -> Optional[int]:
+        """Kayıt eklemeden arar; bilinmeyen numara için None."""
+        return self._index.get(normalize_no(no))
+
+    def number(self, idx: int) -> str:
+        return self._numbers[int(idx)]
+
+    def numbers(self, idxs: Iterable[int]) -> List[str]:
+        nums = self._numbers
+        return [nums[int(i)] for i in idxs]
+
+    def load(self, conn=None) -> int:
+        """dbo.Students'taki tüm numaraları tek sorguda içe alır. Dönüş: kayıttaki toplam öğrenci."""
+        own = conn is None
+        if own:
+            from db import get_connection
+            conn = get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT StudentNo FROM dbo.Students ORDER BY StudentNo")
+            while True:
+                chunk = cur.fetchmany(10000)
+                if not chunk:
+                    break
+                for (no,) in chunk:
+                    self.intern(no)
+        finally:
+            if own:
+                conn.close()
+        self.loaded = True
+        return len(self)
+
+_registry: Optional[StudentRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry(load: bool = True) -> StudentRegistry:
+    """Süreç genelindeki kayıt; ilk çağrıda (load=True ise) DB'den toplu yüklenir."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = StudentRegistry()
+        reg = _registry
+    if load and not reg.loaded:
+        reg.load()
+    return reg
+
+def reset_registry() -> None:
+    """Oturum kapanınca (veya öğrenci listesi topluca değişince) kaydı sıfırlar."""
+    global _registry
+    with _registry_lock:
+        _registry = None